@@ -6,14 +6,19 @@ GŁÓWNA KLASA ANALIZATORA
 Orkiestruje cały proces analizy - fasada dla całego systemu.
 """
 
+import time
+import numpy as np
 from datetime import datetime
-from typing import List
-from models import TravelRecord, ProcessingStats
+from typing import Any, Dict, List, Optional, Set
+from models import TravelRecord, TravelRecordBatch, ProcessingStats
 from config import Config
 from data_loader import DataLoader
-from normalizer import TravelNormalizer
+from rule_context import RuleContext
 from categorizer import TravelCategorizer
+from rule_trace import RuleTrace
 from exporter import ExcelExporter
+from incremental_store import IncrementalStore
+from table_cache import file_fingerprint
 
 class TravelAnalyzer:
     """Główna klasa orkiestrująca analizę podróży"""
@@ -21,14 +26,27 @@ class TravelAnalyzer:
     def __init__(self) -> None:
         self.config = Config()
         self.data_loader = DataLoader()
-        self.normalizer = TravelNormalizer()
-        self.categorizer = TravelCategorizer()
+        # Jeden kontekst reguł na proces - normalizator wspólny z kategoryzatorem
+        self.context = RuleContext.default()
+        self.normalizer = self.context.normalizer
+        self.categorizer = TravelCategorizer(self.context)
+        # Reguły mogą zostać przeładowane w trakcie pracy - stan przyrostowy musi to widzieć
+        self.context.add_listener(lambda old_pack, new_pack: self.incremental_store.invalidate_rules_fingerprint())
         self.exporter = ExcelExporter()
+        self.incremental_store = IncrementalStore(self.config.STATE_DIR, self.config.CONFIG_DIR)
         
-        self.records: List[TravelRecord] = []
+        # Zbiór kolumnowy - główna struktura danych potoku
+        self.records: TravelRecordBatch = TravelRecordBatch.empty()
         self.stats = ProcessingStats()
+        # Lata bez nowych rezerwacji w trybie przyrostowym (pliki roczne nie są nadpisywane)
+        self.unchanged_years: Set[int] = set()
+        # Raport profilu strategii z ostatniej analizy (Config.CATEGORY_PROFILING)
+        self.strategy_profile: Optional[Dict[str, Any]] = None
+        # Ślad reguł ostatniej analizy (Config.RULE_TRACE) - wiersze jak w self.records
+        self.rule_trace: Optional[RuleTrace] = None
         
-    def run_analysis(self, single_year: int = None, selected_years: List[int] = None) -> None:
+    def run_analysis(self, single_year: int = None, selected_years: List[int] = None, incremental: bool = False,
+                     chunked: bool = False) -> None:
         """Główny przepływ analizy"""
         print("SYSTEM ANALIZY ROCZNEJ STATYSTYK PODRÓŻNYCH")
         print("=" * 70)
@@ -39,20 +57,32 @@ class TravelAnalyzer:
             print(f"📅 Analiza wybranych lat: {', '.join(map(str, selected_years))}")
         else:
             print("📅 Analiza wszystkich dostępnych lat")
+        if incremental:
+            print("🔁 Tryb przyrostowy - przetwarzane są tylko nowe rezerwacje")
+        elif chunked:
+            print(f"🧩 Tryb porcjowy - wczytywanie i przetwarzanie po {self.config.CHUNK_SIZE} wierszy")
             
         print(f"⏰ Start: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         try:
             # Zapewnij katalogi
             self.config.ensure_directories()
+            profiler = self.categorizer.category_manager.profiler
+            if profiler is not None:
+                profiler.reset()
             
             # 1. Wczytywanie danych
-            if single_year:
-                self.records = self.data_loader.load_single_year(single_year)
+            self.unchanged_years = set()
+            if incremental:
+                self.records = self._load_incremental(self._resolve_years(single_year, selected_years))
+            elif chunked:
+                self.records = self._load_chunked(self._resolve_years(single_year, selected_years))
+            elif single_year:
+                self.records = self.data_loader.load_single_year(single_year, as_batch=True)
             elif selected_years:
-                self.records = self.data_loader.load_selected_years(selected_years)
+                self.records = self.data_loader.load_selected_years(selected_years, as_batch=True)
             else:
-                self.records = self.data_loader.load_all_data()
+                self.records = self.data_loader.load_all_data(as_batch=True)
             
             if not self.records:
                 print("Nie znaleziono danych do analizy")
@@ -69,8 +99,12 @@ class TravelAnalyzer:
                 print("Błędy w danych - przerywanie analizy")
                 return
             
-            # 3. Przetwarzanie
-            self._process_records()
+            # 3. Przetwarzanie (w trybie przyrostowym i porcjowym już wykonane przy wczytywaniu)
+            if not incremental and not chunked:
+                self._process_records()
+            
+            # Ślad reguł dla wszystkich rekordów (Config.RULE_TRACE)
+            self._build_rule_trace()
             
             # 4. Generowanie statystyk  
             self._generate_statistics()
@@ -92,15 +126,101 @@ class TravelAnalyzer:
             # 7. Podsumowanie
             self._print_summary()
             
+            # 8. Profil strategii (Config.CATEGORY_PROFILING)
+            self._report_strategy_profile()
+            
         except Exception as e:
             print(f"Błąd krytyczny: {e}")
             raise
+        finally:
+            self.categorizer.close()
         
         print(f"⏰ Koniec: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
+    def _resolve_years(self, single_year: int = None, selected_years: List[int] = None) -> List[int]:
+        """Zwraca listę lat do analizy (tylko skonfigurowane)"""
+        if single_year:
+            years = [single_year]
+        elif selected_years:
+            years = selected_years
+        else:
+            years = self.config.get_available_years()
+        
+        available_years = self.config.get_available_years()
+        missing = [year for year in years if year not in available_years]
+        if missing:
+            print(f"Brak plików źródłowych dla lat {missing} - pomijam")
+        return sorted(year for year in years if year in available_years)
+    
+    def _load_incremental(self, years: List[int]) -> TravelRecordBatch:
+        """Tryb przyrostowy - przetwarza tylko nowe rezerwacje, resztę bierze z zapisanego stanu"""
+        print(f"📁 Wczytywanie przyrostowe lat: {', '.join(map(str, years))}...")
+        batches = []
+        loaded = 0
+        load_time = 0.0
+        
+        for year in years:
+            # Granica między latami - tu można bezpiecznie podmienić reguły (przed sprawdzeniem stanu)
+            self.context.check_for_updates()
+            source_fingerprint = file_fingerprint(self.config.get_source_file_path(year))
+            state = self.incremental_store.load(year)
+            
+            # Plik bez zmian - gotowe wyniki bez wczytywania i przetwarzania
+            if state is not None and state[1] == source_fingerprint:
+                print(f"  ♻️  Rok {year}: bez zmian ({len(state[0])} przetworzonych rekordów)")
+                batches.append(state[0])
+                self.unchanged_years.add(year)
+                continue
+            
+            start = time.perf_counter()
+            fresh = self.data_loader.load_year_batch(year)
+            load_time += time.perf_counter() - start
+            loaded += len(fresh)
+            if state is None:
+                stored = TravelRecordBatch.empty()
+                old_positions = stored_positions = np.array([], dtype=int)
+                new_positions = np.arange(len(fresh))
+            else:
+                stored = state[0]
+                old_positions, stored_positions, new_positions = self.incremental_store.match_processed(stored, fresh)
+            
+            print(f"    Nowe rezerwacje: {len(new_positions)} (przetworzone wcześniej: {len(old_positions)})")
+            processed_new = fresh.take(new_positions)
+            if len(processed_new):
+                processed_new = self.normalizer.normalize_all_records(processed_new)
+                processed_new = self.categorizer.categorize_all_records(processed_new)
+            
+            merged = self.incremental_store.merge(
+                fresh, stored, processed_new, old_positions, stored_positions, new_positions
+            )
+            self.incremental_store.save(year, merged, source_fingerprint)
+            batches.append(merged)
+        
+        if load_time:
+            self.data_loader.report_load_stage(loaded, load_time)
+        records = TravelRecordBatch.concat(batches)
+        print(f"Łącznie {len(records)} rekordów z {len(years)} lat")
+        return records
+    
+    def _load_chunked(self, years: List[int]) -> TravelRecordBatch:
+        """Wczytuje porcjami i od razu przetwarza każdą porcję - w pamięci nie ma surowej tabeli roku"""
+        print(f"📁 Wczytywanie porcjami z lat: {', '.join(map(str, years))}...")
+        
+        batches = []
+        for batch in self.data_loader.iter_batches(years):
+            # Podmiana reguł tylko między porcjami - porcja przetwarzana jednym kompletem reguł
+            self.context.check_for_updates()
+            batch = self.normalizer.normalize_all_records(batch)
+            batches.append(self.categorizer.categorize_all_records(batch))
+        
+        records = TravelRecordBatch.concat(batches)
+        print(f"Łącznie {len(records)} rekordów z {len(years)} lat")
+        return records
+    
     def _process_records(self) -> None:
         """Przetwarza rekordy: normalizacja + kategoryzacja"""
         print(f"\nPrzetwarzanie {len(self.records)} rekordów...")
+        self.context.check_for_updates()
         
         # Normalizacja
         self.records = self.normalizer.normalize_all_records(self.records)
@@ -108,6 +228,20 @@ class TravelAnalyzer:
         # Kategoryzacja
         self.records = self.categorizer.categorize_all_records(self.records)
     
+    def verify_rules(self, fuzz: int = 0) -> int:
+        """Porównuje tablicę decyzyjną z łańcuchem strategii na wszystkich latach - zwraca liczbę rozbieżności
+        
+        fuzz > 0 dodaje porównanie na tylu losowych rekordach złożonych ze słów kluczowych reguł.
+        """
+        print("Weryfikacja tablicy decyzyjnej na całej historii...")
+        records = self.data_loader.load_all_data(as_batch=True)
+        records = self.normalizer.normalize_all_records(records)
+        mismatches = self.categorizer.verify_decision_table(records)
+        if fuzz:
+            print("Weryfikacja tablicy decyzyjnej na losowych rekordach...")
+            mismatches += self.categorizer.fuzz_decision_table(fuzz)
+        return mismatches
+    
     def _generate_statistics(self) -> None:
         """Generuje statystyki"""
         self.stats.update_category_stats(self.records)
@@ -119,11 +253,11 @@ class TravelAnalyzer:
         
         # Eksport zbiorczy
         combined_file = self.config.get_output_file_path("travel_statistics_COMBINED.xlsx")
-        self.exporter.export_combined_file(self.records, combined_file, self.stats)
+        self.exporter.export_combined_file(self.records, combined_file, self.stats, self.rule_trace)
         
         # Eksport roczny  
         records_by_year = self.data_loader.get_records_by_year(self.records)
-        yearly_stats = self.exporter.export_yearly_files(records_by_year, self.config)
+        yearly_stats = self.exporter.export_yearly_files(records_by_year, self.config, self.unchanged_years)
         
         print("Zapisano zbiorczy plik: Wyniki/travel_statistics_COMBINED.xlsx")
         print("\n💾 Zapisywanie plików rocznych...")
@@ -136,12 +270,38 @@ class TravelAnalyzer:
         print("\nZAKOŃCZONO POMyŚLNIE!")
         print("📁 Wszystkie pliki zapisane w folderze: Wyniki/")
         print("   travel_statistics_COMBINED.xlsx - zbiorczy plik")
-        for year in sorted(self.config.SOURCE_FILES.keys()):
+        for year in self.config.get_available_years():
             print(f"   📅 travel_statistics_{year}.xlsx - rok {year}")
     
+    def _build_rule_trace(self) -> None:
+        """Buduje ślad reguł (gdy włączony) - po kategoryzacji, przed eksportem"""
+        self.rule_trace = None
+        if not self.config.RULE_TRACE:
+            return
+        start = time.perf_counter()
+        self.rule_trace = self.categorizer.trace_batch(self.records)
+        print(f"🔎 Ślad reguł: {len(self.rule_trace)} rekordów ({time.perf_counter() - start:.2f} s)")
+        if 'strategy' not in self.rule_trace.columns:
+            print("    Silnik 'chain' - ślad tylko reguł normalizacji (strategie i predykaty są numerami tablicy decyzyjnej)")
+    
+    def _report_strategy_profile(self) -> None:
+        """Wypisuje i zapisuje profil kategoryzacji (gdy profilowanie jest włączone)"""
+        manager = self.categorizer.category_manager
+        profiler = manager.profiler
+        if profiler is None:
+            return
+        self.strategy_profile = manager.get_profile_report()
+        profiler.print_report(manager.decision_table)
+        profile_file = self.config.get_output_file_path(self.config.PROFILE_FILE)
+        try:
+            profiler.write(profile_file, manager.decision_table)
+            print(f"  Raport profilu: {profile_file}")
+        except OSError as e:
+            print(f"  Nie udało się zapisać raportu profilu: {e}")
+    
     def get_records_by_category(self, category: str) -> List[TravelRecord]:
         """Zwraca rekordy dla konkretnej kategorii"""
-        return [r for r in self.records if r.category == category]
+        return self.records.take(self.records.encoded('category') == category).to_records()
     
     def get_unassigned_records(self) -> List[TravelRecord]:
         """Zwraca nieprzypisane rekordy"""
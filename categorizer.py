@@ -5,17 +5,62 @@
 Categorizes travel records using strategy pattern for business rule classification.
 """
 
-from typing import List
-from models import TravelRecord
-from normalizer import TravelNormalizer
-from strategies import CategoryManager
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from config import Config
+from models import TravelRecord, TravelRecordBatch
+from strategies import CategoryManager, StrategyProfiler
+from strategies.decision_table import fuzz_records
+from rule_context import RuleContext
+from rule_pack import RulePack
+from rule_trace import NO_RULE, RuleTrace
+
+# Kolumny wyniku kategoryzacji kombinacji hotel/kierunek
+RESULT_COLUMNS = ('category', 'hotel_normalized', 'destination_normalized')
+
+# Ustawienia przekazywane do procesów puli (przy starcie 'spawn' nie dziedziczą zmian Config)
+WORKER_SETTINGS = ('CATEGORY_VECTORIZED', 'CATEGORY_CACHE_SIZE', 'CATEGORY_CACHE_POLICY', 'CATEGORY_TABLE_MEMO_SIZE',
+                   'NORMALIZATION_CACHE_SIZE', 'CATEGORY_PROFILING')
+
+# Kategoryzator procesu puli - tworzony raz przez inicjalizator, używany dla wszystkich porcji
+_worker_categorizer: Optional['TravelCategorizer'] = None
+
+def _init_worker(pack: RulePack, config_dir: Optional[Path], pack_path: Optional[Path],
+                 engine: str, settings: Dict[str, Any]) -> None:
+    """Inicjalizator procesu puli - normalizator, strategie i tablica decyzyjna budowane raz z paczki rodzica"""
+    global _worker_categorizer
+    for name, value in settings.items():
+        setattr(Config, name, value)
+    context = RuleContext.from_pack(pack, config_dir, pack_path)
+    _worker_categorizer = TravelCategorizer(context, engine=engine)
+
+def _categorize_chunk(task: Tuple[TravelRecordBatch, Optional[np.ndarray]]
+                      ) -> Tuple[Tuple[List[str], List[str], List[str]], Optional[StrategyProfiler], Dict[str, int]]:
+    """Zadanie procesu puli - kategorie i normalizacje porcji różnych kombinacji, profil i liczniki pamięci decyzji porcji"""
+    chunk, records = task
+    results = _worker_categorizer._categorize_unique(chunk, records)
+    category_manager = _worker_categorizer.category_manager
+    return results, category_manager.take_profile(), category_manager.decision_cache.take_counts()
 
 class TravelCategorizer:
     """Klasa do kategoryzacji rekordów podróży - refactored z Strategy Pattern"""
     
-    def __init__(self) -> None:
-        self.normalizer = TravelNormalizer()
-        self.category_manager = CategoryManager(self.normalizer)
+    def __init__(self, context: Optional[RuleContext] = None, engine: Optional[str] = None,
+                 max_workers: Optional[int] = None) -> None:
+        # Normalizator i reguły ze wspólnego kontekstu - ten sam co w analizatorze
+        self.context = context or RuleContext.default()
+        self.normalizer = self.context.normalizer
+        self.category_manager = CategoryManager(self.normalizer, self.context, engine=engine)
+        self.max_workers = max_workers if max_workers is not None else Config.get_category_workers()
+        # Pula procesów z wczytanymi regułami - zostaje między wywołaniami (np. kolejne porcje --chunked)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+        # Procesy puli mają reguły z chwili startu - po przeładowaniu reguł pula jest zamykana
+        self.context.add_listener(lambda old_pack, new_pack: self.close())
     
     def categorize_simple(self, hotel: str, destination: str) -> str:
         """Prosta metoda kategoryzacji dla testowania"""
@@ -46,8 +91,13 @@ class TravelCategorizer:
         # Deleguj kategoryzację do CategoryManager (Strategy Pattern)
         return self.category_manager.categorize_record(record)
     
-    def categorize_all_records(self, records: List[TravelRecord]) -> List[TravelRecord]:
+    def categorize_all_records(self, records: Union[List[TravelRecord], TravelRecordBatch]) -> Union[List[TravelRecord], TravelRecordBatch]:
         """Kategoryzuje wszystkie rekordy"""
+        if isinstance(records, TravelRecordBatch):
+            return self.categorize_batch(records)
+        if self._parallel_workers(len(records)) > 1:
+            return self._categorize_list_parallel(records)
+        
         print("  Kategoryzacja...")
         
         for record in records:
@@ -60,4 +110,246 @@ class TravelCategorizer:
             # Teraz kategoryzuj
             record.category = self.categorize_record(record)
         
-        return records
\ No newline at end of file
+        self._print_cache_stats()
+        return records
+    
+    @staticmethod
+    def _unique_combinations(batch: TravelRecordBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """Pierwszy wiersz każdej różnej kombinacji hotel/kierunek i numer kombinacji każdego wiersza"""
+        # Kategoria zależy tylko od surowych i znormalizowanych wartości hotelu i kierunku
+        key_columns = ('hotel', 'destination', 'hotel_normalized', 'destination_normalized')
+        # Klucz kombinacji składany parami przez factorize (hashowanie, bez sortowania wierszy)
+        inverse = np.zeros(len(batch), dtype=np.int64)
+        for name in key_columns:
+            column = batch.encoded(name)
+            # +1: brak wartości (kod -1) to osobna wartość klucza
+            inverse, _ = pd.factorize(inverse * (len(column.categories) + 1) + column.codes.astype(np.int64) + 1)
+        first_index = np.zeros(inverse.max() + 1 if len(inverse) else 0, dtype=np.int64)
+        # Zapis od końca - zostaje pierwszy wiersz każdej kombinacji
+        first_index[inverse[::-1]] = np.arange(len(inverse) - 1, -1, -1)
+        return first_index, inverse
+    
+    def categorize_batch(self, batch: TravelRecordBatch) -> TravelRecordBatch:
+        """Kategoryzuje zbiór kolumnowy - raz dla każdej różnej kombinacji hotel/kierunek"""
+        print("  Kategoryzacja (kolumnowa)..." if self._vectorized() else "  Kategoryzacja...")
+        first_index, inverse = self._unique_combinations(batch)
+        unique = batch.take(first_index)
+        # Profil liczy trafienia w rekordach - liczba rekordów każdej kombinacji
+        records = np.bincount(inverse, minlength=len(unique)) if self.category_manager.profiler is not None else None
+        
+        workers = self._parallel_workers(len(unique))
+        results = self._categorize_parallel(unique, workers, records) if workers > 1 else None
+        if results is None:
+            results = self._categorize_unique(unique, records)
+        
+        # categorize_record uzupełnia brakujące normalizacje - zapisz je w zbiorze
+        for name, values in zip(RESULT_COLUMNS, results):
+            batch.set_column(name, pd.Categorical(values)[inverse])
+        
+        if self._vectorized():
+            print(f"    Kategoryzacja kolumnowa: {len(unique)} kombinacji hotel/kierunek dla {len(batch)} rekordów "
+                  f"(każda liczona raz, bez pamięci decyzji)")
+        else:
+            self._print_cache_stats(pooled=workers > 1 and self._pool is not None)
+        return batch
+    
+    def _vectorized(self) -> bool:
+        return Config.CATEGORY_VECTORIZED and self.category_manager.engine == 'table'
+    
+    def _categorize_unique(self, unique: TravelRecordBatch,
+                           records: Optional[np.ndarray] = None) -> Tuple[List[str], List[str], List[str]]:
+        """Kategorie i normalizacje dla zbioru, w którym każdy wiersz to inna kombinacja hotel/kierunek
+        
+        records - liczba rekordów każdej kombinacji (tylko dla profilu trybu kolumnowego).
+        """
+        if self._vectorized():
+            return self._categorize_columns(unique, records)
+        
+        # Rekordy (kopie modyfikowalne - categorize_record uzupełnia normalizacje) tylko dla unikalnych kombinacji
+        rows = unique.to_records()
+        categories = [self.categorize_record(row) for row in rows]
+        return (categories, [row.hotel_normalized for row in rows],
+                [row.destination_normalized for row in rows])
+    
+    def _categorize_columns(self, unique: TravelRecordBatch,
+                            records: Optional[np.ndarray] = None) -> Tuple[List[str], List[str], List[str]]:
+        """Kategoryzacja całymi kolumnami - maski cech tablicy decyzyjnej zamiast rekordów"""
+        encoded = self._encode_fields(unique)
+        table = self.category_manager.decision_table
+        profiler = self.category_manager.profiler
+        if profiler is None:
+            categories = table.categorize_encoded(encoded)
+        else:
+            categories = profiler.profile_table(table, encoded, records)
+        normalized = [list(values[codes]) for codes, values in (encoded['hotel'], encoded['destination'])]
+        return list(categories), normalized[0], normalized[1]
+    
+    def _encode_fields(self, unique: TravelRecordBatch) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Pola tablicy decyzyjnej kodowane słownikowo, przekazywane wprost: (kody kombinacji, różne wartości)"""
+        rows = np.arange(len(unique))
+        encoded = {}
+        for field in ('hotel', 'destination'):
+            raw_codes, raw_values = self._encoded_values(unique.encoded(field), rows)
+            codes, values = self._encoded_values(unique.encoded(f'{field}_normalized'), rows)
+            # Brakujące normalizacje uzupełniane jak w categorize_record
+            codes, values = self._fill_normalized(codes, values, raw_codes, raw_values, field)
+            encoded[field] = (codes, values)
+            encoded[f'raw_{field}'] = (raw_codes, np.array([value.lower() if value else '' for value in raw_values],
+                                                           dtype=object))
+        return encoded
+    
+    def _parallel_workers(self, combinations: int) -> int:
+        """Liczba procesów dla danej liczby kombinacji (1 = kategoryzacja w tym procesie)"""
+        if combinations < Config.CATEGORY_PARALLEL_MIN_COMBINATIONS:
+            return 1
+        return self.max_workers
+    
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Zwraca pulę z wczytanymi regułami - procesy startują raz i obsługują kolejne wywołania"""
+        if self._pool is None or self._pool_workers != workers:
+            self.close()
+            settings = {name: getattr(Config, name) for name in WORKER_SETTINGS}
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(self.context.rule_pack, self.context.config_dir, self.context.pack_path,
+                          self.category_manager.engine, settings))
+            self._pool_workers = workers
+        return self._pool
+    
+    def _categorize_parallel(self, unique: TravelRecordBatch, workers: int,
+                             records: Optional[np.ndarray] = None) -> Optional[Tuple[List[str], List[str], List[str]]]:
+        """Kategoryzuje kombinacje porcjami w puli procesów - None gdy pula jest niedostępna
+        
+        Profile porcji (gdy profilowanie jest włączone) i liczniki pamięci decyzji procesów puli
+        są dołączane do profilu i pamięci tego procesu.
+        """
+        # Kilka porcji na proces - wyrównuje obciążenie przy nierównych kosztach kombinacji
+        chunks = [(self._compact(unique.take(rows)), records[rows] if records is not None else None)
+                  for rows in np.array_split(np.arange(len(unique)), workers * 4)]
+        print(f"    ⚡ Równoległa kategoryzacja {len(unique)} kombinacji ({workers} procesów)")
+        try:
+            # map zachowuje kolejność porcji - wynik identyczny z kategoryzacją sekwencyjną
+            parts = list(self._get_pool(workers).map(_categorize_chunk, chunks))
+        except (OSError, BrokenProcessPool) as e:
+            print(f"Kategoryzacja równoległa niedostępna ({e}) - kategoryzuję sekwencyjnie")
+            self.close()
+            return None
+        for _, profile, cache_counts in parts:
+            if profile is not None:
+                self.category_manager.profiler.merge(profile)
+            self.category_manager.decision_cache.add_counts(cache_counts)
+        return tuple([value for part, _, _ in parts for value in part[column]] for column in range(len(RESULT_COLUMNS)))
+    
+    @staticmethod
+    def _compact(chunk: TravelRecordBatch) -> TravelRecordBatch:
+        """Porcja bez nieużywanych wartości słowników - do procesu puli trafiają tylko jej własne teksty"""
+        for name in ('hotel', 'destination', 'hotel_normalized', 'destination_normalized'):
+            chunk.set_column(name, chunk.encoded(name).remove_unused_categories())
+        return chunk
+    
+    def _categorize_list_parallel(self, records: List[TravelRecord]) -> List[TravelRecord]:
+        """Lista rekordów kategoryzowana przez zbiór kolumnowy (pula procesów), wyniki wpisane do rekordów"""
+        batch = self.categorize_batch(TravelRecordBatch.from_records(records))
+        for record, *values in zip(records, *(batch.values(name) for name in RESULT_COLUMNS)):
+            record.category, record.hotel_normalized, record.destination_normalized = values
+        return records
+    
+    def close(self) -> None:
+        """Zamyka pulę procesów kategoryzacji (jeśli była uruchomiona)"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_workers = 0
+    
+    @staticmethod
+    def _encoded_values(column: pd.Categorical, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Kody wybranych wierszy i różne wartości kolumny - brak wartości to ostatnia pozycja (None)"""
+        values = np.append(np.asarray(column.categories, dtype=object), None)
+        codes = column.codes[rows].astype(np.intp)
+        return np.where(codes < 0, len(values) - 1, codes), values
+    
+    def _fill_normalized(self, codes: np.ndarray, values: np.ndarray, raw_codes: np.ndarray,
+                         raw_values: np.ndarray, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Uzupełnia puste normalizacje wynikami normalizatora dla wartości surowych"""
+        missing = np.array([not value for value in values], dtype=bool)[codes]
+        if not missing.any():
+            return codes, values
+        
+        # Każda potrzebna wartość surowa normalizowana raz, wyniki dopisane na końcu słownika
+        needed = np.unique(raw_codes[missing])
+        normalized = self.normalizer.normalize_unique([raw_values[code] for code in needed], field)
+        position = np.zeros(len(raw_values), dtype=np.intp)
+        position[needed] = len(values) + np.arange(len(needed))
+        codes = codes.copy()
+        codes[missing] = position[raw_codes[missing]]
+        return codes, np.append(values, np.array(normalized, dtype=object))
+    
+    def trace_batch(self, batch: TravelRecordBatch) -> RuleTrace:
+        """Ślad reguł zbioru: numery reguł normalizacji oraz strategii i predykatu, które wyznaczyły kategorię
+        
+        Reguły normalizacji ustalane raz dla każdej różnej wartości surowej. Strategia i predykat
+        tylko przy silniku tablicy decyzyjnej - raz dla każdej kombinacji hotel/kierunek, tą samą
+        tablicą, która kategoryzowała zbiór. Przy silniku 'chain' ślad strategii jest pomijany.
+        """
+        columns = {}
+        for field in ('hotel', 'destination'):
+            column = batch.encoded(field)
+            # Ostatnia pozycja (kod -1) odpowiada brakującej wartości
+            numbers = np.full(len(column.categories) + 1, NO_RULE, dtype=np.int32)
+            numbers[:-1] = self.normalizer.rule_numbers(column.categories, field)
+            columns[f'{field}_rule'] = numbers[column.codes]
+        
+        pack = self.context.rule_pack
+        legend = {
+            'hotel_rule': [f"{pattern} → {value}" for pattern, value in pack.hotel_rules.items()],
+            'destination_rule': [f"{pattern} → {value}" for pattern, value in pack.destination_rules.items()]
+        }
+        if self.category_manager.engine == 'table':
+            table = self.category_manager.decision_table
+            first_index, inverse = self._unique_combinations(batch)
+            strategies, predicates = table.trace_encoded(self._encode_fields(batch.take(first_index)))
+            columns.update(strategy=strategies[inverse], predicate=predicates[inverse])
+            legend.update(strategy=[block.name for block in table.blocks],
+                          predicate=[table.describe_predicate(number) for number in range(len(table.predicates))])
+        return RuleTrace(columns, legend)
+    
+    def verify_decision_table(self, batch: TravelRecordBatch) -> int:
+        """Sprawdza, czy tablica decyzyjna daje te same kategorie co łańcuch strategii - zwraca liczbę rozbieżności"""
+        first_index, _ = self._unique_combinations(batch)
+        
+        mismatches = self.category_manager.verify_decision_table(batch.take(first_index).to_records())
+        print(f"  Sprawdzono {len(first_index)} kombinacji hotel/kierunek ({len(batch)} rekordów)")
+        return self._report_mismatches(mismatches)
+    
+    def fuzz_decision_table(self, count: int, seed: int = 7) -> int:
+        """To samo porównanie na losowych rekordach ze słów kluczowych reguł - zwraca liczbę rozbieżności"""
+        records = fuzz_records(self.category_manager.decision_table, count, seed)
+        mismatches = self.category_manager.verify_decision_table(records)
+        print(f"  Sprawdzono {count} losowych rekordów ze słów kluczowych reguł (ziarno {seed})")
+        return self._report_mismatches(mismatches)
+    
+    @staticmethod
+    def _report_mismatches(mismatches: List[Tuple[TravelRecord, str, str]]) -> int:
+        for record, expected, actual in mismatches[:20]:
+            print(f"    ❌ {record.hotel!r} / {record.destination!r}: łańcuch {expected}, tablica {actual}")
+        if mismatches:
+            print(f"  ❌ Rozbieżności: {len(mismatches)}")
+        else:
+            print("  ✅ Tablica decyzyjna zgodna z łańcuchem strategii")
+        return len(mismatches)
+    
+    def _print_cache_stats(self, pooled: bool = False) -> None:
+        """Wypisuje skuteczność pamięci kategoryzacji rekordami: decyzji i (silnik 'table') masek pól
+        
+        pooled - zbiór kategoryzowały procesy puli: liczniki pamięci decyzji są z nich zsumowane,
+        maski pól zostają w procesach puli i nie są wypisywane.
+        """
+        stats = self.category_manager.get_cache_stats()
+        if stats['hits'] + stats['misses']:
+            source = " w procesach puli" if pooled else ""
+            print(f"    Pamięć decyzji kategorii{source}: {stats['hits']} trafień, {stats['misses']} chybień "
+                  f"({stats['hit_rate'] * 100:.1f}% trafień, {stats['evictions']} usuniętych)")
+            if self.category_manager.engine == 'table' and not pooled:
+                memo = self.category_manager.decision_table.get_memo_stats()
+                print(f"    Pamięć masek tablicy decyzyjnej: {memo['values']} wartości pól "
+                      f"({memo['clears']} opróżnień po przepełnieniu)")
@@ -6,8 +6,9 @@ Central configuration management for the travel analytics system.
 """
 
 import os
+import re
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class Config:
     """Centralna konfiguracja systemu"""
@@ -16,23 +17,65 @@ class Config:
     BASE_DIR = Path(__file__).parent  # liczenie_rok
     DATA_DIR = BASE_DIR / "Dane" / "przetworzone"  # Dane wyczyszczone i znormalizowane
     RESULTS_DIR = BASE_DIR / "Wyniki"
+    CACHE_DIR = BASE_DIR / "Dane" / "cache"  # Cache sparsowanych tabel rocznych
+    STATE_DIR = BASE_DIR / "Dane" / "stan"  # Przetworzone rekordy dla trybu przyrostowego
+    CONFIG_DIR = BASE_DIR / "config"  # Reguły normalizacji i kategoryzacji
+    RULE_PACK_FILE = CACHE_DIR / "reguly.json"  # Zwalidowane reguły (przebudowywane po zmianie JSON lub kodu paczki)
     
-    # Pliki źródłowe - dane przetworzone (wyczyszczone i znormalizowane)
-    SOURCE_FILES: Dict[int, str] = {
-        2019: "rok_2019_processed.xls",
-        2020: "rok_2020_processed.xls", 
-        2021: "rok_2021_processed.xls",
-        2022: "rok_2022_processed.xls",
-        2023: "rok_2023_processed.xls",
-        2024: "rok_2024_processed.xls",
-        2025: "rok_2025_processed.xls"
-    }
+    # Pliki źródłowe są wykrywane automatycznie w DATA_DIR (rok z nazwy pliku).
+    # Wpisy tutaj nadpisują wykrywanie, np. {2019: "rok_2019_processed.xls"}
+    SOURCE_FILES: Dict[int, str] = {}
+    
+    # Rozpoznawane rozszerzenia - przy kilku plikach dla roku wygrywa wcześniejsze (szybszy czytnik)
+    SOURCE_EXTENSIONS: List[str] = ['.parquet', '.feather', '.arrow', '.csv', '.xlsx', '.xls', '.html', '.htm']
+    
+    # Wczytywanie równoległe - liczba procesów puli (None = liczba rdzeni, 1 = sekwencyjnie)
+    LOAD_WORKERS: Optional[int] = None
+    
+    # Wczytywanie porcjami - liczba wierszy w porcji: tryb --chunked i parsowanie eksportów HTML, wyznacza szczyt pamięci
+    CHUNK_SIZE: int = 50000
+    
+    # Cache sparsowanych plików (lata bez zmian nie są parsowane ponownie)
+    USE_CACHE: bool = True
+    
+    # Pamięć wyników normalizacji - maks. liczba zapamiętanych surowych wartości (osobno hotele i kierunki)
+    NORMALIZATION_CACHE_SIZE: int = 50000
+    
+    # Pamięć decyzji kategoryzacji - maks. liczba kombinacji hotel/kierunek i polityka usuwania ('lru' lub 'fifo').
+    # Tylko kategoryzacja rekordami (CATEGORY_VECTORIZED = False lub silnik 'chain') - tryb kolumnowy
+    # liczy każdą kombinację zbioru raz i z niej nie korzysta
+    CATEGORY_CACHE_SIZE: int = 100000
+    CATEGORY_CACHE_POLICY: str = 'lru'
+    # Pamięć masek cech tablicy decyzyjnej w trybie rekordowym - maks. liczba wartości na pole
+    CATEGORY_TABLE_MEMO_SIZE: int = 100000
+    # Silnik kategoryzacji: 'table' (skompilowana tablica decyzyjna) lub 'chain' (łańcuch strategii)
+    CATEGORY_ENGINE: str = 'table'
+    # Kategoryzacja zbiorów kolumnowych całymi kolumnami (maski tablicy decyzyjnej zamiast rekordów)
+    CATEGORY_VECTORIZED: bool = True
+    # Kategoryzacja równoległa - liczba procesów puli (None = liczba rdzeni, 1 = sekwencyjnie)
+    CATEGORY_WORKERS: Optional[int] = None
+    # Minimalna liczba różnych kombinacji hotel/kierunek, od której opłaca się uruchomić pulę
+    CATEGORY_PARALLEL_MIN_COMBINATIONS: int = 20000
+    # Profil kategoryzacji - raport na końcu analizy. Mierzy silnik, który działa: bloki i wiersze
+    # tablicy decyzyjnej (CATEGORY_ENGINE='table') lub strategie i gałęzie fallbacku ('chain')
+    CATEGORY_PROFILING: bool = False
+    PROFILE_FILE: str = 'profil_strategii.json'
+    
+    # Ślad reguł - numery reguł normalizacji, strategii i predykatu dla każdego rekordu,
+    # eksportowane w pliku zbiorczym obok arkusza wszystkich danych
+    RULE_TRACE: bool = False
+    
+    # Odrzucone wiersze źródłowe (plik, wiersz, powód) - zapisywane w RESULTS_DIR
+    QUARANTINE_FILE: str = 'odrzucone_wiersze.csv'
     
     # Kolumny wymagane
     REQUIRED_COLUMNS: List[str] = [
         'Lp.', 'Nr rez.', 'Klient ID', 'Data utworzenia', 'Kierunek', 'Hotel'
     ]
     
+    # Format kolumny 'Data utworzenia' w eksportach systemu rezerwacji
+    DATE_FORMAT: str = '%d.%m.%Y'
+    
     # Arkusze wyjściowe
     OUTPUT_SHEETS: Dict[str, str] = {
         'monthly': 'Statystyki_Miesięczne',
@@ -40,6 +83,8 @@ class Config:
         'training': 'Szkolenia_Sprzęt',
         'unassigned': 'Nieprzypisane',
         'all_data': 'Wszystkie_Dane',
+        'trace': 'Ślad_Reguł',
+        'trace_legend': 'Legenda_Śladu',
         'normalized': 'Znormalizowane_Dane',
         'stats_table': 'stat_COMBINED'
     }
@@ -88,13 +133,56 @@ class Config:
         """Tworzy katalogi jeśli nie istnieją"""
         cls.RESULTS_DIR.mkdir(exist_ok=True)
         
+    @classmethod
+    def get_load_workers(cls) -> int:
+        """Zwraca liczbę procesów do równoległego wczytywania plików"""
+        if cls.LOAD_WORKERS is not None:
+            return max(1, cls.LOAD_WORKERS)
+        return os.cpu_count() or 1
+        
+    @classmethod
+    def get_category_workers(cls) -> int:
+        """Zwraca liczbę procesów do równoległej kategoryzacji"""
+        if cls.CATEGORY_WORKERS is not None:
+            return max(1, cls.CATEGORY_WORKERS)
+        return os.cpu_count() or 1
+        
+    @classmethod
+    def get_source_files(cls) -> Dict[int, Path]:
+        """Wykrywa pliki źródłowe w DATA_DIR - {rok: ścieżka}, rok z nazwy pliku"""
+        found: Dict[int, Path] = {}
+        if cls.DATA_DIR.exists():
+            for path in sorted(cls.DATA_DIR.iterdir()):
+                extension = path.suffix.lower()
+                if not path.is_file() or extension not in cls.SOURCE_EXTENSIONS:
+                    continue
+                match = re.search(r'(?<!\d)(?:19|20)\d{2}(?!\d)', path.stem)
+                if not match:
+                    continue
+                
+                year = int(match.group())
+                current = found.get(year)
+                if (current is None or
+                        cls.SOURCE_EXTENSIONS.index(extension) < cls.SOURCE_EXTENSIONS.index(current.suffix.lower())):
+                    found[year] = path
+        
+        for year, filename in cls.SOURCE_FILES.items():
+            found[year] = cls.DATA_DIR / filename
+        
+        return dict(sorted(found.items()))
+    
+    @classmethod
+    def get_available_years(cls) -> List[int]:
+        """Zwraca posortowane lata, dla których istnieją pliki źródłowe"""
+        return list(cls.get_source_files().keys())
+        
     @classmethod
     def get_source_file_path(cls, year: int) -> Path:
         """Zwraca pełną ścieżkę do pliku źródłowego"""
-        filename = cls.SOURCE_FILES.get(year)
-        if not filename:
-            raise ValueError(f"Brak konfiguracji dla roku {year}")
-        return cls.DATA_DIR / filename
+        file_path = cls.get_source_files().get(year)
+        if not file_path:
+            raise ValueError(f"Brak pliku źródłowego dla roku {year}")
+        return file_path
         
     @classmethod
     def get_output_file_path(cls, filename: str) -> Path:
@@ -5,20 +5,46 @@
 Handles loading and parsing travel data from Excel/HTML files.
 """
 
+import time
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict, Set, Optional, Any
-from models import TravelRecord
+from typing import Iterator, List, Dict, Set, Optional, Any, Tuple, Union
+from models import TravelRecord, TravelRecordBatch
 from config import Config
+from table_cache import TableCache
+from quarantine import RejectedRow, RowQuarantine
+from source_readers import detect_format, read_source_table, iter_source_chunks, COLUMNAR_FORMATS
 
 class DataLoader:
     """Klasa odpowiedzialna za wczytywanie danych"""
     
-    def __init__(self) -> None:
+    # Numer wiersza danych w pliku źródłowym (od 1) - do lokalizacji odrzuconych wierszy
+    SOURCE_ROW_COLUMN = 'Wiersz pliku'
+    
+    def __init__(self, max_workers: Optional[int] = None) -> None:
         self.config = Config()
+        # Liczba procesów do równoległego wczytywania lat (None = z konfiguracji)
+        self.max_workers = max_workers if max_workers is not None else self.config.get_load_workers()
+        # Cache sparsowanych tabel rocznych (klucz: rozmiar, mtime i hash pliku)
+        self.use_cache = self.config.USE_CACHE
+        self.cache = TableCache(self.config.CACHE_DIR)
+        # Odrzucone wiersze bieżącego etapu wczytywania
+        self.quarantine = RowQuarantine()
     
     def load_year_data(self, year: int) -> List[TravelRecord]:
         """Wczytuje dane z pojedynczego roku"""
+        return self.load_year_batch(year).to_records()
+    
+    def load_year_batch(self, year: int) -> TravelRecordBatch:
+        """Wczytuje dane z pojedynczego roku jako zbiór kolumnowy"""
+        batch, rejected = self._load_year(year)
+        self.quarantine.extend(rejected)
+        return batch
+    
+    def _load_year(self, year: int) -> Tuple[TravelRecordBatch, List[RejectedRow]]:
+        """Wczytuje rok - zwraca zbiór i odrzucone wiersze (wynik przekazywany z procesu puli)"""
         file_path = self.config.get_source_file_path(year)
         
         if not file_path.exists():
@@ -27,114 +53,234 @@ class DataLoader:
         print(f"  📄 Przetwarzam {file_path.name} (rok {year})")
         
         try:
-            # Wczytaj HTML jako tabelę (pliki są w formacie HTML, nie Excel)
-            df_list = pd.read_html(str(file_path), encoding='utf-8')
-            df = df_list[0]
+            file_format = detect_format(file_path)
+            extracted_data = self._load_year_table(year, file_path, file_format)
+            if extracted_data is None:
+                return TravelRecordBatch.empty(), []
             
-            # Jeśli kolumny to liczby, pierwszy wiersz to nazwy
-            if df.columns.tolist() == list(range(len(df.columns))):
-                df.columns = df.iloc[0] 
-                df = df.drop(df.index[0]).reset_index(drop=True)
+            # Konwertuj kolumnowo, rok wymuszony z nazwy pliku
+            batch, rejected = self._to_batch(extracted_data, year, file_path)
             
-            # Inteligentne mapowanie kolumn (jak w oryginalnym kodzie)
-            column_mapping = self._map_columns(df.columns)
-            if not column_mapping:
-                print(f"    Nie znaleziono żadnych kolumn w roku {year}")
-                return []
-            
-            # Wyciągnij dane
-            available_cols = [col for col in column_mapping.values() if col in df.columns]
-            if not available_cols:
-                print(f"    Brak dostępnych kolumn w roku {year}")
-                return []
-                
-            extracted_data = df[available_cols].copy()
-            # Zmapuj nazwy kolumn
-            reverse_mapping = {v: k for k, v in column_mapping.items() if v in available_cols}
-            extracted_data.columns = [reverse_mapping.get(col, col) for col in extracted_data.columns]
+            print(f"    Wyciągnięto {len(batch)} rekordów")
+            return batch, rejected
             
-            # Dodaj rok i oczyść dane
-            extracted_data['Rok'] = year
-            extracted_data = extracted_data.dropna(how='all')
+        except Exception as e:
+            print(f"Błąd wczytywania roku {year}: {e}")
+            return TravelRecordBatch.empty(), []
+    
+    def _to_batch(self, extracted_data: pd.DataFrame, year: int, file_path: Path) -> Tuple[TravelRecordBatch, List[RejectedRow]]:
+        """Konwertuje tabelę na zbiór - odrzucone wiersze trafiają do kwarantanny zamiast na ekran"""
+        batch, rejected = TravelRecordBatch.from_frame(extracted_data, year)
+        source_rows = extracted_data[self.SOURCE_ROW_COLUMN].to_numpy()
+        return batch, [RejectedRow(file_path.name, year, int(source_rows[pos]), reason)
+                       for pos, reason in sorted(rejected.items())]
+    
+    def report_load_stage(self, loaded: int, elapsed: float) -> None:
+        """Podsumowanie etapu wczytywania - przepustowość i kwarantanna (zapisywana raz, usuwana gdy pusta)"""
+        rate = loaded / elapsed if elapsed > 0 else float('inf')
+        print(f"  ⏱️  Wczytano {loaded} rekordów w {elapsed:.2f} s ({rate:,.0f} rekordów/s)")
+        
+        quarantine_file = self.config.get_output_file_path(self.config.QUARANTINE_FILE)
+        if self.quarantine:
+            try:
+                self.quarantine.write(quarantine_file)
+                print(f"  ⚠️  Odrzucono {len(self.quarantine)} wierszy - szczegóły: {quarantine_file}")
+            except OSError as e:
+                print(f"  ⚠️  Odrzucono {len(self.quarantine)} wierszy (nie udało się zapisać kwarantanny: {e})")
+            for file_name, count in sorted(self.quarantine.counts_by_file().items()):
+                print(f"     - {file_name}: {count}")
+        else:
+            # Plik z poprzedniego przebiegu opisywałby wiersze, których już nie ma
+            try:
+                quarantine_file.unlink(missing_ok=True)
+            except OSError as e:
+                print(f"  ⚠️  Nie udało się usunąć nieaktualnej kwarantanny {quarantine_file}: {e}")
+        self.quarantine.clear()
+    
+    def _load_year_table(self, year: int, file_path: Path, file_format: str) -> Optional[pd.DataFrame]:
+        """Zwraca wyciągniętą tabelę 6 kolumn - z cache jeśli plik się nie zmienił"""
+        # Formaty kolumnowe czytane są szybciej niż cache - bez cache
+        if not self.use_cache or file_format in COLUMNAR_FORMATS:
+            return self._extract_year_table(year, file_path, file_format)
+        
+        fingerprint = self.cache.fingerprint(file_path)
+        cached = self.cache.load(year, fingerprint)
+        if cached is not None:
+            print(f"    ♻️  Tabela z cache ({len(cached)} wierszy)")
+            return cached
+        
+        extracted_data = self._extract_year_table(year, file_path, file_format)
+        if extracted_data is not None:
+            self.cache.store(year, fingerprint, extracted_data)
+        return extracted_data
+    
+    def _extract_year_table(self, year: int, file_path: Path, file_format: str) -> Optional[pd.DataFrame]:
+        """Parsuje plik źródłowy i wyciąga tabelę 6 wymaganych kolumn"""
+        # Pliki .xls są zwykle HTML-em - format rozpoznany po zawartości
+        df = self._promote_header(read_source_table(file_path, file_format))
+        return self._prepare_table(df, year)
+    
+    def _promote_header(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Jeśli kolumny to liczby, pierwszy wiersz to nazwy"""
+        if df.columns.tolist() == list(range(len(df.columns))):
+            df.columns = df.iloc[0] 
+            df = df.drop(df.index[0]).reset_index(drop=True)
+        return df
+    
+    def _prepare_table(self, df: pd.DataFrame, year: int) -> Optional[pd.DataFrame]:
+        """Wyciąga 6 wymaganych kolumn, dodaje rok i usuwa puste wiersze oraz powtórzone nagłówki"""
+        # Inteligentne mapowanie kolumn (jak w oryginalnym kodzie)
+        column_mapping = self._map_columns(df.columns)
+        if not column_mapping:
+            print(f"    Nie znaleziono żadnych kolumn w roku {year}")
+            return None
+        
+        # Wyciągnij dane
+        available_cols = [col for col in column_mapping.values() if col in df.columns]
+        if not available_cols:
+            print(f"    Brak dostępnych kolumn w roku {year}")
+            return None
             
-            # Usuń wiersze nagłówków
-            mask = extracted_data.get('Hotel', pd.Series()).astype(str).str.contains(
-                'nr rez|hotel|kierunek|klient', case=False, na=False
-            )
-            if mask.any():
-                extracted_data = extracted_data[~mask]
+        extracted_data = df[available_cols].copy()
+        # Zmapuj nazwy kolumn
+        reverse_mapping = {v: k for k, v in column_mapping.items() if v in available_cols}
+        extracted_data.columns = [reverse_mapping.get(col, col) for col in extracted_data.columns]
+        
+        # Dodaj rok i numer wiersza pliku, oczyść dane
+        extracted_data['Rok'] = year
+        extracted_data[self.SOURCE_ROW_COLUMN] = df.index + 1
+        extracted_data = extracted_data.dropna(how='all')
+        
+        # Usuń wiersze nagłówków
+        mask = extracted_data.get('Hotel', pd.Series()).astype(str).str.contains(
+            'nr rez|hotel|kierunek|klient', case=False, na=False
+        )
+        if mask.any():
+            extracted_data = extracted_data[~mask]
+        
+        return extracted_data.reset_index(drop=True)
+    
+    def iter_year_batches(self, year: int, chunk_size: Optional[int] = None) -> Iterator[TravelRecordBatch]:
+        """Wczytuje rok porcjami - zbiory po chunk_size wierszy pliku, bez tabeli całego roku w pamięci"""
+        chunk_size = chunk_size or self.config.CHUNK_SIZE
+        file_path = self.config.get_source_file_path(year)
+        
+        if not file_path.exists():
+            raise FileNotFoundError(f"Brak pliku: {file_path}")
+        
+        print(f"  📄 Przetwarzam porcjami {file_path.name} (rok {year}, po {chunk_size} wierszy)")
+        
+        header = None
+        total = 0
+        rows_read = 0
+        for chunk in iter_source_chunks(file_path, detect_format(file_path), chunk_size):
+            # Nagłówek z pierwszego wiersza pliku obowiązuje we wszystkich porcjach
+            if header is None:
+                chunk = self._promote_header(chunk)
+                header = chunk.columns
+            elif chunk.columns.tolist() == list(range(len(chunk.columns))):
+                chunk.columns = header
             
-            # Konwertuj na TravelRecord
-            records = []
-            for _, row in extracted_data.iterrows():
-                try:
-                    # Mapuj kolumny na TravelRecord - tylko 6 wymaganych kolumn
-                    record_data = {
-                        'Lp.': row.get('Lp.'),
-                        'Nr rez.': row.get('Nr rez.', ''),
-                        'Klient ID': row.get('Klient ID', ''),
-                        'Data utworzenia': row.get('Data utworzenia'),
-                        'Kierunek': row.get('Kierunek', ''),
-                        'Hotel': row.get('Hotel', '')
-                    }
-                    
-                    record = TravelRecord.from_series(pd.Series(record_data))
-                    record.year = year  # Force year z nazwy pliku
-                    records.append(record)
-                except Exception as e:
-                    print(f"Błąd w rekordzie roku {year}: {e}")
-                    continue
+            # Numeracja wierszy ciągła w całym pliku
+            chunk = chunk.set_axis(pd.RangeIndex(rows_read, rows_read + len(chunk)))
+            rows_read += len(chunk)
+            extracted_data = self._prepare_table(chunk, year)
+            if extracted_data is None:
+                return
             
-            print(f"    Wyciągnięto {len(records)} rekordów")
-            return records
+            batch, rejected = self._to_batch(extracted_data, year, file_path)
+            self.quarantine.extend(rejected)
             
-        except Exception as e:
-            print(f"Błąd wczytywania roku {year}: {e}")
-            return []
+            total += len(batch)
+            if len(batch):
+                yield batch
+        
+        print(f"    Wyciągnięto {total} rekordów ({rows_read} wierszy pliku)")
     
-    def load_all_data(self) -> List[TravelRecord]:
+    def iter_batches(self, years: List[int], chunk_size: Optional[int] = None) -> Iterator[TravelRecordBatch]:
+        """Wczytuje kolejne lata porcjami (sekwencyjnie, w kolejności lat)"""
+        start = time.perf_counter()
+        loaded = 0
+        for year in sorted(years):
+            try:
+                for batch in self.iter_year_batches(year, chunk_size):
+                    loaded += len(batch)
+                    yield batch
+            except Exception as e:
+                print(f"Błąd wczytywania roku {year}: {e}")
+        
+        # Czas obejmuje też przetwarzanie porcji przez konsumenta
+        self.report_load_stage(loaded, time.perf_counter() - start)
+    
+    def load_all_data(self, as_batch: bool = False) -> Union[List[TravelRecord], TravelRecordBatch]:
         """Wczytuje dane ze wszystkich lat"""
-        print("📁 Wczytywanie danych z 6 plików...")
+        available_years = self.config.get_available_years()
+        print(f"📁 Wczytywanie danych z {len(available_years)} plików...")
         
-        all_records = []
-        for year in sorted(self.config.SOURCE_FILES.keys()):
-            year_records = self.load_year_data(year)
-            all_records.extend(year_records)
+        all_records = self._load_years(available_years, as_batch)
         
-        print(f"Łącznie wczytano {len(all_records)} rekordów z {len(self.config.SOURCE_FILES)} lat")
+        print(f"Łącznie wczytano {len(all_records)} rekordów z {len(available_years)} lat")
         return all_records
     
-    def load_single_year(self, year: int) -> List[TravelRecord]:
+    def load_single_year(self, year: int, as_batch: bool = False) -> Union[List[TravelRecord], TravelRecordBatch]:
         """Wczytuje dane z pojedynczego roku"""
         print(f"📁 Wczytywanie danych tylko z roku {year}...")
         
-        if year not in self.config.SOURCE_FILES:
-            print(f"Rok {year} nie jest zdefiniowany w konfiguracji")
-            print(f"Dostępne lata: {sorted(self.config.SOURCE_FILES.keys())}")
-            return []
+        if year not in self.config.get_available_years():
+            print(f"Brak pliku źródłowego dla roku {year}")
+            print(f"Dostępne lata: {self.config.get_available_years()}")
+            return TravelRecordBatch.empty() if as_batch else []
         
-        records = self.load_year_data(year)
+        records = self._load_years([year], as_batch)
         print(f"Wczytano {len(records)} rekordów z roku {year}")
         return records
     
-    def load_selected_years(self, years: List[int]) -> List[TravelRecord]:
+    def load_selected_years(self, years: List[int], as_batch: bool = False) -> Union[List[TravelRecord], TravelRecordBatch]:
         """Wczytuje dane z wybranych lat"""
         print(f"📁 Wczytywanie danych z lat: {', '.join(map(str, years))}...")
         
-        all_records = []
+        known_years = self.config.get_available_years()
+        available_years = []
         for year in sorted(years):
-            if year not in self.config.SOURCE_FILES:
-                print(f"Rok {year} nie jest zdefiniowany w konfiguracji - pomijam")
+            if year not in known_years:
+                print(f"Brak pliku źródłowego dla roku {year} - pomijam")
                 continue
-            
-            year_records = self.load_year_data(year)
-            all_records.extend(year_records)
+            available_years.append(year)
+        
+        all_records = self._load_years(available_years, as_batch)
         
-        print(f"Łącznie wczytano {len(all_records)} rekordów z {len([y for y in years if y in self.config.SOURCE_FILES])} lat")
+        print(f"Łącznie wczytano {len(all_records)} rekordów z {len(available_years)} lat")
         return all_records
     
-    def get_records_by_year(self, records: List[TravelRecord]) -> Dict[int, List[TravelRecord]]:
+    def _load_years(self, years: List[int], as_batch: bool = False) -> Union[List[TravelRecord], TravelRecordBatch]:
+        """Wczytuje podane lata - równolegle w puli procesów, wyniki scalane w kolejności lat"""
+        years = sorted(years)
+        workers = min(self.max_workers, len(years))
+        start = time.perf_counter()
+        
+        if workers <= 1:
+            results = [self._load_year(year) for year in years]
+        else:
+            print(f"  ⚡ Równoległe wczytywanie {len(years)} plików ({workers} procesów)")
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    # map zachowuje kolejność lat niezależnie od kolejności zakończenia
+                    results = list(executor.map(self._load_year, years))
+            except (OSError, BrokenProcessPool) as e:
+                print(f"Wczytywanie równoległe niedostępne ({e}) - wczytuję sekwencyjnie")
+                results = [self._load_year(year) for year in years]
+        
+        for _, rejected in results:
+            self.quarantine.extend(rejected)
+        batch = TravelRecordBatch.concat([year_batch for year_batch, _ in results])
+        self.report_load_stage(len(batch), time.perf_counter() - start)
+        return batch if as_batch else batch.to_records()
+    
+    def get_records_by_year(self, records: Union[List[TravelRecord], TravelRecordBatch]) -> Dict[int, Union[List[TravelRecord], TravelRecordBatch]]:
         """Grupuje rekordy po latach"""
+        if isinstance(records, TravelRecordBatch):
+            return records.split_by_year()
+        
         by_year: Dict[int, List[TravelRecord]] = {}
         for record in records:
             year = record.year
@@ -143,9 +289,11 @@ class DataLoader:
             by_year[year].append(record)
         return by_year
     
-    def validate_data_integrity(self, records: List[TravelRecord], expected_years: Optional[Set[int]] = None) -> bool:
+    def validate_data_integrity(self, records: Union[List[TravelRecord], TravelRecordBatch], expected_years: Optional[Set[int]] = None) -> bool:
         """Sprawdza integralność danych"""
         issues: List[str] = []
+        is_batch = isinstance(records, TravelRecordBatch)
+        record_years = set(records.values('year')) if is_batch else {r.year for r in records}
         
         # Sprawdź czy są rekordy
         if not records:
@@ -153,15 +301,15 @@ class DataLoader:
         
         # Sprawdź lata tylko jeśli podano oczekiwane lata
         if expected_years is not None:
-            years = {r.year for r in records}
+            years = record_years
             missing_years = expected_years - years
             if missing_years:
                 issues.append(f"Brakujące lata: {missing_years}")
         
         # Sprawdź lata - dla pełnej analizy
         elif expected_years is None:
-            years = {r.year for r in records}
-            all_expected_years = set(self.config.SOURCE_FILES.keys())
+            years = record_years
+            all_expected_years = set(self.config.get_available_years())
             missing_years = all_expected_years - years
             if missing_years:
                 issues.append(f"Brakujące lata: {missing_years}")
@@ -169,8 +317,15 @@ class DataLoader:
             issues.append(f"Brakujące lata: {missing_years}")
         
         # Sprawdź puste pola kluczowe
-        empty_hotels = sum(1 for r in records if not r.hotel or r.hotel.lower() in ['', 'nan', 'brak'])
-        empty_destinations = sum(1 for r in records if not r.destination or r.destination.lower() in ['', 'nan', 'brak'])
+        def is_empty(value: Optional[str]) -> bool:
+            return not value or value.lower() in ['', 'nan', 'brak']
+        
+        if is_batch:
+            empty_hotels = records.count_where('hotel', is_empty)
+            empty_destinations = records.count_where('destination', is_empty)
+        else:
+            empty_hotels = sum(1 for r in records if is_empty(r.hotel))
+            empty_destinations = sum(1 for r in records if is_empty(r.destination))
         
         if empty_hotels > len(records) * 0.1:  # Więcej niż 10%
             issues.append(f"Zbyt wiele pustych hoteli: {empty_hotels}/{len(records)}")
@@ -9,9 +9,10 @@ Factory pattern dla różnych typów eksportu.
 
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict
-from models import TravelRecord, ProcessingStats, YearlyStats
+from typing import List, Dict, Union, Optional, Set
+from models import TravelRecord, TravelRecordBatch, ProcessingStats, YearlyStats
 from config import Config
+from rule_trace import RuleTrace
 
 class ExcelExporter:
     """Klasa do eksportu wyników do Excel"""
@@ -19,12 +20,13 @@ class ExcelExporter:
     def __init__(self) -> None:
         self.config = Config()
     
-    def export_combined_file(self, records: List[TravelRecord], file_path: Path, stats: ProcessingStats) -> None:
-        """Eksportuje zbiorczy plik z wszystkimi danymi"""
+    def export_combined_file(self, records: Union[List[TravelRecord], TravelRecordBatch], file_path: Path, stats: ProcessingStats,
+                             trace: Optional[RuleTrace] = None) -> None:
+        """Eksportuje zbiorczy plik z wszystkimi danymi (i śladem reguł, jeśli podany)"""
         print("💾 Zapisywanie zbiorcze go pliku...")
         
         # Przygotuj dane
-        df_all = pd.DataFrame([record.to_dict() for record in records])
+        df_all = self._records_to_frame(records)
         
         # Sortuj po kategorii
         df_all = df_all.sort_values('Kategoria')
@@ -45,6 +47,10 @@ class ExcelExporter:
             # Wszystkie dane
             self._create_all_data_sheet(df_all, writer)
             
+            # Ślad reguł obok wszystkich danych (Config.RULE_TRACE)
+            if trace is not None:
+                self._create_trace_sheets(df_all, trace, writer)
+            
             # Znormalizowany arkusz
             self._create_normalized_sheet(df_all, writer)
             
@@ -52,31 +58,42 @@ class ExcelExporter:
             self._create_stats_table_sheet(df_all, writer)
         
         print(f"    📅 Używam faktycznych dat utworzenia dla tabeli zbiorcze j")
-        records_with_dates = len([r for r in records if r.date_created])
+        records_with_dates = int(df_all['Data utworzenia'].notna().sum())
         print(f"    Znaleziono {records_with_dates} rekordów z datami")
         print("  📅 Zapisano zbiorczą tabelę miesięczną")
         print("  Zapisano główne statystyki roczne") 
         print("  Zapisano statystyki szkoleń i sprzętu")
         print(f"  Zapisano {stats.unassigned_records} nieprzypisanych rekordów")
-        print("  Zapisano 3440 wszystkich rekordów (sortowane po kategorii)")
+        print(f"  Zapisano {len(df_all)} wszystkich rekordów (sortowane po kategorii)")
     
-    def export_yearly_files(self, records_by_year: Dict[int, List[TravelRecord]], config: Config) -> List[YearlyStats]:
-        """Eksportuje pliki roczne"""
+    def export_yearly_files(self, records_by_year: Dict[int, Union[List[TravelRecord], TravelRecordBatch]], config: Config,
+                            unchanged_years: Optional[Set[int]] = None) -> List[YearlyStats]:
+        """Eksportuje pliki roczne (istniejące pliki lat bez zmian nie są nadpisywane)"""
         yearly_stats = []
         
         for year in sorted(records_by_year.keys()):
-            year_records = records_by_year[year]
+            # Jedna konwersja na DataFrame na rok - wspólna dla statystyk i eksportu
+            df_year = self._records_to_frame(records_by_year[year])
             file_path = config.get_output_file_path(f"travel_statistics_{year}.xlsx")
             
             # Statystyki roku
-            stats = self._calculate_yearly_stats(year, year_records)
+            stats = self._calculate_yearly_stats(year, df_year)
             yearly_stats.append(stats)
             
             # Eksport pliku
-            self._export_single_year_file(year_records, file_path, stats)
+            if unchanged_years and year in unchanged_years and file_path.exists():
+                print(f"    📅 Rok {year} bez zmian - pozostawiam {file_path.name}")
+                continue
+            self._export_single_year_file(df_year, file_path, stats)
         
         return yearly_stats
     
+    def _records_to_frame(self, records: Union[List[TravelRecord], TravelRecordBatch]) -> pd.DataFrame:
+        """Zamienia rekordy na DataFrame - zbiór kolumnowy bez konwersji rekord → słownik"""
+        if isinstance(records, TravelRecordBatch):
+            return records.to_frame()
+        return pd.DataFrame([record.to_dict() for record in records])
+    
     def _create_monthly_stats_sheet(self, df: pd.DataFrame, writer: pd.ExcelWriter) -> None:
         """Tworzy arkusz statystyk miesięcznych"""
         # Uwzględnij WSZYSTKIE kategorie (łącznie z nieprzypisanymi)
@@ -122,6 +139,14 @@ class ExcelExporter:
         """Tworzy arkusz wszystkich danych"""
         df.to_excel(writer, sheet_name=self.config.OUTPUT_SHEETS['all_data'], index=False)
     
+    def _create_trace_sheets(self, df: pd.DataFrame, trace: RuleTrace, writer: pd.ExcelWriter) -> None:
+        """Tworzy arkusz śladu reguł (wiersze jak w arkuszu wszystkich danych) i jego legendę"""
+        # Indeks df to pozycje rekordów w zbiorze - po sortowaniu wyznacza kolejność wierszy śladu
+        df_trace = trace.to_frame().iloc[df.index.to_numpy()]
+        df_trace.insert(0, 'Nr rez.', df['Nr rez.'].to_numpy())
+        df_trace.to_excel(writer, sheet_name=self.config.OUTPUT_SHEETS['trace'], index=False)
+        trace.legend_frame().to_excel(writer, sheet_name=self.config.OUTPUT_SHEETS['trace_legend'], index=False)
+    
     def _create_normalized_sheet(self, df: pd.DataFrame, writer: pd.ExcelWriter) -> None:
         """Tworzy znormalizowany arkusz z wybranymi kolumnami - tylko 6 kolumn"""
         
@@ -146,40 +171,39 @@ class ExcelExporter:
         
         df_export.to_excel(writer, sheet_name=self.config.OUTPUT_SHEETS['normalized'], index=False)
     
-    def _calculate_yearly_stats(self, year: int, records: List[TravelRecord]) -> YearlyStats:
+    def _calculate_yearly_stats(self, year: int, df: pd.DataFrame) -> YearlyStats:
         """Oblicza statystyki roczne"""
+        categories = df['Kategoria']
+        
         # Główne kategorie
-        main_records = [r for r in records if r.category in self.config.MAIN_CATEGORIES]
+        main_records = int(categories.isin(self.config.MAIN_CATEGORIES).sum())
         
         # Szkolenia/sprzęt
-        training_records = [r for r in records if r.category in self.config.TRAINING_CATEGORIES]
+        training_records = int(categories.isin(self.config.TRAINING_CATEGORIES).sum())
         
         # Nieprzypisane
-        unassigned_records = [r for r in records if r.category == 'Nieprzypisane']
+        unassigned_records = int((categories == 'Nieprzypisane').sum())
         
         # Rozkład miesięczny
-        monthly_dist = {}
-        for record in records:
-            if record.date_created:
-                month = record.month
-                monthly_dist[month] = monthly_dist.get(month, 0) + 1
+        months = df.loc[df['Data utworzenia'].notna(), 'Miesiąc']
+        monthly_dist = {str(month): int(count) for month, count in months.value_counts(sort=False).items()}
         
         return YearlyStats(
             year=year,
-            total_records=len(records),
-            main_records=len(main_records),
-            training_records=len(training_records),
-            unassigned_records=len(unassigned_records),
+            total_records=len(df),
+            main_records=main_records,
+            training_records=training_records,
+            unassigned_records=unassigned_records,
             monthly_distribution=monthly_dist
         )
     
-    def _export_single_year_file(self, records: List[TravelRecord], file_path: Path, stats: YearlyStats) -> None:
+    def _export_single_year_file(self, df: pd.DataFrame, file_path: Path, stats: YearlyStats) -> None:
         """Eksportuje pojedynczy plik roczny"""
         print(f"    📅 Używam faktycznych dat utworzenia dla roku {stats.year}")
         
         # Rekordy z datami
-        records_with_dates = [r for r in records if r.date_created]
-        print(f"    Znaleziono {len(records_with_dates)} rekordów z datami w roku {stats.year}")
+        records_with_dates = int(df['Data utworzenia'].notna().sum())
+        print(f"    Znaleziono {records_with_dates} rekordów z datami w roku {stats.year}")
         
         # Wyświetl rozkład miesięczny
         print(f"    Rozkład miesięczny roku {stats.year}:")
@@ -189,7 +213,6 @@ class ExcelExporter:
                 print(f"      {month}: {count} rekordów")
         
         # Przygotuj dane
-        df = pd.DataFrame([record.to_dict() for record in records])
         df = df.sort_values('Kategoria')
         
         # Eksportuj do Excel
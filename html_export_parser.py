@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""HTML Export Parser
+
+Incremental parser for the fixed-layout HTML tables exported by the booking system.
+"""
+
+import re
+import pandas as pd
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from pandas.io.parsers import TextParser
+from config import Config
+
+# Ta sama normalizacja białych znaków co w pd.read_html
+_WHITESPACE_RE = re.compile(r"[\r\n]+|\s{2,}")
+
+class ExportLayoutError(ValueError):
+    """Plik nie ma układu eksportu systemu rezerwacji (wymagany fallback na read_html)"""
+    pass
+
+class ExportTableParser(HTMLParser):
+    """Parser strumieniowy tabeli <table class="dataframe"> z 6 kolumnami"""
+
+    def __init__(self, expected_columns: List[str]) -> None:
+        super().__init__(convert_charrefs=True)
+        self.expected_columns = expected_columns
+        self.header: List[str] = []
+        self.rows: List[List[str]] = []  # Gotowe wiersze - opróżniane przez konsumenta
+        self.table_found = False
+        self.table_done = False
+        self._in_table = False
+        self._in_thead = False
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+        self._header_row_count = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if self.table_done:
+            return
+
+        if tag == 'table':
+            if self._in_table:
+                raise ExportLayoutError("zagnieżdżona tabela")
+            classes = (dict(attrs).get('class') or '').split()
+            if 'dataframe' in classes:
+                self._in_table = True
+                self.table_found = True
+            return
+
+        if not self._in_table:
+            return
+
+        if tag == 'thead':
+            self._in_thead = True
+        elif tag == 'tr':
+            self._row = []
+        elif tag in ('td', 'th'):
+            if any(name in ('colspan', 'rowspan') for name, _ in attrs):
+                raise ExportLayoutError("scalone komórki (colspan/rowspan)")
+            self._cell = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._in_table:
+            return
+
+        if tag in ('td', 'th') and self._cell is not None and self._row is not None:
+            text = _WHITESPACE_RE.sub(" ", "".join(self._cell)).strip()
+            self._row.append(text)
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self._finish_row(self._row)
+            self._row = None
+        elif tag == 'thead':
+            self._in_thead = False
+        elif tag == 'table':
+            self._in_table = False
+            self.table_done = True
+            if not self.header:
+                raise ExportLayoutError("brak nagłówka tabeli")
+
+    def handle_data(self, data: str) -> None:
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def _finish_row(self, row: List[str]) -> None:
+        """Weryfikuje nagłówek i odkłada wiersz danych"""
+        if self._in_thead or not self.header:
+            self._header_row_count += 1
+            if self._header_row_count > 1:
+                raise ExportLayoutError("wielowierszowy nagłówek")
+            if row != self.expected_columns:
+                raise ExportLayoutError(f"nieoczekiwane kolumny: {row}")
+            self.header = row
+            return
+
+        if len(row) != len(self.header):
+            raise ExportLayoutError(f"wiersz ma {len(row)} komórek zamiast {len(self.header)}")
+        self.rows.append(row)
+
+def iter_export_rows(file_path: Path, block_size: int = 1 << 16) -> Iterator[List[str]]:
+    """Strumieniuje wiersze danych (teksty komórek) bez budowania DOM - pamięć ograniczona do bloku"""
+    parser = ExportTableParser(Config.REQUIRED_COLUMNS)
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while not parser.table_done:
+            block = f.read(block_size)
+            if not block:
+                break
+            parser.feed(block)
+
+            if parser.rows:
+                rows, parser.rows = parser.rows, []
+                yield from rows
+
+    if not parser.table_done:
+        parser.close()
+        if not parser.table_found:
+            raise ExportLayoutError("brak tabeli class=\"dataframe\"")
+        raise ExportLayoutError("niezamknięta tabela")
+
+def rows_to_frame(rows: List[List[str]]) -> pd.DataFrame:
+    """Buduje DataFrame z wierszy tekstowych - typy i wartości NA jak w pd.read_html"""
+    with TextParser([list(Config.REQUIRED_COLUMNS)] + rows, header=0) as parser:
+        return parser.read()
+
+def iter_export_frames(file_path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Porcje eksportu po chunk_size wierszy - teksty komórek trzymane tylko dla bieżącej porcji"""
+    rows: List[List[str]] = []
+    emitted = False
+    for row in iter_export_rows(file_path):
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield rows_to_frame(rows)
+            rows, emitted = [], True
+    if rows or not emitted:
+        yield rows_to_frame(rows)
+
+def read_export_table(file_path: Path, chunk_size: Optional[int] = None) -> pd.DataFrame:
+    """Wczytuje cały plik eksportu parserem strumieniowym
+    
+    Wiersze są zamieniane na tabelę porcjami po Config.CHUNK_SIZE, więc lista tekstów komórek
+    nie obejmuje całego pliku - w pamięci zostaje tylko kolumnowa tabela wyniku.
+    """
+    frames = list(iter_export_frames(file_path, chunk_size or Config.CHUNK_SIZE))
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Incremental Processing Store
+
+Keeps the processed (normalized and categorized) records of every year, so that
+later runs only process reservations that were not seen before.
+"""
+
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+from models import TravelRecordBatch
+from table_cache import write_npz_atomic
+
+class IncrementalStore:
+    """Zapisany stan przetworzonych rekordów każdego roku (tryb przyrostowy)"""
+
+    # Zmiana formatu zapisu = nowa wersja (stare wpisy są ignorowane)
+    STORE_VERSION = 1
+
+    # Wiersz jest "już przetworzony" gdy zgadza się numer rezerwacji, hotel i kierunek
+    MATCH_FIELDS = ('nr_rezerwacji', 'hotel', 'destination')
+
+    def __init__(self, state_dir: Path, config_dir: Path) -> None:
+        self.state_dir = state_dir
+        self.config_dir = config_dir
+        self._rules_fingerprint: Optional[str] = None
+
+    def rules_fingerprint(self) -> str:
+        """Hash wszystkich plików reguł - zmiana reguł unieważnia zapisane kategorie"""
+        if self._rules_fingerprint is None:
+            digest = hashlib.sha256()
+            for rules_file in sorted(self.config_dir.glob("*.json")):
+                digest.update(rules_file.name.encode('utf-8'))
+                digest.update(rules_file.read_bytes())
+            self._rules_fingerprint = digest.hexdigest()
+        return self._rules_fingerprint
+
+    def invalidate_rules_fingerprint(self) -> None:
+        """Wymusza ponowne wyliczenie hashu reguł (po przeładowaniu reguł w trakcie pracy)"""
+        self._rules_fingerprint = None
+
+    def get_state_path(self, year: int) -> Path:
+        """Zwraca ścieżkę zapisanego stanu roku"""
+        return self.state_dir / f"rok_{year}.npz"
+
+    def load(self, year: int) -> Optional[Tuple[TravelRecordBatch, Dict[str, Any]]]:
+        """Zwraca (przetworzone rekordy, odcisk pliku źródłowego) lub None gdy brak ważnego stanu"""
+        state_path = self.get_state_path(year)
+        if not state_path.exists():
+            return None
+
+        try:
+            with np.load(state_path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if (meta.get('version') != self.STORE_VERSION or
+                        meta.get('rules') != self.rules_fingerprint()):
+                    return None
+                return TravelRecordBatch.from_arrays(data), meta['source']
+        except Exception as e:
+            print(f"    Nieczytelny stan przyrostowy roku {year}: {e}")
+            return None
+
+    def save(self, year: int, batch: TravelRecordBatch, source_fingerprint: Dict[str, Any]) -> None:
+        """Zapisuje przetworzone rekordy roku"""
+        arrays = batch.to_arrays()
+        arrays['meta'] = np.array(json.dumps({
+            'version': self.STORE_VERSION,
+            'rules': self.rules_fingerprint(),
+            'source': source_fingerprint
+        }))
+
+        try:
+            write_npz_atomic(self.get_state_path(year), arrays)
+        except OSError as e:
+            print(f"    Nie udało się zapisać stanu przyrostowego roku {year}: {e}")
+
+    def match_processed(self, stored: TravelRecordBatch, fresh: TravelRecordBatch) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Dopasowuje wiersze pliku do zapisanego stanu
+
+        Zwraca (pozycje w pliku już przetworzone, odpowiadające im pozycje w stanie,
+        pozycje nowych wierszy). Powtórzenia tego samego klucza dopasowywane są
+        po kolei, więc dopisany wiersz do istniejącej rezerwacji jest nowy.
+        """
+        def keys(batch: TravelRecordBatch) -> pd.DataFrame:
+            df = pd.DataFrame({name: batch.values(name) for name in self.MATCH_FIELDS})
+            df['occurrence'] = df.groupby(list(self.MATCH_FIELDS)).cumcount()
+            df['position'] = np.arange(len(df))
+            return df
+
+        merged = keys(fresh).merge(
+            keys(stored), on=[*self.MATCH_FIELDS, 'occurrence'], how='left', suffixes=('', '_stored')
+        )
+        matched = merged['position_stored'].notna().to_numpy()
+        fresh_positions = merged['position'].to_numpy()
+
+        return (fresh_positions[matched],
+                merged.loc[matched, 'position_stored'].to_numpy(dtype=int),
+                fresh_positions[~matched])
+
+    def merge(self, fresh: TravelRecordBatch, stored: TravelRecordBatch, processed_new: TravelRecordBatch,
+              old_positions: np.ndarray, stored_positions: np.ndarray, new_positions: np.ndarray) -> TravelRecordBatch:
+        """Uzupełnia wiersze pliku wynikami - ze stanu dla starych, z przetworzenia dla nowych"""
+        for name in ('hotel_normalized', 'destination_normalized', 'category'):
+            values = np.empty(len(fresh), dtype=object)
+            values[old_positions] = np.asarray(stored.encoded(name), dtype=object)[stored_positions]
+            values[new_positions] = np.asarray(processed_new.encoded(name), dtype=object)
+            fresh.set_column(name, values)
+        return fresh
@@ -6,12 +6,47 @@ MAIN - PUNKT WEJŚCIA
 Prosty punkt wejścia dla zachowania kompatybilności z obecnym systemem.
 """
 
+import argparse
 from analyzer import TravelAnalyzer
+from config import Config
 
 def main() -> None:
     """Główna funkcja - dla zachowania kompatybilności"""
+    parser = argparse.ArgumentParser(description="Analiza rocznych statystyk podróżnych")
+    parser.add_argument('--incremental', action='store_true',
+                        help="przetwarzaj tylko nowe rezerwacje (wyniki pozostałych z zapisanego stanu)")
+    parser.add_argument('--chunked', action='store_true',
+                        help="wczytuj i przetwarzaj pliki porcjami (ograniczona pamięć dla dużych eksportów)")
+    parser.add_argument('--compile-rules', action='store_true',
+                        help="zwaliduj pliki reguł JSON i zbuduj paczkę reguł, bez analizy")
+    parser.add_argument('--verify-rules', action='store_true',
+                        help="porównaj tablicę decyzyjną z łańcuchem strategii na całej historii, bez analizy")
+    parser.add_argument('--fuzz', type=int, nargs='?', const=60000, default=0, metavar='N',
+                        help="z --verify-rules: porównaj też na N losowych rekordach ze słów kluczowych reguł (domyślnie 60000)")
+    parser.add_argument('--profile-strategies', action='store_true',
+                        help="zmierz czasy i trafienia bloków tablicy decyzyjnej (lub strategii przy silniku chain), raport na końcu analizy")
+    parser.add_argument('--trace-rules', action='store_true',
+                        help="zapisz ślad reguł (reguła normalizacji, strategia, predykat) obok arkusza Wszystkie_Dane")
+    args = parser.parse_args()
+    
+    if args.compile_rules:
+        from rule_pack import build_rule_pack, RulePackError
+        try:
+            build_rule_pack()
+        except RulePackError as e:
+            print(e)
+            raise SystemExit(1)
+        return
+    
+    if args.profile_strategies:
+        Config.CATEGORY_PROFILING = True
+    if args.trace_rules:
+        Config.RULE_TRACE = True
+    
     analyzer = TravelAnalyzer()
-    analyzer.run_analysis()
+    if args.verify_rules:
+        raise SystemExit(1 if analyzer.verify_rules(args.fuzz) else 0)
+    analyzer.run_analysis(incremental=args.incremental, chunked=args.chunked)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
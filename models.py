@@ -7,9 +7,12 @@ Classes representing the system's data structures for travel booking analysis.
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple, Any, Iterator, Union, Callable
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 import re
+import sys
 
 def parse_polish_number(value) -> Optional[float]:
     """Parsuje polskie formatowanie liczb (spacja jako separator tysięcy, przecinek dziesiętny)"""
@@ -39,6 +42,21 @@ def parse_polish_number(value) -> Optional[float]:
     except (ValueError, TypeError):
         return None
 
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Parsuje całą kolumnę dat naraz - znany format eksportu, reszta przez fallback"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    
+    from config import Config
+    dates = pd.to_datetime(values, format=Config.DATE_FORMAT, errors='coerce')
+    
+    # Wartości w innym formacie - parsowanie ogólne (dzień przed miesiącem)
+    failed = dates.isna() & values.notna()
+    if failed.any():
+        dates[failed] = pd.to_datetime(values[failed], dayfirst=True, format='mixed', errors='coerce')
+    
+    return dates
+
 @dataclass
 class TravelRecord:
     """Pojedynczy rekord podróży - uproszczony do 6 kolumn"""
@@ -75,6 +93,12 @@ class TravelRecord:
             hotel=str(row.get('Hotel', ''))
         )
     
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, year: Optional[int] = None) -> Tuple[List['TravelRecord'], Dict[int, str]]:
+        """Tworzy rekordy z całej tabeli kolumnowo - zwraca rekordy i odrzucone wiersze {pozycja: powód}"""
+        batch, rejected = TravelRecordBatch.from_frame(df, year)
+        return batch.to_records(), rejected
+    
     def to_dict(self) -> Dict:
         """Konwertuje rekord do słownika dla DataFrame"""
         return {
@@ -89,6 +113,398 @@ class TravelRecord:
             'Kategoria': self.category
         }
 
+class TravelRecordView(TravelRecord):
+    """Rekord zbioru kolumnowego tylko do odczytu (iteracja i indeksowanie TravelRecordBatch)
+    
+    Widok jest kopią wiersza - przypisanie pola nie zmieniłoby zbioru, więc zgłasza błąd
+    zamiast po cichu gubić zmianę. Do zmian służą set_column lub to_records().
+    """
+    _frozen = False
+    
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        object.__setattr__(self, '_frozen', True)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen:
+            raise AttributeError(f"Widok rekordu zbioru jest tylko do odczytu (pole {name}) - "
+                                 f"użyj TravelRecordBatch.set_column lub to_records()")
+        super().__setattr__(name, value)
+
+class CompactTravelRecord:
+    """Pamięciooszczędny wariant TravelRecord do trzymania wieloletnich historii w pamięci
+    
+    Brak __dict__ (__slots__), powtarzalne napisy (hotel, kierunek, kategoria,
+    znormalizowane nazwy) są internowane, a miesiąc jest trzymany jako indeks
+    w Config.POLISH_MONTHS. to_dict() zwraca to samo co TravelRecord.to_dict().
+    """
+    
+    __slots__ = ('lp', 'nr_rezerwacji', 'klient_id', 'date_created', 'destination', 'hotel',
+                 'year', '_month_index', 'category', 'hotel_normalized', 'destination_normalized')
+    
+    # Pola z niewielką liczbą różnych wartości - internowane przy każdym przypisaniu
+    INTERNED_FIELDS = frozenset(('destination', 'hotel', 'category', 'hotel_normalized', 'destination_normalized'))
+    
+    def __init__(self, lp: Optional[int], nr_rezerwacji: str, klient_id: str, date_created: datetime,
+                 destination: str, hotel: str, year: Optional[int] = None, month: Optional[str] = None,
+                 category: str = "Nieprzypisane", hotel_normalized: str = "", destination_normalized: str = "") -> None:
+        self.lp = lp
+        self.nr_rezerwacji = nr_rezerwacji
+        self.klient_id = klient_id
+        self.date_created = date_created
+        self.destination = destination
+        self.hotel = hotel
+        self.year = year
+        self.month = month
+        self.category = category
+        self.hotel_normalized = hotel_normalized
+        self.destination_normalized = destination_normalized
+        
+        # Automatyczne wypełnienie derived fields (jak TravelRecord.__post_init__)
+        if self.year is None and self.date_created:
+            self.year = self.date_created.year
+        if self._month_index is None and self.date_created:
+            self._month_index = self.date_created.month - 1
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.INTERNED_FIELDS and type(value) is str:
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+    
+    @property
+    def month(self) -> Optional[str]:
+        """Polska nazwa miesiąca"""
+        from config import Config
+        return None if self._month_index is None else Config.POLISH_MONTHS[self._month_index]
+    
+    @month.setter
+    def month(self, value: Optional[str]) -> None:
+        from config import Config
+        self._month_index = None if value is None else Config.POLISH_MONTHS.index(value)
+    
+    @classmethod
+    def from_record(cls, record: TravelRecord) -> 'CompactTravelRecord':
+        """Tworzy wariant kompaktowy z TravelRecord"""
+        return cls(*(getattr(record, name) for name in TravelRecordBatch.FIELDS))
+    
+    def to_record(self) -> TravelRecord:
+        """Zamienia z powrotem na zwykły TravelRecord"""
+        return TravelRecord(*(getattr(self, name) for name in TravelRecordBatch.FIELDS))
+    
+    def to_dict(self) -> Dict:
+        """Konwertuje rekord do słownika dla DataFrame (identycznie jak TravelRecord)"""
+        return {
+            'Lp.': self.lp,
+            'Nr rez.': self.nr_rezerwacji,
+            'Klient ID': self.klient_id,
+            'Data utworzenia': self.date_created,
+            'Kierunek': self.destination,
+            'Hotel': self.hotel,
+            'Rok': self.year,
+            'Miesiąc': self.month,
+            'Kategoria': self.category
+        }
+    
+    def __getstate__(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+    
+    def __setstate__(self, state: Tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactTravelRecord):
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+    
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in TravelRecordBatch.FIELDS)
+        return f"CompactTravelRecord({fields})"
+
+class TravelRecordBatch:
+    """Kolumnowy zbiór rekordów podróży (struct-of-arrays)
+    
+    Kolumny o niewielu różnych wartościach (hotel, kierunek, kategoria, miesiąc)
+    są kodowane słownikowo (pd.Categorical). Obiekty TravelRecord powstają tylko
+    na żądanie - przez iterację i indeksowanie (widoki tylko do odczytu) lub to_records().
+    """
+    
+    # Kolejność pól jak w TravelRecord
+    FIELDS = ('lp', 'nr_rezerwacji', 'klient_id', 'date_created', 'destination', 'hotel',
+              'year', 'month', 'category', 'hotel_normalized', 'destination_normalized')
+    
+    # Kolumny kodowane słownikowo
+    ENCODED_FIELDS = ('destination', 'hotel', 'month', 'category',
+                      'hotel_normalized', 'destination_normalized')
+    
+    # Kolumny liczb całkowitych z możliwym brakiem wartości
+    INTEGER_FIELDS = ('lp', 'year')
+    
+    def __init__(self, columns: Dict[str, Any]) -> None:
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Kolumny o różnych długościach: {lengths}")
+        missing = set(self.FIELDS) - set(columns)
+        if missing:
+            raise ValueError(f"Brak kolumn: {missing}")
+        self._columns: Dict[str, Any] = dict(columns)
+        self._length = lengths.pop() if lengths else 0
+    
+    @classmethod
+    def empty(cls) -> 'TravelRecordBatch':
+        """Pusty zbiór rekordów"""
+        return cls.from_records([])
+    
+    @classmethod
+    def from_records(cls, records: List[TravelRecord]) -> 'TravelRecordBatch':
+        """Tworzy zbiór z listy rekordów"""
+        return cls({
+            'lp': pd.array([r.lp for r in records], dtype='Int64'),
+            'nr_rezerwacji': np.array([r.nr_rezerwacji for r in records], dtype=object),
+            'klient_id': np.array([r.klient_id for r in records], dtype=object),
+            'date_created': pd.to_datetime(pd.Series([r.date_created for r in records], dtype=object)).to_numpy(dtype='datetime64[ns]'),
+            'destination': pd.Categorical([r.destination for r in records]),
+            'hotel': pd.Categorical([r.hotel for r in records]),
+            'year': pd.array([r.year for r in records], dtype='Int64'),
+            'month': cls._encode_months([r.month for r in records]),
+            'category': pd.Categorical([r.category for r in records]),
+            'hotel_normalized': pd.Categorical([r.hotel_normalized for r in records]),
+            'destination_normalized': pd.Categorical([r.destination_normalized for r in records])
+        })
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, year: Optional[int] = None) -> Tuple['TravelRecordBatch', Dict[int, str]]:
+        """Tworzy zbiór z tabeli 6 kolumn - zwraca zbiór i odrzucone wiersze {pozycja: powód}"""
+        from config import Config
+        n = len(df)
+        
+        def column(name: str, default: object) -> pd.Series:
+            if name in df.columns:
+                return df[name].reset_index(drop=True)
+            return pd.Series([default] * n, dtype=object)
+        
+        def text(name: str) -> List[str]:
+            return [str(value) for value in column(name, '').tolist()]
+        
+        rejected: Dict[int, str] = {}
+        
+        # Lp. - liczba całkowita lub brak
+        lp_raw = column('Lp.', None)
+        lp_num = pd.to_numeric(lp_raw, errors='coerce')
+        for pos in (lp_raw.notna() & lp_num.isna()).to_numpy().nonzero()[0]:
+            rejected[int(pos)] = f"Nieprawidłowa wartość Lp.: {lp_raw.iat[pos]!r}"
+        lp_values = pd.array(np.trunc(lp_num.to_numpy(dtype=float, na_value=np.nan)), dtype='Int64')
+        
+        # Data utworzenia - jedno parsowanie całej kolumny, rok i miesiąc jako tablice
+        if 'Data utworzenia' in df.columns:
+            date_raw = column('Data utworzenia', None)
+            dates = parse_dates(date_raw)
+            for pos in dates.isna().to_numpy().nonzero()[0]:
+                rejected.setdefault(int(pos), f"Nieprawidłowa data utworzenia: {date_raw.iat[pos]!r}")
+            
+            month_codes = dates.dt.month.fillna(0).to_numpy(dtype=int) - 1
+            years = pd.array([year] * n, dtype='Int64') if year is not None else pd.array(dates.dt.year, dtype='Int64')
+            date_values = dates.to_numpy(dtype='datetime64[ns]')
+        else:
+            # Brak kolumny dat - rekordy bez daty i miesiąca
+            month_codes = np.full(n, -1)
+            years = pd.array([year] * n, dtype='Int64')
+            date_values = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+        
+        batch = cls({
+            'lp': lp_values,
+            'nr_rezerwacji': np.array(text('Nr rez.'), dtype=object),
+            'klient_id': np.array(text('Klient ID'), dtype=object),
+            'date_created': date_values,
+            'destination': pd.Categorical(text('Kierunek')),
+            'hotel': pd.Categorical(text('Hotel')),
+            'year': years,
+            'month': pd.Categorical.from_codes(month_codes, categories=Config.POLISH_MONTHS),
+            'category': pd.Categorical.from_codes(np.zeros(n, dtype=int), categories=['Nieprzypisane']),
+            'hotel_normalized': pd.Categorical.from_codes(np.zeros(n, dtype=int), categories=['']),
+            'destination_normalized': pd.Categorical.from_codes(np.zeros(n, dtype=int), categories=[''])
+        })
+        
+        if rejected:
+            keep = np.ones(n, dtype=bool)
+            keep[list(rejected)] = False
+            batch = batch.take(keep)
+        
+        return batch, rejected
+    
+    @staticmethod
+    def _encode_months(months: List[Optional[str]]) -> pd.Categorical:
+        """Koduje miesiące w stałej kolejności Config.POLISH_MONTHS"""
+        from config import Config
+        return pd.Categorical(months, categories=Config.POLISH_MONTHS)
+    
+    @classmethod
+    def concat(cls, batches: List['TravelRecordBatch']) -> 'TravelRecordBatch':
+        """Łączy zbiory w jeden (z ujednoliceniem słowników)"""
+        batches = [b for b in batches if len(b) > 0] or batches[:1]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        
+        columns: Dict[str, Any] = {}
+        for name in cls.FIELDS:
+            parts = [b._columns[name] for b in batches]
+            if name in cls.ENCODED_FIELDS:
+                columns[name] = union_categoricals(parts)
+            elif name in cls.INTEGER_FIELDS:
+                columns[name] = pd.array(pd.concat([pd.Series(p) for p in parts], ignore_index=True), dtype='Int64')
+            else:
+                columns[name] = np.concatenate(parts)
+        return cls(columns)
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __iter__(self) -> Iterator[TravelRecordView]:
+        return iter(self.to_records(read_only=True))
+    
+    def __getitem__(self, index: int) -> TravelRecordView:
+        """Widok pojedynczego rekordu tylko do odczytu (kopia - zmiany nie wróciłyby do zbioru)"""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self.take(np.array([index])).to_records(read_only=True)[0]
+    
+    def encoded(self, name: str) -> pd.Categorical:
+        """Zwraca kolumnę kodowaną słownikowo"""
+        if name not in self.ENCODED_FIELDS:
+            raise KeyError(f"Kolumna {name} nie jest kodowana słownikowo")
+        return self._columns[name]
+    
+    def values(self, name: str) -> List[Any]:
+        """Zwraca wartości kolumny jako listę obiektów Pythona (None dla braków)"""
+        data = self._columns[name]
+        if name in self.INTEGER_FIELDS:
+            return [None if v is pd.NA else int(v) for v in data.tolist()]
+        if name == 'date_created':
+            return [None if v is pd.NaT else v for v in pd.DatetimeIndex(data)]
+        if name in self.ENCODED_FIELDS:
+            return [None if isinstance(v, float) else v for v in data.tolist()]
+        return data.tolist()
+    
+    def map_encoded(self, name: str, func: Callable[[Any], Any], vectorized: bool = False) -> pd.Categorical:
+        """Wylicza func raz dla każdej różnej wartości kolumny i rozprowadza wynik na wiersze
+        
+        Przy vectorized=True func dostaje listę wszystkich różnych wartości i zwraca listę wyników.
+        """
+        source = self.encoded(name)
+        if vectorized:
+            mapped = np.array(list(func(list(source.categories))), dtype=object)
+        else:
+            mapped = np.array([func(value) for value in source.categories], dtype=object)
+        new_codes, new_categories = pd.factorize(mapped)
+        codes = np.where(source.codes >= 0, new_codes[source.codes], -1) if len(mapped) else source.codes
+        return pd.Categorical.from_codes(codes, categories=new_categories)
+    
+    def count_where(self, name: str, predicate: Callable[[Optional[str]], bool]) -> int:
+        """Liczy wiersze spełniające warunek - warunek liczony raz dla każdej różnej wartości"""
+        source = self.encoded(name)
+        # Ostatni element odpowiada brakującym wartościom (kod -1)
+        flags = np.array([bool(predicate(value)) for value in source.categories] + [bool(predicate(None))])
+        return int(flags[source.codes].sum())
+    
+    def set_column(self, name: str, values: Any) -> None:
+        """Podmienia kolumnę (kolumny kodowane są kodowane automatycznie)"""
+        if name not in self.FIELDS:
+            raise KeyError(name)
+        if len(values) != self._length:
+            raise ValueError(f"Kolumna {name} ma {len(values)} wartości zamiast {self._length}")
+        if name in self.ENCODED_FIELDS and not isinstance(values, pd.Categorical):
+            values = self._encode_months(list(values)) if name == 'month' else pd.Categorical(values)
+        self._columns[name] = values
+    
+    def take(self, selector: np.ndarray) -> 'TravelRecordBatch':
+        """Zwraca podzbiór wierszy (indeksy lub maska logiczna)"""
+        return TravelRecordBatch({name: values[selector] for name, values in self._columns.items()})
+    
+    def split_by_year(self) -> Dict[int, 'TravelRecordBatch']:
+        """Dzieli zbiór na lata"""
+        years = pd.Series(self._columns['year'])
+        return {
+            int(year): self.take((years == year).to_numpy(dtype=bool, na_value=False))
+            for year in sorted(years.dropna().unique())
+        }
+    
+    def category_counts(self) -> Dict[str, int]:
+        """Liczba rekordów w każdej kategorii"""
+        counts = pd.Series(self._columns['category']).value_counts()
+        return {str(category): int(count) for category, count in counts.items() if count > 0}
+    
+    def to_records(self, read_only: bool = False) -> List[TravelRecord]:
+        """Materializuje rekordy TravelRecord dla wszystkich wierszy (niezależne kopie)
+        
+        read_only=True - widoki TravelRecordView, których pól nie można zmieniać.
+        """
+        record_type = TravelRecordView if read_only else TravelRecord
+        return [record_type(*row) for row in zip(*(self.values(name) for name in self.FIELDS))]
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Zamienia zbiór na słownik tablic numpy (zapis .npz bez pickle)"""
+        arrays: Dict[str, np.ndarray] = {}
+        for name in self.FIELDS:
+            data = self._columns[name]
+            if name in self.ENCODED_FIELDS:
+                arrays[f'{name}__codes'] = np.asarray(data.codes, dtype=np.int32)
+                arrays[f'{name}__categories'] = np.array([str(c) for c in data.categories], dtype=str)
+            elif name in self.INTEGER_FIELDS:
+                arrays[f'{name}__values'] = data.to_numpy(dtype='int64', na_value=0)
+                arrays[f'{name}__mask'] = data.isna()
+            elif name == 'date_created':
+                arrays[name] = data
+            else:
+                arrays[name] = np.array([str(v) for v in data], dtype=str)
+        return arrays
+    
+    @classmethod
+    def from_arrays(cls, arrays: Any) -> 'TravelRecordBatch':
+        """Odtwarza zbiór z tablic zapisanych przez to_arrays()"""
+        columns: Dict[str, Any] = {}
+        for name in cls.FIELDS:
+            if name in cls.ENCODED_FIELDS:
+                columns[name] = pd.Categorical.from_codes(
+                    arrays[f'{name}__codes'], categories=arrays[f'{name}__categories'].astype(object)
+                )
+            elif name in cls.INTEGER_FIELDS:
+                values = pd.array(arrays[f'{name}__values'], dtype='Int64')
+                values[arrays[f'{name}__mask']] = pd.NA
+                columns[name] = values
+            elif name == 'date_created':
+                columns[name] = arrays[name]
+            else:
+                columns[name] = arrays[name].astype(object)
+        return cls(columns)
+    
+    def to_compact_records(self) -> List[CompactTravelRecord]:
+        """Materializuje rekordy w wariancie kompaktowym (__slots__, internowane napisy)"""
+        return [CompactTravelRecord(*row) for row in zip(*(self.values(name) for name in self.FIELDS))]
+    
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame w układzie TravelRecord.to_dict() - bez konwersji rekord → słownik"""
+        def integers(name: str) -> np.ndarray:
+            data = self._columns[name]
+            if data.isna().any():
+                return data.to_numpy(dtype=float, na_value=np.nan)
+            return data.to_numpy(dtype='int64')
+        
+        return pd.DataFrame({
+            'Lp.': integers('lp'),
+            'Nr rez.': self._columns['nr_rezerwacji'],
+            'Klient ID': self._columns['klient_id'],
+            'Data utworzenia': self._columns['date_created'],
+            'Kierunek': np.asarray(self._columns['destination'], dtype=object),
+            'Hotel': np.asarray(self._columns['hotel'], dtype=object),
+            'Rok': integers('year'),
+            'Miesiąc': np.asarray(self._columns['month'], dtype=object),
+            'Kategoria': np.asarray(self._columns['category'], dtype=object)
+        })
+
 @dataclass 
 class ProcessingStats:
     """Statystyki przetwarzania"""
@@ -105,12 +521,15 @@ class ProcessingStats:
             return 0.0
         return (self.assigned_records / self.total_records) * 100
     
-    def update_category_stats(self, records: List[TravelRecord]) -> None:
+    def update_category_stats(self, records: Union[List[TravelRecord], TravelRecordBatch]) -> None:
         """Aktualizuje statystyki kategorii"""
         self.records_by_category.clear()
-        for record in records:
-            category = record.category
-            self.records_by_category[category] = self.records_by_category.get(category, 0) + 1
+        if isinstance(records, TravelRecordBatch):
+            self.records_by_category.update(records.category_counts())
+        else:
+            for record in records:
+                category = record.category
+                self.records_by_category[category] = self.records_by_category.get(category, 0) + 1
             
         self.total_records = len(records)
         self.assigned_records = sum(
@@ -4,78 +4,75 @@
 NORMALIZATOR DANYCH
 ==================
 Klasa odpowiedzialna za normalizację hoteli i kierunków.
-Używa plików JSON do konfiguracji reguł normalizacji.
+Używa plików JSON do konfiguracji reguł normalizacji (przez skompilowaną paczkę reguł).
 """
 
-import json
 import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Set, Dict, List, Any
-from models import TravelRecord
+import numpy as np
+import pandas as pd
+from typing import Set, Dict, List, Any, Callable, Iterable, Optional, Pattern, Union
+from config import Config
+from models import TravelRecord, TravelRecordBatch
+from pattern_matcher import AhoCorasickMatcher
+from rule_pack import RulePack, load_rule_pack, changed_rule_patterns
+
+# Podstawowa normalizacja tekstu: gwiazdki, cyfry i znaki specjalne, nadmiarowe spacje
+_SPECIAL_CHARS_RE = re.compile(r'[*★☆\d(),.]')
+_WHITESPACE_RE = re.compile(r'\s+')
+# Polskie znaki i separatory - jedna tabela zamiast łańcucha replace
+_TEXT_TRANSLATION = str.maketrans({
+    'ł': 'l', 'ą': 'a', 'ć': 'c', 'ę': 'e', 'ń': 'n', 'ó': 'o',
+    'ś': 's', 'ź': 'z', 'ż': 'z', '-': ' ', '_': ' '
+})
 
 class TravelNormalizer:
     """Klasa do normalizacji nazw hoteli i kierunków"""
     
-    def __init__(self) -> None:
+    # Grupy wzorców przelotów z patterns.json - sprawdzane w tej kolejności
+    FLIGHT_PATTERN_GROUPS = ('flight_patterns', 'kitesafari_patterns')
+    
+    def __init__(self, cache_size: Optional[int] = None, context: Optional[Any] = None) -> None:
         self.config_dir = Path(__file__).parent / "config"
+        # Wspólny kontekst reguł (RuleContext) - bez niego paczka wczytywana bezpośrednio
+        self.context = context
+        if context is not None:
+            context.add_listener(self._on_rules_changed)
         self.patterns: Dict[str, Any] = {}  # Inicjalizacja patterns jako pusty dict
         self.hotel_rules: Dict[str, str] = {}
         self.destination_rules: Dict[str, str] = {}
+        # Automaty wzorców reguł - budowane przy wczytaniu konfiguracji
+        self._hotel_matcher: Optional[AhoCorasickMatcher] = None
+        self._destination_matcher: Optional[AhoCorasickMatcher] = None
+        # Skompilowane grupy wzorców (jedno wyrażenie-alternatywa na grupę)
+        self._compiled_patterns: Dict[str, List[Pattern]] = {}
+        # Numery reguł (pozycja w pliku reguł) - budowane przy pierwszym śladzie reguł
+        self._rule_numbers: Dict[str, Dict[str, int]] = {}
+        # Ograniczona pamięć wyników (LRU) kluczowana surową wartością - czyszczona przy przeładowaniu reguł
+        self.cache_size = cache_size if cache_size is not None else Config.NORMALIZATION_CACHE_SIZE
+        self._cache: Dict[str, OrderedDict] = {'hotel': OrderedDict(), 'destination': OrderedDict()}
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.load_config_files()
     
-    def load_config_files(self) -> None:
-        """Wczytuje reguły normalizacji z plików JSON"""
-        # Wczytanie reguł hoteli
-        hotel_file = self.config_dir / "hotel_rules.json"
-        if hotel_file.exists():
-            with open(hotel_file, 'r', encoding='utf-8') as f:
-                hotel_data = json.load(f)
-            
-            # Sprawdź czy to już płaski słownik (nowy format) czy zagnieżdżony (stary format)
-            if isinstance(list(hotel_data.values())[0], str):
-                # Nowy format - płaski słownik
-                self.hotel_rules = hotel_data
-            else:
-                # Stary format - zagnieżdżony słownik
-                self.hotel_rules = {}
-                for category, rules in hotel_data.items():
-                    self.hotel_rules.update(rules)
-        else:
-            print(f"Brak pliku: {hotel_file}")
-            self.hotel_rules = {}
-        
-        # Wczytanie reguł kierunków
-        dest_file = self.config_dir / "destination_rules.json" 
-        if dest_file.exists():
-            with open(dest_file, 'r', encoding='utf-8') as f:
-                dest_data = json.load(f)
-            
-            # Sprawdź czy to już płaski słownik (nowy format) czy zagnieżdżony (stary format)
-            first_value = list(dest_data.values())[0]
-            if isinstance(first_value, str):
-                # Nowy format - płaski słownik
-                self.destination_rules = dest_data
-            else:
-                # Stary format - zagnieżdżony słownik
-                self.destination_rules = {}
-                for category, rules in dest_data.items():
-                    if isinstance(rules, dict):
-                        self.destination_rules.update(rules)
-                    else:
-                        # To może być pojedyncza reguła w starym formacie
-                        self.destination_rules[category] = rules
-        else:
-            print(f"Brak pliku: {dest_file}")
-            self.destination_rules = {}
-            
-        # Wczytanie wzorców
-        patterns_file = self.config_dir / "patterns.json"
-        if patterns_file.exists():
-            with open(patterns_file, 'r', encoding='utf-8') as f:
-                self.patterns = json.load(f)
-        else:
-            print(f"Brak pliku: {patterns_file}")
-            self.patterns = {}
+    def load_config_files(self, pack: Optional[RulePack] = None) -> None:
+        """Wczytuje reguły normalizacji ze skompilowanej paczki reguł (przebudowywanej po zmianie JSON)"""
+        if pack is None:
+            pack = self.context.rule_pack if self.context is not None else load_rule_pack(self.config_dir)
+        
+        self.hotel_rules = pack.hotel_rules
+        self.destination_rules = pack.destination_rules
+        self.patterns = pack.patterns
+        
+        # Automaty wzorców i skompilowane grupy wzorców z paczki
+        self._hotel_matcher = pack.hotel_matcher
+        self._destination_matcher = pack.destination_matcher
+        self._compiled_patterns = {
+            group: pack.compiled_patterns.get(group, [])
+            for group in (*self.FLIGHT_PATTERN_GROUPS, 'transfer_patterns')
+        }
+        self._rule_numbers = {}
     
     def normalize_text(self, text: str) -> str:
         """Podstawowa normalizacja tekstu"""
@@ -83,27 +80,29 @@ class TravelNormalizer:
             return ""
         
         # Usuń gwiazdki, cyfry i znaki specjalne
-        text = re.sub(r'[*★☆\d(),.]', '', text)
+        text = _SPECIAL_CHARS_RE.sub('', text)
         # Usuń nadmiarowe spacje
-        text = re.sub(r'\s+', ' ', text)
-        
-        return (text.lower()
-                    .strip()
-                    .replace('ł', 'l')
-                    .replace('ą', 'a')
-                    .replace('ć', 'c') 
-                    .replace('ę', 'e')
-                    .replace('ń', 'n')
-                    .replace('ó', 'o')
-                    .replace('ś', 's')
-                    .replace('ź', 'z')
-                    .replace('ż', 'z')
-                    .replace('-', ' ')
-                    .replace('_', ' ')
-                    .strip())
-    
-    def _normalize_with_rules(self, text: str, rules: Dict[str, str]) -> str:
-        """Wspólna metoda normalizacji z regułami - eliminuje duplikację kodu"""
+        text = _WHITESPACE_RE.sub(' ', text)
+        
+        return text.lower().strip().translate(_TEXT_TRANSLATION).strip()
+    
+    def normalize_text_column(self, values: Iterable[Any]) -> pd.Series:
+        """Wersja kolumnowa normalize_text - ten sam wynik dla całej kolumny w jednym wywołaniu"""
+        # dtype object - wyrażenia regularne i lower() z Pythona, jak w wersji skalarnej
+        column = pd.Series(list(values) if not isinstance(values, pd.Series) else values, dtype=object)
+        is_text = column.map(lambda value: isinstance(value, str) and value != '').to_numpy(dtype=bool)
+        
+        result = pd.Series([''] * len(column), index=column.index, dtype=object)
+        if is_text.any():
+            text = column[is_text]
+            text = text.str.replace(_SPECIAL_CHARS_RE, '', regex=True)
+            text = text.str.replace(_WHITESPACE_RE, ' ', regex=True)
+            result[is_text] = text.str.lower().str.strip().str.translate(_TEXT_TRANSLATION).str.strip()
+        return result
+    
+    def _match_rules(self, text: str, rules: Dict[str, str],
+                     matcher: Optional[AhoCorasickMatcher] = None) -> Optional[str]:
+        """Wynik reguły dla tekstu lub None gdy żadna reguła nie pasuje"""
         if not text:
             return ''
         
@@ -113,60 +112,232 @@ class TravelNormalizer:
         if text_lower in rules:
             return rules[text_lower]
         
-        # Potem sprawdź częściowe dopasowania z oryginalnymi nazwami
-        for pattern, normalized in rules.items():
-            if pattern in text_lower:
-                return normalized
+        # Potem sprawdź częściowe dopasowania z oryginalnymi nazwami -
+        # automat zwraca pierwszą pasującą regułę w kolejności słownika
+        if matcher is not None:
+            index = matcher.first_match(text_lower)
+            if index is not None:
+                return rules[matcher.patterns[index]]
+        else:
+            for pattern, normalized in rules.items():
+                if pattern in text_lower:
+                    return normalized
+        
+        return None
+    
+    def _normalize_with_rules(self, text: str, rules: Dict[str, str],
+                              matcher: Optional[AhoCorasickMatcher] = None) -> str:
+        """Wspólna metoda normalizacji z regułami - eliminuje duplikację kodu"""
+        matched = self._match_rules(text, rules, matcher)
+        if matched is not None:
+            return matched
         
         # Na koniec normalizuj tekst standardowo
         return self.normalize_text(text)
     
+    def _cached(self, field: str, text: str, compute: Callable[[str], str]) -> str:
+        """Zwraca wynik z pamięci LRU lub oblicza i zapamiętuje"""
+        cache = self._cache[field]
+        if text in cache:
+            self.cache_hits += 1
+            cache.move_to_end(text)
+            return cache[text]
+        
+        self.cache_misses += 1
+        result = compute(text)
+        self._remember(field, text, result)
+        return result
+    
+    def _remember(self, field: str, text: str, result: str) -> None:
+        """Zapamiętuje wynik, usuwając najdawniej używany przy przepełnieniu"""
+        if self.cache_size > 0:
+            cache = self._cache[field]
+            cache[text] = result
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+    
     def normalize_hotel(self, hotel: str) -> str:
         """Normalizuje nazwę hotelu"""
-        return self._normalize_with_rules(hotel, self.hotel_rules)
+        return self._cached('hotel', hotel, lambda text: self._normalize_with_rules(
+            text, self.hotel_rules, self._hotel_matcher))
     
     def normalize_destination(self, destination: str) -> str:
         """Normalizuje kierunek"""
-        return self._normalize_with_rules(destination, self.destination_rules)
+        return self._cached('destination', destination, lambda text: self._normalize_with_rules(
+            text, self.destination_rules, self._destination_matcher))
     
-    def detect_flight_patterns(self, text: str) -> bool:
-        """Wykrywa wzorce przelotów w tekście"""
-        text_lower = text.lower()
+    def normalize_unique(self, values: Iterable[str], field: str = 'hotel') -> List[str]:
+        """Normalizuje każdą różną wartość raz i rozkłada wyniki na wszystkie pozycje
         
-        # Sprawdzenie wzorców przelotów z pliku konfiguracyjnego
-        for pattern in self.patterns.get('flight_patterns', []):
-            if re.search(pattern, text_lower):
-                return True
+        Wartości bez pasującej reguły normalizowane są razem przez normalize_text_column.
+        """
+        if field == 'hotel':
+            rules, matcher = self.hotel_rules, self._hotel_matcher
+        else:
+            rules, matcher = self.destination_rules, self._destination_matcher
         
-        # Sprawdzenie wzorców kitesafari
-        for pattern in self.patterns.get('kitesafari_patterns', []):
-            if re.search(pattern, text_lower):
-                return True
+        values = list(values)
+        cache = self._cache[field]
+        results: Dict[str, str] = {}
+        unmatched: List[str] = []
+        
+        for value in dict.fromkeys(values):
+            if value in cache:
+                self.cache_hits += 1
+                cache.move_to_end(value)
+                results[value] = cache[value]
+                continue
+            
+            self.cache_misses += 1
+            matched = self._match_rules(value, rules, matcher)
+            if matched is None:
+                unmatched.append(value)
+            else:
+                results[value] = matched
+                self._remember(field, value, matched)
         
-        return False
+        for value, normalized in zip(unmatched, self.normalize_text_column(unmatched)):
+            results[value] = normalized
+            self._remember(field, value, normalized)
+        
+        return [results[value] for value in values]
     
-    def has_transfer_patterns(self, text: str) -> bool:
-        """Sprawdza czy tekst zawiera wzorce transferów"""
+    def rule_numbers(self, values: Iterable[Optional[str]], field: str = 'hotel') -> np.ndarray:
+        """Numer reguły, która ustaliła normalizację każdej wartości - -1 gdy wartość była tylko
+        oczyszczona przez normalize_text
+        
+        Numer to pozycja w regułach paczki (RulePack.hotel_rules / destination_rules), czyli
+        w pliku JSON po spłaszczeniu i bez pominiętych zagnieżdżonych grup.
+        
+        Ta sama kolejność sprawdzania co _match_rules: dopasowanie dokładne, potem pierwsza pasująca reguła.
+        """
+        if field == 'hotel':
+            rules, matcher = self.hotel_rules, self._hotel_matcher
+        else:
+            rules, matcher = self.destination_rules, self._destination_matcher
+        numbers = self._rule_numbers.get(field)
+        if numbers is None:
+            numbers = self._rule_numbers[field] = {pattern: i for i, pattern in enumerate(rules)}
+        
+        values = list(values)
+        result = np.full(len(values), -1, dtype=np.int32)
+        for i, value in enumerate(values):
+            if not value:
+                continue
+            text_lower = value.lower().strip()
+            number = numbers.get(text_lower)
+            if number is None and matcher is not None:
+                number = matcher.first_match(text_lower)
+            if number is not None:
+                result[i] = number
+        return result
+    
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Statystyki pamięci normalizacji: trafienia, chybienia i liczba zapamiętanych wartości"""
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'size': sum(len(cache) for cache in self._cache.values())
+        }
+    
+    def _on_rules_changed(self, old_pack: RulePack, new_pack: RulePack) -> None:
+        """Podmienia reguły i unieważnia tylko wyniki, na które zmiana mogła wpłynąć"""
+        self.load_config_files(new_pack)
+        
+        for field, old_rules, new_rules in (
+                ('hotel', old_pack.hotel_rules, new_pack.hotel_rules),
+                ('destination', old_pack.destination_rules, new_pack.destination_rules)):
+            cache = self._cache[field]
+            changed = changed_rule_patterns(old_rules, new_rules)
+            if changed is None:
+                dropped = len(cache)
+                cache.clear()
+            elif changed:
+                # Wynik zależy tylko od reguł, których wzorzec występuje w tekście
+                matcher = AhoCorasickMatcher(changed)
+                stale = [text for text in cache
+                         if isinstance(text, str) and matcher.first_match(text.lower().strip()) is not None]
+                for text in stale:
+                    del cache[text]
+                dropped = len(stale)
+            else:
+                continue
+            print(f"    Pamięć normalizacji ({field}): unieważniono {dropped} wpisów, zachowano {len(cache)}")
+    
+    def clear_cache(self) -> None:
+        """Czyści pamięć wyników i liczniki"""
+        for cache in self._cache.values():
+            cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def match_pattern_group(self, text: str) -> Optional[str]:
+        """Zwraca nazwę pierwszej grupy wzorców przelotów pasującej do tekstu lub None"""
         text_lower = text.lower()
         
-        for pattern in self.patterns.get('transfer_patterns', []):
-            if pattern in text_lower:
-                return True
+        for group in self.FLIGHT_PATTERN_GROUPS:
+            if any(regex.search(text_lower) for regex in self._compiled_patterns[group]):
+                return group
         
-        return False
+        return None
+    
+    def detect_flight_patterns(self, text: str) -> bool:
+        """Wykrywa wzorce przelotów (i kitesafari) w tekście"""
+        return self.match_pattern_group(text) is not None
     
-    def normalize_all_records(self, records: List[TravelRecord]) -> List[TravelRecord]:
+    def detect_flight_patterns_column(self, values: Iterable[str]) -> np.ndarray:
+        """Wersja kolumnowa detect_flight_patterns - maska dla całej kolumny tekstów"""
+        lowered = pd.Series(list(values) if not isinstance(values, pd.Series) else values, dtype=object).str.lower()
+        mask = np.zeros(len(lowered), dtype=bool)
+        for group in self.FLIGHT_PATTERN_GROUPS:
+            for regex in self._compiled_patterns[group]:
+                mask |= lowered.str.contains(regex).to_numpy(dtype=bool)
+        return mask
+    
+    def has_transfer_patterns(self, text: str) -> bool:
+        """Sprawdza czy tekst zawiera wzorce transferów"""
+        text_lower = text.lower()
+        return any(regex.search(text_lower) for regex in self._compiled_patterns['transfer_patterns'])
+    
+    def normalize_all_records(self, records: Union[List[TravelRecord], TravelRecordBatch]) -> Union[List[TravelRecord], TravelRecordBatch]:
         """Normalizuje wszystkie rekordy"""
+        if isinstance(records, TravelRecordBatch):
+            return self.normalize_batch(records)
+        
         print("  Normalizacja hoteli...")
-        for record in records:
-            record.hotel_normalized = self.normalize_hotel(record.hotel)
+        hotels = self.normalize_unique((record.hotel for record in records), 'hotel')
+        for record, hotel_normalized in zip(records, hotels):
+            record.hotel_normalized = hotel_normalized
             
         print("  Normalizacja kierunków...")
-        for record in records:
-            record.destination_normalized = self.normalize_destination(record.destination)
+        destinations = self.normalize_unique((record.destination for record in records), 'destination')
+        for record, destination_normalized in zip(records, destinations):
+            record.destination_normalized = destination_normalized
         
+        self._print_cache_stats()
         return records
     
+    def normalize_batch(self, batch: TravelRecordBatch) -> TravelRecordBatch:
+        """Normalizuje zbiór kolumnowy - każda różna wartość tylko raz"""
+        print("  Normalizacja hoteli...")
+        batch.set_column('hotel_normalized', batch.map_encoded(
+            'hotel', lambda values: self.normalize_unique(values, 'hotel'), vectorized=True))
+        
+        print("  Normalizacja kierunków...")
+        batch.set_column('destination_normalized', batch.map_encoded(
+            'destination', lambda values: self.normalize_unique(values, 'destination'), vectorized=True))
+        
+        self._print_cache_stats()
+        return batch
+    
+    def _print_cache_stats(self) -> None:
+        """Wypisuje skuteczność pamięci normalizacji"""
+        stats = self.get_cache_stats()
+        lookups = stats['hits'] + stats['misses']
+        if lookups:
+            print(f"    Pamięć normalizacji: {stats['hits']} trafień, {stats['misses']} chybień "
+                  f"({stats['hits'] / lookups * 100:.1f}% trafień)")
+    
     def process_record(self, record: TravelRecord) -> TravelRecord:
         """Przetwarza pojedynczy rekord - normalizuje hotel i kierunek"""
         record.hotel_normalized = self.normalize_hotel(record.hotel)
@@ -185,5 +356,11 @@ class TravelNormalizer:
     def reload_config(self) -> None:
         """Przeładowuje konfigurację z plików JSON"""
         print("Przeładowuję konfigurację normalizacji...")
-        self.load_config_files()
+        if self.context is not None:
+            # Przez kontekst - odświeżają się też strategie, pamięć unieważniana wybiórczo
+            self.context.check_for_updates()
+        else:
+            self.load_config_files()
+            # Wyniki policzone na starych regułach są nieaktualne
+            self.clear_cache()
         print("Konfiguracja przeładowana")
\ No newline at end of file
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Multi-Pattern Matcher
+
+Aho-Corasick automata for finding rule patterns (or pattern groups) in a text
+in a single pass.
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+class AhoCorasickMatcher:
+    """Automat Aho-Corasick - wyszukuje wszystkie wzorce naraz w jednym przejściu tekstu
+
+    Wzorce są numerowane w kolejności podania. first_match zwraca najniższy numer
+    wzorca występującego w tekście - ten sam wynik co pętla `for pattern in ...:
+    if pattern in text` zatrzymana na pierwszym trafieniu.
+    """
+
+    # Brak trafienia w węźle
+    NO_MATCH = -1
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = list(patterns)
+        # Węzeł 0 to korzeń; przejścia, link porażki i najniższy numer wzorca kończącego się w węźle
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [self.NO_MATCH]
+        self._build()
+
+    def _build(self) -> None:
+        """Buduje trie wzorców i linki porażki (BFS)"""
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(self.NO_MATCH)
+                node = next_node
+            # Powtórzony wzorzec - liczy się pierwsze wystąpienie
+            if self._output[node] == self.NO_MATCH:
+                self._output[node] = index
+
+        # Kolejność BFS - link porażki węzła zawsze wskazuje węzeł odwiedzony wcześniej
+        self._order: List[int] = []
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            self._order.append(node)
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # Wzorce kończące się w węźle to też wzorce z jego linku porażki (sufiksy)
+                self._output[child] = self._min_index(self._output[child], self._output[self._fail[child]])
+
+    @classmethod
+    def _min_index(cls, a: int, b: int) -> int:
+        if a == cls.NO_MATCH:
+            return b
+        if b == cls.NO_MATCH:
+            return a
+        return min(a, b)
+
+    def first_match(self, text: str) -> Optional[int]:
+        """Zwraca najniższy numer wzorca występującego w tekście lub None"""
+        goto, fail, output = self._goto, self._fail, self._output
+        # Pusty wzorzec występuje w każdym tekście
+        best = output[0]
+        node = 0
+
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            found = output[node]
+            if found != self.NO_MATCH and (best == self.NO_MATCH or found < best):
+                best = found
+                if best == 0:
+                    break
+
+        return None if best == self.NO_MATCH else best
+
+class GroupMatcher(AhoCorasickMatcher):
+    """Automat nad grupami wzorców - zwraca zbiór grup, których wzorzec występuje w tekście
+
+    Wynik dla grupy jest taki sam jak `any(pattern in text for pattern in group)`,
+    ale wszystkie grupy są sprawdzane jednym przejściem tekstu, niezależnie od liczby wzorców.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]) -> None:
+        self.group_names: List[str] = list(groups)
+        group_patterns = {name: list(patterns) for name, patterns in groups.items()}
+        super().__init__(dict.fromkeys(p for patterns in group_patterns.values() for p in patterns))
+
+        # Maska bitowa grup w każdym węźle (bit = numer grupy w group_names)
+        self._masks: List[int] = [0] * len(self._goto)
+        for bit, name in enumerate(self.group_names):
+            for pattern in group_patterns[name]:
+                self._masks[self._node_for(pattern)] |= 1 << bit
+        for node in self._order:
+            self._masks[node] |= self._masks[self._fail[node]]
+
+        # Ostatni wynik - kolejne strategie pytają zwykle o ten sam tekst
+        self._last_text: Optional[str] = None
+        self._last_groups: FrozenSet[str] = frozenset()
+
+    def _node_for(self, pattern: str) -> int:
+        """Węzeł trie, w którym kończy się wzorzec"""
+        node = 0
+        for char in pattern:
+            node = self._goto[node][char]
+        return node
+
+    def match_mask(self, text: str) -> int:
+        """Maska bitowa grup występujących w tekście"""
+        goto, fail, masks = self._goto, self._fail, self._masks
+        # Pusty wzorzec występuje w każdym tekście
+        mask = masks[0]
+        node = 0
+
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            mask |= masks[node]
+
+        return mask
+
+    def match_groups(self, text: str) -> FrozenSet[str]:
+        """Zbiór nazw grup, których dowolny wzorzec występuje w tekście"""
+        if text != self._last_text:
+            mask = self.match_mask(text)
+            self._last_groups = frozenset(name for bit, name in enumerate(self.group_names) if mask >> bit & 1)
+            self._last_text = text
+        return self._last_groups
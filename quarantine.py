@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Row Quarantine
+
+Collects source rows rejected while loading, for review after the run.
+"""
+
+import pandas as pd
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+@dataclass
+class RejectedRow:
+    """Odrzucony wiersz pliku źródłowego"""
+    source_file: str
+    year: int
+    row_index: int  # Numer wiersza danych w pliku (od 1, bez nagłówka)
+    reason: str
+
+class RowQuarantine:
+    """Kwarantanna odrzuconych wierszy - zbierana w trakcie wczytywania, zapisywana raz"""
+
+    COLUMNS = ['Plik', 'Rok', 'Wiersz', 'Powód']
+
+    def __init__(self) -> None:
+        self.rows: List[RejectedRow] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def extend(self, rows: Iterable[RejectedRow]) -> None:
+        """Dodaje odrzucone wiersze (np. zwrócone z procesu puli)"""
+        self.rows.extend(rows)
+
+    def clear(self) -> None:
+        """Opróżnia kwarantannę"""
+        self.rows = []
+
+    def counts_by_file(self) -> Dict[str, int]:
+        """Liczba odrzuconych wierszy w każdym pliku"""
+        return dict(Counter(row.source_file for row in self.rows))
+
+    def write(self, file_path: Path) -> None:
+        """Zapisuje kwarantannę do pliku CSV"""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        df = pd.DataFrame(
+            [(row.source_file, row.year, row.row_index, row.reason) for row in self.rows],
+            columns=self.COLUMNS
+        )
+        df.to_csv(file_path, index=False, encoding='utf-8-sig')
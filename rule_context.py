@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Shared Rule Context
+
+One lazily initialized holder of the rule pack and the normalizer, injected
+into the analyzer, categorizer, category manager and all strategies.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, List, Optional
+from rule_pack import RulePack, RulePackError, load_rule_pack
+
+if TYPE_CHECKING:
+    from normalizer import TravelNormalizer
+
+# Słuchacz zmiany reguł: (stara paczka, nowa paczka)
+RulesListener = Callable[[RulePack, RulePack], None]
+
+class RuleContext:
+    """Wspólny kontekst reguł - paczka reguł i normalizator tworzone raz, przy pierwszym użyciu"""
+
+    # Kontekst domyślny procesu (np. jeden na proces puli lub usługę)
+    _default: Optional['RuleContext'] = None
+
+    def __init__(self, config_dir: Optional[Path] = None, pack_path: Optional[Path] = None) -> None:
+        self.config_dir = config_dir
+        self.pack_path = pack_path
+        self._rule_pack: Optional[RulePack] = None
+        self._normalizer: Optional['TravelNormalizer'] = None
+        self._listeners: List[RulesListener] = []
+
+    @classmethod
+    def default(cls) -> 'RuleContext':
+        """Zwraca wspólny kontekst procesu (tworzony przy pierwszym wywołaniu)"""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @classmethod
+    def from_pack(cls, pack: RulePack, config_dir: Optional[Path] = None,
+                  pack_path: Optional[Path] = None) -> 'RuleContext':
+        """Kontekst z gotową paczką (np. przekazaną do procesu puli) - bez ponownego wczytywania"""
+        context = cls(config_dir, pack_path)
+        context._rule_pack = pack
+        return context
+
+    @property
+    def rule_pack(self) -> RulePack:
+        """Skompilowane reguły - wczytywane przy pierwszym dostępie"""
+        if self._rule_pack is None:
+            self._rule_pack = load_rule_pack(self.config_dir, self.pack_path)
+        return self._rule_pack
+
+    @property
+    def normalizer(self) -> 'TravelNormalizer':
+        """Wspólny normalizator (jedna pamięć wyników dla wszystkich komponentów)"""
+        if self._normalizer is None:
+            # Import tutaj - normalizer nie zależy od kontekstu, kontekst tworzy go dopiero na żądanie
+            from normalizer import TravelNormalizer
+            self._normalizer = TravelNormalizer(context=self)
+        return self._normalizer
+
+    def add_listener(self, listener: RulesListener) -> None:
+        """Rejestruje komponent powiadamiany o podmianie reguł"""
+        self._listeners.append(listener)
+
+    def check_for_updates(self) -> bool:
+        """Przeładowuje reguły jeśli pliki w config/ się zmieniły - wywoływane między zbiorami rekordów
+        
+        Nowa paczka jest budowana w całości, zanim zastąpi starą, więc zbiór rekordów
+        zawsze jest przetwarzany jednym kompletem reguł.
+        """
+        if self._rule_pack is None:
+            return False
+
+        try:
+            new_pack = load_rule_pack(self.config_dir, self.pack_path)
+        except RulePackError as e:
+            # Błędna edycja reguł - pracujemy dalej na poprzednich
+            print(f"⚠️  Nowe reguły odrzucone, pozostają poprzednie. {e}")
+            return False
+        if new_pack is self._rule_pack:
+            return False
+
+        old_pack, self._rule_pack = self._rule_pack, new_pack
+        print(f"🔄 Przeładowano reguły: {new_pack.summary()}")
+        for listener in self._listeners:
+            listener(old_pack, new_pack)
+        return True
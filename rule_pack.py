@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compiled Rule Pack
+
+Validates the JSON rule files, compiles matchers and regexes once and keeps
+the validated rules in one JSON artifact shared by all components.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from config import Config
+from pattern_matcher import AhoCorasickMatcher, GroupMatcher
+
+# Pliki reguł wchodzące do paczki
+RULE_FILES = ('hotel_rules.json', 'destination_rules.json', 'patterns.json', 'hotel_categories.json')
+
+# Kod budujący paczkę - jego zmiana unieważnia zapisaną paczkę (bez ręcznego podbijania wersji)
+CODE_FILES = ('rule_pack.py', 'pattern_matcher.py')
+
+# Grupy wzorców będące zwykłymi podciągami (nie wyrażeniami regularnymi)
+SUBSTRING_PATTERN_GROUPS = ('transfer_patterns',)
+
+class RulePackError(ValueError):
+    """Nieprawidłowe pliki reguł - paczka nie może zostać zbudowana"""
+    pass
+
+def compile_alternation(patterns: List[str]) -> List[Pattern]:
+    """Łączy wzorce w jedno wyrażenie (?:p1)|(?:p2)|... - wynik search jak dla pętli po wzorcach
+
+    Wzorce z grupami przechwytującymi (numeracja odwołań zmieniłaby się po połączeniu)
+    lub z flagami globalnymi są kompilowane osobno.
+    """
+    compiled = [re.compile(pattern) for pattern in patterns]
+    if len(compiled) < 2 or any(regex.groups for regex in compiled):
+        return compiled
+    try:
+        return [re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))]
+    except re.error:
+        return compiled
+
+def code_fingerprint() -> str:
+    """Skrót SHA-256 kodu budującego paczkę (CODE_FILES)"""
+    digest = hashlib.sha256()
+    for name in CODE_FILES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()
+
+CODE_HASH = code_fingerprint()
+
+class RulePack:
+    """Skompilowane reguły normalizacji i kategoryzacji
+    
+    Na dysku zapisywane są tylko zwalidowane dane reguł (JSON) - automaty i wyrażenia
+    regularne są budowane przy każdym wczytaniu paczki.
+    """
+
+    def __init__(self, sources: Dict[str, Tuple[int, int]], hotel_rules: Dict[str, str],
+                 destination_rules: Dict[str, str], patterns: Dict[str, List[str]],
+                 hotel_categories: Dict[str, List[str]]) -> None:
+        # Odcisk plików źródłowych: {nazwa: (mtime_ns, rozmiar)}
+        self.sources = sources
+        self.hotel_rules = hotel_rules
+        self.destination_rules = destination_rules
+        self.patterns = patterns
+        self.hotel_categories = hotel_categories
+
+        self.hotel_matcher = AhoCorasickMatcher(hotel_rules)
+        self.destination_matcher = AhoCorasickMatcher(destination_rules)
+        self.compiled_patterns: Dict[str, List[Pattern]] = {
+            group: compile_alternation([re.escape(p) for p in values]
+                                       if group in SUBSTRING_PATTERN_GROUPS else values)
+            for group, values in patterns.items()
+        }
+        self.hotel_category_sets = {name: set(values) for name, values in hotel_categories.items()}
+        # Wszystkie grupy hotel_categories.json w jednym automacie
+        self.hotel_category_matcher = GroupMatcher(hotel_categories)
+        # Ostrzeżenia walidacji (problemy, które nie blokują budowy paczki)
+        self.warnings: List[str] = []
+
+    def category_set(self, name: str) -> set:
+        """Zwraca kopię zbioru hoteli/kierunków z hotel_categories.json (pusty gdy brak)"""
+        return set(self.hotel_category_sets.get(name, ()))
+
+    def summary(self) -> str:
+        """Krótki opis zawartości paczki"""
+        return (f"{len(self.hotel_rules)} reguł hoteli, {len(self.destination_rules)} reguł kierunków, "
+                f"{sum(len(v) for v in self.patterns.values())} wzorców, "
+                f"{sum(len(v) for v in self.hotel_categories.values())} hoteli w kategoriach")
+
+def changed_rule_patterns(old_rules: Dict[str, str], new_rules: Dict[str, str]) -> Optional[List[str]]:
+    """Wzorce reguł dodane, usunięte lub ze zmienioną wartością
+    
+    None gdy zmieniła się kolejność niezmienionych reguł - wtedy wpływ zmiany
+    na pierwsze dopasowanie nie ogranicza się do tekstów zawierających zmienione wzorce.
+    """
+    changed = [pattern for pattern in old_rules.keys() | new_rules.keys()
+               if old_rules.get(pattern) != new_rules.get(pattern)]
+    unchanged = set(old_rules) & set(new_rules) - set(changed)
+    if [p for p in old_rules if p in unchanged] != [p for p in new_rules if p in unchanged]:
+        return None
+    return sorted(changed)
+
+def source_fingerprint(config_dir: Path) -> Dict[str, Tuple[int, int]]:
+    """Odcisk plików reguł - (mtime_ns, rozmiar) istniejących plików"""
+    fingerprint = {}
+    for name in RULE_FILES:
+        path = config_dir / name
+        if path.exists():
+            stat = path.stat()
+            fingerprint[name] = (stat.st_mtime_ns, stat.st_size)
+    return fingerprint
+
+def _read_json(path: Path, errors: List[str]) -> Optional[Any]:
+    if not path.exists():
+        print(f"Brak pliku: {path}")
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        errors.append(f"{path.name}: {e}")
+        return None
+
+def _flatten_rules(data: Any, name: str, errors: List[str], warnings: List[str]) -> Dict[str, str]:
+    """Płaski słownik reguł - nowy format wprost, stary (zagnieżdżony w kategoriach) spłaszczony"""
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        errors.append(f"{name}: oczekiwano obiektu JSON")
+        return {}
+
+    rules: Dict[str, str] = {}
+    if not data or isinstance(next(iter(data.values())), str):
+        rules = data
+    else:
+        for category, category_rules in data.items():
+            if isinstance(category_rules, dict):
+                rules.update(category_rules)
+            else:
+                # To może być pojedyncza reguła w starym formacie
+                rules[category] = category_rules
+
+    # Grupy zagnieżdżone w płaskim słowniku nigdy nie działały jako reguły (wynikiem byłby słownik) - pomijane
+    for pattern, normalized in list(rules.items()):
+        if isinstance(normalized, dict):
+            warnings.append(f"{name}: pominięto zagnieżdżoną grupę {pattern!r} ({len(normalized)} reguł) w płaskim słowniku")
+            rules = {k: v for k, v in rules.items() if k != pattern}
+        elif not isinstance(normalized, str):
+            errors.append(f"{name}: reguła {pattern!r} ma wartość {normalized!r} zamiast tekstu")
+    return rules
+
+def _string_lists(data: Any, name: str, errors: List[str]) -> Dict[str, List[str]]:
+    """Słownik {grupa: lista tekstów} z walidacją"""
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        errors.append(f"{name}: oczekiwano obiektu JSON")
+        return {}
+
+    for group, values in data.items():
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            errors.append(f"{name}: grupa {group!r} musi być listą tekstów")
+    return data
+
+def compile_rules(config_dir: Path) -> RulePack:
+    """Waliduje pliki JSON reguł i kompiluje paczkę - RulePackError z listą wszystkich problemów"""
+    errors: List[str] = []
+    warnings: List[str] = []
+    sources = source_fingerprint(config_dir)
+
+    hotel_rules = _flatten_rules(_read_json(config_dir / 'hotel_rules.json', errors),
+                                 'hotel_rules.json', errors, warnings)
+    destination_rules = _flatten_rules(_read_json(config_dir / 'destination_rules.json', errors),
+                                       'destination_rules.json', errors, warnings)
+    patterns = _string_lists(_read_json(config_dir / 'patterns.json', errors), 'patterns.json', errors)
+    hotel_categories = _string_lists(_read_json(config_dir / 'hotel_categories.json', errors),
+                                     'hotel_categories.json', errors)
+
+    for group, values in patterns.items():
+        if group in SUBSTRING_PATTERN_GROUPS or not isinstance(values, list):
+            continue
+        for pattern in values:
+            try:
+                re.compile(pattern)
+            except (re.error, TypeError) as e:
+                errors.append(f"patterns.json: nieprawidłowy wzorzec {pattern!r} w {group}: {e}")
+
+    if errors:
+        raise RulePackError("Błędy w plikach reguł:\n  - " + "\n  - ".join(errors))
+
+    pack = RulePack(sources, hotel_rules, destination_rules, patterns, hotel_categories)
+    pack.warnings = warnings
+    return pack
+
+def save_rule_pack(pack: RulePack, pack_path: Path) -> None:
+    """Zapisuje dane paczki atomowo (plik tymczasowy + podmiana)"""
+    data = {
+        'code': CODE_HASH,
+        'sources': pack.sources,
+        'hotel_rules': pack.hotel_rules,
+        'destination_rules': pack.destination_rules,
+        'patterns': pack.patterns,
+        'hotel_categories': pack.hotel_categories,
+        'warnings': pack.warnings
+    }
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = pack_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, pack_path)
+
+def _read_rule_pack(pack_path: Path) -> Optional[RulePack]:
+    """Paczka z pliku - None gdy plik jest nieczytelny, z innej wersji kodu lub nie przechodzi walidacji"""
+    try:
+        with open(pack_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get('code') != CODE_HASH:
+        return None
+
+    sources = data.get('sources')
+    warnings = data.get('warnings')
+    if (not isinstance(sources, dict) or not isinstance(warnings, list) or
+            not all(isinstance(s, list) and len(s) == 2 and all(isinstance(v, int) for v in s)
+                    for s in sources.values())):
+        return None
+    errors: List[str] = []
+    rules = {name: _flatten_rules(data.get(name), name, errors, [])
+             for name in ('hotel_rules', 'destination_rules')}
+    lists = {name: _string_lists(data.get(name), name, errors)
+             for name in ('patterns', 'hotel_categories')}
+    if errors or not all(isinstance(data.get(name), dict) for name in (*rules, *lists)):
+        return None
+
+    pack = RulePack({name: tuple(value) for name, value in sources.items()},
+                    rules['hotel_rules'], rules['destination_rules'], lists['patterns'], lists['hotel_categories'])
+    pack.warnings = [str(warning) for warning in warnings]
+    return pack
+
+# Paczki wczytane w tym procesie - wszystkie komponenty dostają ten sam obiekt
+_loaded_packs: Dict[Path, RulePack] = {}
+
+def load_rule_pack(config_dir: Optional[Path] = None, pack_path: Optional[Path] = None) -> RulePack:
+    """Zwraca paczkę reguł - z pamięci procesu, z pliku lub przebudowaną gdy pliki JSON się zmieniły"""
+    config_dir = Path(config_dir or Config.CONFIG_DIR)
+    pack_path = Path(pack_path or Config.RULE_PACK_FILE)
+    fingerprint = source_fingerprint(config_dir)
+
+    pack = _loaded_packs.get(pack_path)
+    if pack is not None and pack.sources == fingerprint:
+        return pack
+
+    pack = _read_rule_pack(pack_path) if pack_path.exists() else None
+    if pack is None or pack.sources != fingerprint:
+        pack = compile_rules(config_dir)
+        print(f"📦 Przebudowano paczkę reguł ({len(pack.warnings)} ostrzeżeń - szczegóły: main.py --compile-rules)"
+              if pack.warnings else "📦 Przebudowano paczkę reguł")
+        try:
+            save_rule_pack(pack, pack_path)
+        except OSError as e:
+            print(f"Nie udało się zapisać paczki reguł: {e}")
+
+    _loaded_packs[pack_path] = pack
+    return pack
+
+def build_rule_pack() -> RulePack:
+    """Komenda kompilacji reguł (main.py --compile-rules) - waliduje i zapisuje paczkę"""
+    pack = compile_rules(Config.CONFIG_DIR)
+    save_rule_pack(pack, Config.RULE_PACK_FILE)
+    _loaded_packs[Config.RULE_PACK_FILE] = pack
+    print(f"📦 Paczka reguł zapisana: {Config.RULE_PACK_FILE}")
+    print(f"   {pack.summary()}")
+    for warning in pack.warnings:
+        print(f"   ⚠️  {warning}")
+    return pack
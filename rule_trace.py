@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Rule Trace
+
+Per-record provenance of normalization and categorization: compact integer IDs
+of the matched rules, kept as columns next to the record batch.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+# Brak reguły: wartość tylko oczyszczona (normalizacja) lub brak rozstrzygającego wiersza (kategoria)
+NO_RULE = -1
+
+class RuleTrace:
+    """Ślad reguł - kolumny numerów w kolejności wierszy zbioru rekordów
+
+    - hotel_rule, destination_rule - numer reguły w paczce reguł (RulePack.hotel_rules /
+      destination_rules): kolejność reguł pliku JSON po spłaszczeniu, bez pominiętych
+      zagnieżdżonych grup, więc nie zawsze pozycja w pliku - legenda podaje wzorzec reguły
+    - strategy - blok tablicy decyzyjnej (strategia), który rozstrzygnął rekord
+    - predicate - wiersz tablicy decyzyjnej (warunki i słowa kluczowe), który rozstrzygnął rekord
+
+    strategy i predicate są tylko przy silniku tablicy decyzyjnej - łańcuch strategii nie ma
+    numerów bloków i wierszy, więc jego ślad ogranicza się do reguł normalizacji.
+
+    Opisy numerów są w legendzie - jedna lista tekstów na kolumnę, nie tekst na rekord.
+    """
+
+    # Kolumna śladu -> nagłówek w eksporcie
+    COLUMNS = {
+        'hotel_rule': 'Reguła hotelu (nr w paczce)',
+        'destination_rule': 'Reguła kierunku (nr w paczce)',
+        'strategy': 'Strategia',
+        'predicate': 'Predykat'
+    }
+    # Kolumny obecne w każdym śladzie (strategy/predicate zależą od silnika)
+    REQUIRED = ('hotel_rule', 'destination_rule')
+
+    def __init__(self, columns: Dict[str, np.ndarray], legend: Dict[str, List[str]]) -> None:
+        missing = set(self.REQUIRED) - set(columns)
+        if missing:
+            raise ValueError(f"Brak kolumn śladu: {missing}")
+        self.columns = columns
+        self.legend = legend
+
+    def __len__(self) -> int:
+        return len(self.columns['hotel_rule'])
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Obecne kolumny śladu -> nagłówki w eksporcie"""
+        return {name: header for name, header in self.COLUMNS.items() if name in self.columns}
+
+    def describe(self, row: int) -> Dict[str, str]:
+        """Opis śladu jednego rekordu (do debugowania)"""
+        description = {}
+        for name, header in self.headers.items():
+            number = int(self.columns[name][row])
+            description[header] = self.legend[name][number] if number != NO_RULE else '-'
+        return description
+
+    def to_frame(self) -> pd.DataFrame:
+        """Kolumny numerów z nagłówkami eksportu (wiersze w kolejności zbioru rekordów)"""
+        return pd.DataFrame({header: self.columns[name] for name, header in self.headers.items()})
+
+    def legend_frame(self) -> pd.DataFrame:
+        """Legenda numerów występujących w śladzie: kolumna, numer, opis"""
+        rows = []
+        for name, header in self.headers.items():
+            for number in np.unique(self.columns[name]):
+                if number != NO_RULE:
+                    rows.append((header, int(number), self.legend[name][number]))
+        return pd.DataFrame(rows, columns=['Kolumna', 'Numer', 'Opis'])
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Source File Readers
+
+Format detection and native readers for the yearly booking exports.
+"""
+
+import csv
+import pandas as pd
+from pathlib import Path
+from typing import Iterator
+from html_export_parser import read_export_table, iter_export_frames, ExportLayoutError
+
+# Formaty kolumnowe - czytane natywnie, bez cache sparsowanych tabel
+COLUMNAR_FORMATS = ('parquet', 'feather')
+
+# Sygnatury plików binarnych
+_MAGIC_BYTES = [
+    (b'PAR1', 'parquet'),
+    (b'ARROW1', 'feather'),
+    (b'FEA1', 'feather'),
+    (b'PK\x03\x04', 'xlsx'),
+    (b'\xd0\xcf\x11\xe0', 'xls'),
+]
+
+def detect_format(file_path: Path) -> str:
+    """Rozpoznaje format po zawartości pliku (rozszerzenie .xls bywa HTML-em)"""
+    with open(file_path, 'rb') as f:
+        head = f.read(4096)
+
+    for magic, file_format in _MAGIC_BYTES:
+        if head.startswith(magic):
+            return file_format
+
+    text = head.decode('utf-8', errors='ignore').lstrip('﻿ \t\r\n').lower()
+    if text.startswith('<') and ('<html' in text or '<table' in text or '<!doctype' in text):
+        return 'html'
+    if file_path.suffix.lower() in ('.csv', '.txt'):
+        return 'csv'
+
+    raise ValueError(f"Nierozpoznany format pliku: {file_path.name}")
+
+def read_source_table(file_path: Path, file_format: str) -> pd.DataFrame:
+    """Wczytuje tabelę najszybszym natywnym czytnikiem dla danego formatu"""
+    if file_format == 'html':
+        # Szybki parser strumieniowy, ogólny parser HTML dla nietypowego układu
+        try:
+            return read_export_table(file_path)
+        except ExportLayoutError as e:
+            print(f"    Niestandardowy układ pliku ({e}) - używam read_html")
+            return pd.read_html(str(file_path), encoding='utf-8')[0]
+
+    if file_format == 'csv':
+        return pd.read_csv(file_path, sep=_sniff_csv_separator(file_path), encoding='utf-8-sig')
+
+    if file_format == 'xlsx':
+        return pd.read_excel(file_path, engine='openpyxl')
+
+    if file_format == 'xls':
+        return pd.read_excel(file_path, engine='xlrd')
+
+    if file_format in COLUMNAR_FORMATS:
+        try:
+            if file_format == 'parquet':
+                return pd.read_parquet(file_path)
+            return pd.read_feather(file_path)
+        except ImportError as e:
+            raise ImportError(f"Odczyt formatu {file_format} wymaga pakietu pyarrow: {e}") from e
+
+    raise ValueError(f"Nieobsługiwany format: {file_format}")
+
+def iter_source_chunks(file_path: Path, file_format: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Wczytuje tabelę porcjami po chunk_size wierszy - w pamięci tylko bieżąca porcja
+    
+    Pliki Excel nie mają czytnika strumieniowego w pandas - są wczytywane w całości
+    i dzielone (format i tak ogranicza arkusz do ~1 mln wierszy).
+    """
+    if file_format == 'html':
+        yield from _iter_html_chunks(file_path, chunk_size)
+    
+    elif file_format == 'csv':
+        with pd.read_csv(file_path, sep=_sniff_csv_separator(file_path), encoding='utf-8-sig',
+                         chunksize=chunk_size) as reader:
+            yield from reader
+    
+    elif file_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(f"Odczyt formatu parquet wymaga pakietu pyarrow: {e}") from e
+        for record_batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield record_batch.to_pandas()
+    
+    elif file_format == 'feather':
+        try:
+            import pyarrow.ipc as ipc
+        except ImportError as e:
+            raise ImportError(f"Odczyt formatu feather wymaga pakietu pyarrow: {e}") from e
+        with ipc.open_file(str(file_path)) as reader:
+            for i in range(reader.num_record_batches):
+                df = reader.get_batch(i).to_pandas()
+                for start in range(0, len(df), chunk_size):
+                    yield df.iloc[start:start + chunk_size]
+    
+    else:
+        df = read_source_table(file_path, file_format)
+        for start in range(0, max(len(df), 1), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+def _iter_html_chunks(file_path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Porcje eksportu HTML z parsera strumieniowego (read_html tylko gdy układ jest nietypowy od początku)"""
+    emitted = False
+    try:
+        for frame in iter_export_frames(file_path, chunk_size):
+            yield frame
+            emitted = True
+    except ExportLayoutError as e:
+        # Część wierszy już przekazana - ponowne wczytanie całości zdublowałoby je
+        if emitted:
+            raise
+        print(f"    Niestandardowy układ pliku ({e}) - używam read_html")
+        df = pd.read_html(str(file_path), encoding='utf-8')[0]
+        for start in range(0, max(len(df), 1), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+def _sniff_csv_separator(file_path: Path) -> str:
+    """Wykrywa separator CSV (eksporty bywają z ';' zamiast ',')"""
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(65536)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+    except csv.Error:
+        return ','
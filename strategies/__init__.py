@@ -6,7 +6,7 @@ STRATEGIES PACKAGE
 Package zawierający wszystkie strategie kategoryzacji.
 """
 
-from .base_strategy import CategoryStrategy
+from .base_strategy import CategoryStrategy, SinglePassStrategy
 from .training_strategy import TrainingStrategy
 from .equipment_strategy import EquipmentStrategy
 from .policy_strategy import PolicyStrategy
@@ -16,10 +16,14 @@ from .egypt_strategy import EgyptStrategy
 from .greece_strategy import GreeceStrategy
 from .countries_strategy import CountriesStrategy
 from .exotic_strategy import ExoticStrategy
+from .decision_cache import DecisionCache
+from .decision_table import DecisionTable
+from .strategy_profiler import StrategyProfiler
 from .category_manager import CategoryManager
 
 __all__ = [
     'CategoryStrategy',
+    'SinglePassStrategy',
     'TrainingStrategy',
     'EquipmentStrategy', 
     'PolicyStrategy',
@@ -29,5 +33,8 @@ __all__ = [
     'GreeceStrategy',
     'CountriesStrategy',
     'ExoticStrategy',
+    'DecisionCache',
+    'DecisionTable',
+    'StrategyProfiler',
     'CategoryManager'
 ]
\ No newline at end of file
@@ -9,12 +9,15 @@ Bazowa klasa dla wszystkich strategii kategoryzacji.
 from abc import ABC, abstractmethod
 from typing import Optional, Tuple
 from models import TravelRecord
+from rule_context import RuleContext
 
 class CategoryStrategy(ABC):
     """Bazowa klasa abstrakcyjna dla strategii kategoryzacji"""
     
-    def __init__(self, normalizer: Optional[object] = None) -> None:
+    def __init__(self, normalizer: Optional[object] = None, context: Optional[RuleContext] = None) -> None:
         self.normalizer = normalizer
+        # Wspólny kontekst reguł (paczka reguł) - wstrzykiwany przez CategoryManager
+        self.context = context or RuleContext.default()
     
     @abstractmethod
     def can_handle(self, record: TravelRecord) -> bool:
@@ -32,6 +35,20 @@ class CategoryStrategy(ABC):
         """Priorytet strategii - niższe wartości = wyższy priorytet"""
         pass
     
+    def evaluate(self, record: TravelRecord) -> Optional[str]:
+        """Jedna ocena rekordu - kategoria lub None gdy strategia go nie obsługuje
+        
+        Adapter dla strategii z parą can_handle/categorize; strategie jednoprzebiegowe
+        (SinglePassStrategy) nadpisują tę metodę.
+        """
+        if self.can_handle(record):
+            return self.categorize(record)
+        return None
+    
+    def reload_rules(self) -> None:
+        """Odświeża dane strategii po podmianie reguł w kontekście (domyślnie nic)"""
+        pass
+    
     def get_normalized_values(self, record: TravelRecord) -> Tuple[str, str, str, str]:
         """Helper do pobierania znormalizowanych wartości"""
         hotel = record.hotel_normalized or ''
@@ -39,4 +56,23 @@ class CategoryStrategy(ABC):
         raw_hotel = record.hotel.lower() if record.hotel else ''
         raw_destination = record.destination.lower() if record.destination else ''
         
-        return hotel, destination, raw_hotel, raw_destination
\ No newline at end of file
+        return hotel, destination, raw_hotel, raw_destination
+
+class SinglePassStrategy(CategoryStrategy):
+    """Strategia oceniająca rekord jednym przebiegiem (evaluate)
+    
+    can_handle i categorize są wyprowadzone z evaluate - dla zgodności z wywołaniami
+    starego protokołu. Łańcuch strategii wywołuje wyłącznie evaluate.
+    """
+    
+    @abstractmethod
+    def evaluate(self, record: TravelRecord) -> Optional[str]:
+        """Zwraca kategorię rekordu lub None gdy strategia go nie obsługuje"""
+        pass
+    
+    def can_handle(self, record: TravelRecord) -> bool:
+        return self.evaluate(record) is not None
+    
+    def categorize(self, record: TravelRecord) -> str:
+        category = self.evaluate(record)
+        return category if category is not None else 'Nieprzypisane'
@@ -6,8 +6,19 @@ CATEGORY MANAGER
 Manager wszystkich strategii kategoryzacji - Chain of Responsibility pattern.
 """
 
-from typing import List
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from config import Config
 from models import TravelRecord
+from rule_context import RuleContext
+from strategies.decision_cache import DecisionCache
+from strategies.decision_table import DecisionTable
+from strategies.fallback_rules import (
+    MISSING_HOTELS, HURGHADA_DESTINATIONS, MISSING_HOTEL_KEPT_DESTINATIONS, CANCELLATION_KEYWORDS,
+    SKI_KEYWORDS, SKI_DESTINATIONS, VOUCHER_KEYWORDS, VOUCHER_TRAINING_KEYWORDS,
+    UNASSIGNED_HOTEL_KEYWORDS, UNASSIGNED_HOTELS, INSURANCE_KEYWORDS, UNASSIGNED_DESTINATIONS, EMPTY_VALUES
+)
+from strategies.strategy_profiler import StrategyProfiler
 from strategies.base_strategy import CategoryStrategy
 from strategies.training_strategy import TrainingStrategy
 from strategies.equipment_strategy import EquipmentStrategy
@@ -22,99 +33,205 @@ from strategies.exotic_strategy import ExoticStrategy
 class CategoryManager:
     """Manager strategii kategoryzacji - orchestrator wzorców"""
     
-    def __init__(self, normalizer: object) -> None:
+    def __init__(self, normalizer: object, context: Optional[RuleContext] = None,
+                 cache_size: Optional[int] = None, cache_policy: Optional[str] = None,
+                 engine: Optional[str] = None, profile: Optional[bool] = None) -> None:
         self.normalizer = normalizer
+        self.context = context or RuleContext.default()
         self.strategies = self._create_strategies()
+        self.engine = engine or Config.CATEGORY_ENGINE
+        if self.engine not in ('table', 'chain'):
+            raise ValueError(f"Nieznany silnik kategoryzacji: {self.engine} (dostępne: table, chain)")
+        self.decision_table = DecisionTable(self.context.rule_pack, self.normalizer, memo_size=Config.CATEGORY_TABLE_MEMO_SIZE)
+        # Decyzja zależy tylko od wartości hotelu i kierunku - powtórzenia omijają silnik.
+        # Tylko kategoryzacja rekordami: tryb kolumnowy liczy każdą kombinację zbioru raz, bez tej pamięci
+        self.decision_cache = DecisionCache(
+            cache_size if cache_size is not None else Config.CATEGORY_CACHE_SIZE,
+            cache_policy or Config.CATEGORY_CACHE_POLICY
+        )
+        # Profil wybranego silnika (opcjonalny) - bez profilu kategoryzacja nie ma żadnych pomiarów
+        profile = Config.CATEGORY_PROFILING if profile is None else profile
+        self.profiler: Optional[StrategyProfiler] = StrategyProfiler() if profile else None
+        self.context.add_listener(self._on_rules_changed)
     
     def _create_strategies(self) -> List[CategoryStrategy]:
         """Factory method - tworzy wszystkie strategie w odpowiedniej kolejności"""
         strategies = [
-            TrainingStrategy(self.normalizer),       # Priority 1
-            EquipmentStrategy(self.normalizer),      # Priority 2
-            PolicyStrategy(self.normalizer),         # Priority 3
-            FlightStrategy(self.normalizer),         # Priority 4
-            KitesafariStrategy(self.normalizer),     # Priority 9
-            EgyptStrategy(self.normalizer),          # Priority 10
-            GreeceStrategy(self.normalizer),         # Priority 11
-            CountriesStrategy(self.normalizer),      # Priority 12
-            ExoticStrategy(self.normalizer),         # Priority 13
+            TrainingStrategy(self.normalizer, self.context),    # Priority 1
+            EquipmentStrategy(self.normalizer, self.context),   # Priority 2
+            PolicyStrategy(self.normalizer, self.context),      # Priority 3
+            FlightStrategy(self.normalizer, self.context),      # Priority 4
+            KitesafariStrategy(self.normalizer, self.context),  # Priority 9
+            EgyptStrategy(self.normalizer, self.context),       # Priority 10
+            GreeceStrategy(self.normalizer, self.context),      # Priority 11
+            CountriesStrategy(self.normalizer, self.context),   # Priority 12
+            ExoticStrategy(self.normalizer, self.context),      # Priority 13
         ]
         
         # Sortuj według priorytetu (niższe = wyższy priorytet)
         return sorted(strategies, key=lambda s: s.priority)
     
+    def _on_rules_changed(self, old_pack: object, new_pack: object) -> None:
+        """Przeładowuje dane strategii z nowej paczki reguł"""
+        for strategy in self.strategies:
+            strategy.reload_rules()
+        
+        # Zmiana samych reguł normalizacji zmienia tylko klucze (znormalizowane wartości) -
+        # decyzje pozostają ważne. Wzorce i kategorie hoteli wpływają na same decyzje.
+        if (old_pack.patterns != new_pack.patterns or
+                old_pack.hotel_categories != new_pack.hotel_categories):
+            self.decision_table = DecisionTable(new_pack, self.normalizer, memo_size=Config.CATEGORY_TABLE_MEMO_SIZE)
+            self.decision_cache.clear()
+            print("    Pamięć decyzji kategorii wyczyszczona")
+    
+    @staticmethod
+    def decision_key(record: TravelRecord) -> Tuple[str, str, str, str]:
+        """Wszystko, od czego zależy decyzja: znormalizowane i surowe (małe litery) hotel i kierunek"""
+        return (record.hotel_normalized or '',
+                record.destination_normalized or '',
+                record.hotel.lower() if record.hotel else '',
+                record.destination.lower() if record.destination else '')
+    
     def categorize_record(self, record: TravelRecord) -> str:
-        """Główna metoda kategoryzacji używająca Chain of Responsibility"""
+        """Główna metoda kategoryzacji - decyzja z pamięci lub z łańcucha strategii"""
+        key = self.decision_key(record)
+        category = self.decision_cache.get(key)
+        if category is None:
+            category = self._categorize_uncached(record)
+            self.decision_cache.put(key, category)
+        return category
+    
+    def get_cache_stats(self) -> Dict[str, Union[int, float, str]]:
+        """Statystyki pamięci decyzji (trafienia, chybienia, odsetek trafień)"""
+        return self.decision_cache.get_stats()
+    
+    def get_profile_report(self) -> Optional[Dict[str, Any]]:
+        """Raport profilu kategoryzacji lub None gdy profilowanie jest wyłączone"""
+        return self.profiler.report(self.decision_table) if self.profiler is not None else None
+    
+    def take_profile(self) -> Optional[StrategyProfiler]:
+        """Zwraca zebrany profil i zaczyna nowy (np. liczniki porcji w procesie puli)"""
+        profiler = self.profiler
+        if profiler is not None:
+            self.profiler = StrategyProfiler()
+        return profiler
+    
+    def verify_decision_table(self, records: Iterable[TravelRecord]) -> List[Tuple[TravelRecord, str, str]]:
+        """Porównuje tablicę decyzyjną (rekordami i kolumnowo) z łańcuchem strategii
+        
+        Zwraca rozbieżności (rekord, łańcuch, tablica).
+        """
+        records = list(records)
+        columnar = self.decision_table.categorize_many(records)
+        mismatches = []
+        for record, column_category in zip(records, columnar):
+            expected = self._categorize_chain(record)
+            for actual in (self.decision_table.categorize(record), column_category):
+                if actual != expected:
+                    mismatches.append((record, expected, actual))
+                    break
+        return mismatches
+    
+    def _categorize_uncached(self, record: TravelRecord) -> str:
+        """Kategoryzacja wybranym silnikiem (profil mierzy ten silnik)"""
+        if self.engine == 'chain':
+            return self._categorize_chain(record)
+        if self.profiler is None:
+            return self.decision_table.categorize(record)
         
+        start = time.perf_counter()
+        number = self.decision_table.match_record(record)
+        self.profiler.count_table_decision(number, time.perf_counter() - start)
+        return self.decision_table.category(number)
+    
+    def _categorize_chain(self, record: TravelRecord) -> str:
+        """Kategoryzacja łańcuchem strategii (Chain of Responsibility) - wzorzec dla tablicy decyzyjnej"""
+        if self.profiler is None:
+            return self._run_chain(record)
+        
+        start = time.perf_counter()
+        category = self._run_chain(record)
+        self.profiler.count_decision(time.perf_counter() - start)
+        return category
+    
+    def _run_chain(self, record: TravelRecord) -> str:
+        """Przypadki specjalne, strategie w kolejności priorytetu i fallback"""
         # Specjalne przypadki na początku (jak w oryginalnym kodzie)
         hotel = record.hotel_normalized or ''
         destination = record.destination_normalized or ''
         
         # Specjalny przypadek: hotel nan + kierunek Hurghada = Nieprzypisane
-        if hotel in ['N/A', 'nan'] and destination in ['hrg', 'hurghada', 'egipt, hurghada']:
+        if hotel in MISSING_HOTELS and destination in HURGHADA_DESTINATIONS:
+            if self.profiler is not None:
+                self.profiler.count_special_case('brak_hotelu_hurghada')
             return 'Nieprzypisane'
         
         # Specjalny przypadek: hotel nan + dowolny kierunek = Nieprzypisane 
-        if hotel in ['N/A', 'nan'] and destination not in ['kitesafari', 'polisa']:
+        if hotel in MISSING_HOTELS and destination not in MISSING_HOTEL_KEPT_DESTINATIONS:
+            if self.profiler is not None:
+                self.profiler.count_special_case('brak_hotelu')
             return 'Nieprzypisane'
         
         # Próbuj każdą strategię w kolejności priorytetu
-        for strategy in self.strategies:
-            if strategy.can_handle(record):
-                return strategy.categorize(record)
+        if self.profiler is not None:
+            category = self.profiler.run(self.strategies, record)
+            if category is not None:
+                return category
+        else:
+            for strategy in self.strategies:
+                category = strategy.evaluate(record)
+                if category is not None:
+                    return category
         
         # Jeśli żadna strategia nie obsłużyła - fallback na specjalne przypadki
         return self._handle_fallback(record)
     
     def _handle_fallback(self, record: TravelRecord) -> str:
         """Obsługuje przypadki których nie obsłużyła żadna strategia"""
+        branch, category = self._fallback_branch(record)
+        if self.profiler is not None:
+            self.profiler.count_fallback(branch)
+        return category
+    
+    def _fallback_branch(self, record: TravelRecord) -> Tuple[str, str]:
+        """Gałąź fallbacku, która rozstrzyga rekord, i jej kategoria"""
         hotel = record.hotel_normalized or ''
         destination = record.destination_normalized or ''
         
         # Rezygnacje i skrócenia wyjazdu → Nieprzypisane
-        if ('rezygnacja' in hotel or 'rezygnacja' in destination or
-            'skrocenie' in hotel or 'skrocenie' in destination or
-            'skrócenie' in hotel or 'skrócenie' in destination):
-            return 'Nieprzypisane'
+        if any(keyword in hotel or keyword in destination for keyword in CANCELLATION_KEYWORDS):
+            return 'rezygnacja_skrocenie', 'Nieprzypisane'
         
         # Narty
-        if 'narty' in hotel or destination == 'austria':
-            return 'Narty'
+        if any(keyword in hotel for keyword in SKI_KEYWORDS) or destination in SKI_DESTINATIONS:
+            return 'narty', 'Narty'
         
         # Vouchery (ale nie szkolenie)
-        voucher_keywords = ['voucher', 'vocher', 'prezentowy', 'bezterminowy']
-        if any(keyword in hotel for keyword in voucher_keywords):
+        if any(keyword in hotel for keyword in VOUCHER_KEYWORDS):
             # Wykluczenia - to NIE są vouchery
-            training_keywords = ['kurs', 'szkolenie', 'lekcj', 'godzinn', 'ind', 'premium', 'standard']
-            if not any(keyword in hotel for keyword in training_keywords):
-                return 'Voucher'
+            if not any(keyword in hotel for keyword in VOUCHER_TRAINING_KEYWORDS):
+                return 'voucher', 'Voucher'
         
         # Specjalne przypadki nieprzypisanych
-        if 'apartament' in hotel or hotel in ['test', 'N/A'] or hotel == '':
-            return 'Nieprzypisane'
+        if any(keyword in hotel for keyword in UNASSIGNED_HOTEL_KEYWORDS) or hotel in UNASSIGNED_HOTELS:
+            return 'apartament_test_pusty', 'Nieprzypisane'
         
         # Ubezpieczenia (ogólne) - wszystkie formy słowa polisa
-        insurance_keywords = [
-            'polisa', 'polisy', 'polisę', 'polisą', 'polisie', 'polis',
-            'ubezp', 'ubezpieczenie', 'ubezpieczenia', 'sporty wyczynowo', 'filipiny', 
-            'wietnam', 'tajlandia', '3 polisy', 'ubkr'
-        ]
-        if any(keyword in hotel for keyword in insurance_keywords):
-            return 'Ubezpieczenie'
-        if any(keyword in destination for keyword in insurance_keywords):
-            return 'Ubezpieczenie'
+        if any(keyword in hotel for keyword in INSURANCE_KEYWORDS):
+            return 'ubezpieczenie_hotel', 'Ubezpieczenie'
+        if any(keyword in destination for keyword in INSURANCE_KEYWORDS):
+            return 'ubezpieczenie_kierunek', 'Ubezpieczenie'
         
         # Brak pola touroperator w miniaturze strukturze - pomijamy sprawdzenie firm ubezpieczeniowych
         
         # Nieprzypisane kierunki
-        if destination in {'nieznany', 'voucher', 'kurs', 'wynajem sprzętu'}:
-            return 'Nieprzypisane'
+        if destination in UNASSIGNED_DESTINATIONS:
+            return 'nieprzypisany_kierunek', 'Nieprzypisane'
         
         # Sprawdź puste hotele z niepustymi kierunkami (na końcu!)
-        empty_values = ['', 'nan', 'none', 'brak']
-        hotel_empty = hotel.lower() in empty_values
-        destination_not_empty = destination and destination.lower() not in empty_values
+        hotel_empty = hotel.lower() in EMPTY_VALUES
+        destination_not_empty = destination and destination.lower() not in EMPTY_VALUES
         if hotel_empty and destination_not_empty:
-            return 'Nieprzypisane'
+            return 'pusty_hotel', 'Nieprzypisane'
         
-        return 'Nieprzypisane'
\ No newline at end of file
+        return 'pozostale', 'Nieprzypisane'
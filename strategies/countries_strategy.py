@@ -6,17 +6,42 @@ COUNTRIES STRATEGY
 Strategia kategoryzacji krajów.
 """
 
-import json
-from pathlib import Path
-from typing import Optional
-from strategies.base_strategy import CategoryStrategy
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from strategies.base_strategy import SinglePassStrategy
 from models import TravelRecord
+from rule_context import RuleContext
+from pattern_matcher import GroupMatcher
 
-class CountriesStrategy(CategoryStrategy):
+@dataclass(frozen=True)
+class CountryRule:
+    """Kraj - kierunek równy jednej z wartości, kierunek lub hotel zawierający słowo albo hotel z grupy"""
+    category: str
+    destinations: Tuple[str, ...] = ()
+    destination_keywords: Tuple[str, ...] = ()
+    hotel_keywords: Tuple[str, ...] = ()
+    hotel_group: Optional[str] = None
+
+# Kraje w kolejności sprawdzania - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+COUNTRY_RULES = (
+    CountryRule('Maroko', destinations=('aga',), destination_keywords=('maroko',)),
+    # Tunezja → Nieprzypisane
+    CountryRule('Nieprzypisane', destinations=('tun', 'dba'), destination_keywords=('tunezja',)),
+    CountryRule('Chorwacja', destinations=('chorwacja',)),
+    CountryRule('Turcja', destinations=('turcja',), hotel_group='turkey_hotels'),
+    CountryRule('Mauritius', destinations=('mauritius', 'mru'), destination_keywords=('mauritius',),
+                hotel_keywords=('riu creole', 'hotle riu creole')),
+    CountryRule('Sal', destinations=('sal',), hotel_group='sal_hotels'),
+    CountryRule('Fuerteventura', destinations=('fuerteventura',), hotel_group='fuerteventura_hotels'),
+    CountryRule('Brazylia', destinations=('for', 'ssa'), destination_keywords=('brazylia', 'fortaleza'),
+                hotel_keywords=('barra grande', 'jericoacoara', 'brazil kite safari')),
+)
+
+class CountriesStrategy(SinglePassStrategy):
     """Strategia kategoryzacji różnych krajów"""
     
-    def __init__(self, normalizer: Optional[object] = None) -> None:
-        super().__init__(normalizer)
+    def __init__(self, normalizer: Optional[object] = None, context: Optional[RuleContext] = None) -> None:
+        super().__init__(normalizer, context)
         self.load_hotel_categories()
     
     @property
@@ -25,103 +50,27 @@ class CountriesStrategy(CategoryStrategy):
     
     def load_hotel_categories(self) -> None:
         """Wczytuje kategorie hoteli z JSON"""
-        config_path = Path(__file__).parent.parent / "config" / "hotel_categories.json"
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                categories = json.load(f)
-                
-            self.turkey_hotels = set(categories.get("turkey_hotels", []))
-            self.sal_hotels = set(categories.get("sal_hotels", []))
-            self.fuerteventura_hotels = set(categories.get("fuerteventura_hotels", []))
+            self.hotel_matcher = self.context.rule_pack.hotel_category_matcher
             
         except Exception as e:
             print(f"Błąd wczytywania hotel_categories.json dla krajów: {e}")
-            self.turkey_hotels = set()
-            self.sal_hotels = set()
-            self.fuerteventura_hotels = set()
+            self.hotel_matcher = GroupMatcher({})
     
-    def can_handle(self, record: TravelRecord) -> bool:
-        """Sprawdza czy to jeden ze wspieranych krajów"""
-        hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
-        
-        # Maroko
-        if 'maroko' in destination or destination == 'aga':
-            return True
-        
-        # Tunezja → Nieprzypisane
-        if 'tunezja' in destination or destination in ['tun', 'dba']:
-            return True
-        
-        # Chorwacja
-        if destination == 'chorwacja':
-            return True
-        
-        # Turcja
-        if destination == 'turcja' or any(h in hotel for h in self.turkey_hotels):
-            return True
-        
-        # Mauritius
-        if (destination == 'mauritius' or destination == 'mru' or 
-            'mauritius' in destination or 'riu creole' in hotel or
-            'hotle riu creole' in hotel):
-            return True
-        
-        # Sal i Fuerteventura
-        if destination == 'sal' or any(h in hotel for h in self.sal_hotels):
-            return True
-        if destination == 'fuerteventura' or any(h in hotel for h in self.fuerteventura_hotels):
-            return True
-        
-        # Brazylia
-        if (destination in ['for', 'ssa'] or 
-            'brazylia' in destination or 
-            'fortaleza' in destination or
-            'barra grande' in hotel or
-            'jericoacoara' in hotel or
-            'brazil kite safari' in hotel):
-            return True
-        
-        return False
+    def reload_rules(self) -> None:
+        """Pobiera automat grup hoteli z nowej paczki reguł"""
+        self.load_hotel_categories()
     
-    def categorize(self, record: TravelRecord) -> str:
-        """Kategoryzuje kraje"""
+    def evaluate(self, record: TravelRecord) -> Optional[str]:
+        """Kategoryzuje kraje (None gdy to żaden ze wspieranych krajów)"""
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
+        groups = self.hotel_matcher.match_groups(hotel)
         
-        # Maroko
-        if 'maroko' in destination or destination == 'aga':
-            return 'Maroko'
-        
-        # Tunezja → Nieprzypisane
-        if 'tunezja' in destination or destination in ['tun', 'dba']:
-            return 'Nieprzypisane'
-        
-        # Chorwacja
-        if destination == 'chorwacja':
-            return 'Chorwacja'
-        
-        # Turcja
-        if destination == 'turcja' or any(h in hotel for h in self.turkey_hotels):
-            return 'Turcja'
-        
-        # Mauritius
-        if (destination == 'mauritius' or destination == 'mru' or 
-            'mauritius' in destination or 'riu creole' in hotel or
-            'hotle riu creole' in hotel):
-            return 'Mauritius'
-        
-        # Sal i Fuerteventura
-        if destination == 'sal' or any(h in hotel for h in self.sal_hotels):
-            return 'Sal'
-        if destination == 'fuerteventura' or any(h in hotel for h in self.fuerteventura_hotels):
-            return 'Fuerteventura'
-        
-        # Brazylia
-        if (destination in ['for', 'ssa'] or 
-            'brazylia' in destination or 
-            'fortaleza' in destination or
-            'barra grande' in hotel or
-            'jericoacoara' in hotel or
-            'brazil kite safari' in hotel):
-            return 'Brazylia'
+        for country in COUNTRY_RULES:
+            if (destination in country.destinations or
+                any(keyword in destination for keyword in country.destination_keywords) or
+                any(keyword in hotel for keyword in country.hotel_keywords) or
+                country.hotel_group in groups):
+                return country.category
         
-        return 'Nieprzypisane'
\ No newline at end of file
+        return None
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Category Decision Cache
+
+Bounded memo of category decisions placed in front of the strategy chain.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Union
+
+class DecisionCache:
+    """Ograniczona pamięć decyzji: klucz (wartości rekordu) -> kategoria
+
+    Polityki usuwania przy przepełnieniu:
+    - 'lru'  - usuwa najdawniej używany wpis (trafienie odświeża wpis)
+    - 'fifo' - usuwa najstarszy wpis (trafienie nie zmienia kolejności)
+    """
+
+    POLICIES = ('lru', 'fifo')
+
+    def __init__(self, max_size: int = 100000, policy: str = 'lru') -> None:
+        if policy not in self.POLICIES:
+            raise ValueError(f"Nieznana polityka pamięci decyzji: {policy} (dostępne: {', '.join(self.POLICIES)})")
+        self.max_size = max_size
+        self.policy = policy
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Zwraca zapamiętaną decyzję lub None (liczy trafienia i chybienia)"""
+        category = self._entries.get(key)
+        if category is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if self.policy == 'lru':
+            self._entries.move_to_end(key)
+        return category
+
+    def put(self, key: Hashable, category: str) -> None:
+        """Zapamiętuje decyzję, usuwając wpis wg polityki przy przepełnieniu"""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = category
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Usuwa wszystkie decyzje (liczniki zostają)"""
+        self._entries.clear()
+
+    def take_counts(self) -> Dict[str, int]:
+        """Zwraca liczniki od ostatniego wywołania i je zeruje (np. porcja procesu puli)"""
+        counts = {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+        self.hits = self.misses = self.evictions = 0
+        return counts
+
+    def add_counts(self, counts: Dict[str, int]) -> None:
+        """Dolicza liczniki innej pamięci (np. z procesu puli)"""
+        self.hits += counts['hits']
+        self.misses += counts['misses']
+        self.evictions += counts['evictions']
+
+    def get_stats(self) -> Dict[str, Union[int, float, str]]:
+        """Statystyki: trafienia, chybienia, usunięcia, rozmiar i odsetek trafień"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'policy': self.policy
+        }
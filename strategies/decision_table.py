@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compiled Decision Table
+
+The strategy chain expressed as data: keyword predicates are extracted into a
+bitmask in one pass per record and a priority-ordered table maps the bitmask
+to a category.
+"""
+
+import random
+import re
+import time
+from datetime import date
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from models import TravelRecord
+from pattern_matcher import GroupMatcher
+from strategies.training_strategy import TRAINING_HOTEL, EXOTIC_HOTELS, BRAZIL_KITE_SAFARI, TRAINING_KEYWORDS
+from strategies.equipment_strategy import TRAINING_RENTAL_KEYWORDS, EQUIPMENT_KEYWORDS
+from strategies.policy_strategy import POLICY_VALUE, JAPAN_DESTINATION, POLICY_COMBINATIONS, POLICY_PATTERNS
+from strategies.flight_strategy import (
+    CITY_PATTERNS_RE, FLIGHT_HOTEL, NOT_FLIGHT_KEYWORDS, FLIGHT_TICKET, FLIGHT_WORD, ROUTE_CODES,
+    FLIGHT_KEYWORDS, AIRPORT_PAIRS
+)
+from strategies.kitesafari_strategy import (
+    KITESAFARI_EXCLUDED, KITESAFARI_KEYWORDS, KITESAFARI_BOATS, KITESAFARI_DESTINATION
+)
+from strategies.egypt_strategy import EGYPT_DESTINATIONS, EGYPT_OTHER_KEYWORDS, EGYPT_HOTEL_GROUPS
+from strategies.greece_strategy import (
+    GREECE_DESTINATIONS, GREECE_KEYWORD, LIMNOS_DESTINATIONS, LIMNOS_KEYWORDS, LIMNOS_HOTELS,
+    RODOS_DESTINATIONS, RODOS_HOTELS, OTHER_ISLANDS_DESTINATIONS, OTHER_ISLANDS_HOTELS, RODOS_DEFAULT_HOTELS
+)
+from strategies.countries_strategy import CountryRule, COUNTRY_RULES
+from strategies.exotic_strategy import (
+    EXOTIC_VALUE, RPA_DESTINATION_KEYWORDS, RPA_HOTEL, EXOTIC_DESTINATIONS, NOT_EXOTIC_HOTELS,
+    TRAINING_KEYWORDS as EXOTIC_TRAINING_KEYWORDS
+)
+from strategies.fallback_rules import (
+    MISSING_HOTELS, HURGHADA_DESTINATIONS, MISSING_HOTEL_KEPT_DESTINATIONS, CANCELLATION_KEYWORDS,
+    SKI_KEYWORDS, SKI_DESTINATIONS, VOUCHER_KEYWORDS, VOUCHER_TRAINING_KEYWORDS,
+    UNASSIGNED_HOTEL_KEYWORDS, UNASSIGNED_HOTELS, INSURANCE_KEYWORDS, UNASSIGNED_DESTINATIONS
+)
+
+# Pola rekordu dostępne dla cech
+HOTEL, DESTINATION, RAW_HOTEL, RAW_DESTINATION = 'hotel', 'destination', 'raw_hotel', 'raw_destination'
+
+@dataclass(frozen=True)
+class Feature:
+    """Cecha rekordu - jeden bit maski
+
+    Rodzaje:
+    - 'has'      - dowolne ze słów występuje w polu (podciąg)
+    - 'is'       - pole równe jednej z wartości
+    - 'group'    - dowolny hotel grupy z hotel_categories.json występuje w polu
+    - 'in_group' - pole równe jednej z wartości grupy z hotel_categories.json
+    - 'flight'   - wzorce przelotów z patterns.json (normalizer.detect_flight_patterns)
+    - 'city'     - wzorce miasto-miasto strategii przelotów
+    """
+    kind: str
+    field: str
+    values: Tuple[str, ...] = ()
+
+def hotel_has(*keywords: str) -> Feature:
+    return Feature('has', HOTEL, keywords)
+
+def dest_has(*keywords: str) -> Feature:
+    return Feature('has', DESTINATION, keywords)
+
+def hotel_is(*values: str) -> Feature:
+    return Feature('is', HOTEL, values)
+
+def dest_is(*values: str) -> Feature:
+    return Feature('is', DESTINATION, values)
+
+def hotel_group(name: str) -> Feature:
+    return Feature('group', HOTEL, (name,))
+
+def dest_in_group(name: str) -> Feature:
+    return Feature('in_group', DESTINATION, (name,))
+
+def flight(field: str) -> Feature:
+    return Feature('flight', field)
+
+def city(field: str) -> Feature:
+    return Feature('city', field)
+
+# Wynik reguły: strategia nie obsługuje rekordu - przejdź do następnego bloku
+SKIP = None
+
+# Numer predykatu/bloku, gdy żaden wiersz tablicy nie rozstrzygnął rekordu
+NO_DECISION = -1
+
+@dataclass(frozen=True)
+class Rule:
+    """Wiersz tablicy: wszystkie cechy all_of obecne i żadna z none_of -> kategoria (lub SKIP)"""
+    category: Optional[str]
+    all_of: Tuple[Feature, ...] = ()
+    none_of: Tuple[Feature, ...] = ()
+
+def rule(category: Optional[str], *all_of: Feature, unless: Tuple[Feature, ...] = ()) -> Rule:
+    return Rule(category, all_of, unless)
+
+@dataclass(frozen=True)
+class RuleBlock:
+    """Reguły jednej strategii - pierwsza pasująca decyduje, brak dopasowania = SKIP"""
+    name: str
+    rules: Tuple[Rule, ...]
+
+def _country_rules(country: CountryRule) -> Tuple[Rule, ...]:
+    """Wiersze jednego kraju CountriesStrategy - tylko warunki, które kraj definiuje"""
+    conditions = []
+    if country.destinations:
+        conditions.append(dest_is(*country.destinations))
+    if country.destination_keywords:
+        conditions.append(dest_has(*country.destination_keywords))
+    if country.hotel_keywords:
+        conditions.append(hotel_has(*country.hotel_keywords))
+    if country.hotel_group:
+        conditions.append(hotel_group(country.hotel_group))
+    return tuple(rule(country.category, condition) for condition in conditions)
+
+# Słowa kluczowe dzielone przez kilka reguł
+_MISSING_HOTEL = hotel_is(*MISSING_HOTELS)
+_KITESAFARI = hotel_has(*KITESAFARI_KEYWORDS)
+_GREECE_HOTELS = (hotel_group(LIMNOS_HOTELS), hotel_group(RODOS_HOTELS), hotel_group(OTHER_ISLANDS_HOTELS))
+
+# Łańcuch strategii w kolejności priorytetów - każdy blok odpowiada strategii z strategies/.
+# Słowa kluczowe są stałymi modułów strategii - zmiana w strategii zmienia też tablicę.
+CATEGORY_RULES: Tuple[RuleBlock, ...] = (
+    RuleBlock('Specjalne przypadki', (
+        rule('Nieprzypisane', _MISSING_HOTEL, dest_is(*HURGHADA_DESTINATIONS)),
+        rule('Nieprzypisane', _MISSING_HOTEL, unless=(dest_is(*MISSING_HOTEL_KEPT_DESTINATIONS),)),
+    )),
+    RuleBlock('TrainingStrategy', (
+        rule('Szkolenia', hotel_is(TRAINING_HOTEL)),
+        rule(SKIP, hotel_has(*EXOTIC_HOTELS)),
+        rule(SKIP, hotel_has(BRAZIL_KITE_SAFARI)),
+        rule('Szkolenia', hotel_has(*TRAINING_KEYWORDS)),
+    )),
+    RuleBlock('EquipmentStrategy', (
+        rule(SKIP, hotel_has(*TRAINING_RENTAL_KEYWORDS)),
+        rule('Sprzęt', hotel_has(*EQUIPMENT_KEYWORDS)),
+    )),
+    RuleBlock('PolicyStrategy', (
+        rule('Ubezpieczenie', hotel_is(POLICY_VALUE)),
+        rule('Ubezpieczenie', dest_is(POLICY_VALUE)),
+        rule('Ubezpieczenie', dest_has(JAPAN_DESTINATION), hotel_has(POLICY_VALUE)),
+        *(rule('Ubezpieczenie', *(hotel_has(word) for word in words)) for words in POLICY_COMBINATIONS),
+        rule('Ubezpieczenie', hotel_has(*POLICY_PATTERNS)),
+    )),
+    RuleBlock('FlightStrategy', (
+        rule('Sam przelot', hotel_is(FLIGHT_HOTEL)),
+        rule(SKIP, hotel_has(*NOT_FLIGHT_KEYWORDS)),
+        # Kitesafari nie jest przelotem, chyba że to wyraźnie bilet lotniczy
+        rule(SKIP, _KITESAFARI, unless=(hotel_has(FLIGHT_TICKET), hotel_has(FLIGHT_WORD))),
+        rule(SKIP, _KITESAFARI, unless=(hotel_has(FLIGHT_TICKET), hotel_has(*ROUTE_CODES))),
+        rule('Sam przelot', hotel_has(*FLIGHT_KEYWORDS)),
+        rule('Sam przelot', dest_has(*FLIGHT_KEYWORDS)),
+        rule('Sam przelot', flight(RAW_HOTEL)),
+        rule('Sam przelot', flight(RAW_DESTINATION)),
+        rule('Sam przelot', flight(HOTEL)),
+        rule('Sam przelot', flight(DESTINATION)),
+        *(rule('Sam przelot', *(hotel_has(code) for code in pair)) for pair in AIRPORT_PAIRS),
+        rule('Sam przelot', city(HOTEL)),
+        rule('Sam przelot', city(DESTINATION)),
+    )),
+    RuleBlock('KitesafariStrategy', (
+        rule(SKIP, hotel_has(KITESAFARI_EXCLUDED)),
+        rule('Kitesafari', _KITESAFARI),
+        rule('Kitesafari', hotel_has(*KITESAFARI_BOATS)),
+        rule('Kitesafari', dest_is(KITESAFARI_DESTINATION)),
+    )),
+    RuleBlock('EgyptStrategy', (
+        rule('Egipt - inne', hotel_has(*EGYPT_OTHER_KEYWORDS)),
+        *(rule(category, hotel_group(group)) for group, category in EGYPT_HOTEL_GROUPS),
+        rule('Nieprzypisane', dest_is(*EGYPT_DESTINATIONS)),
+    )),
+    RuleBlock('GreeceStrategy', (
+        rule(SKIP, unless=(dest_is(*GREECE_DESTINATIONS), dest_has(GREECE_KEYWORD)) + _GREECE_HOTELS),
+        rule('Grecja - Limnos', dest_is(*LIMNOS_DESTINATIONS)),
+        rule('Grecja - Limnos', dest_has(*LIMNOS_KEYWORDS)),
+        rule('Grecja - Limnos', hotel_group(LIMNOS_HOTELS)),
+        rule('Grecja - Rodos', dest_is(*RODOS_DESTINATIONS)),
+        rule('Grecja - Rodos', hotel_group(RODOS_HOTELS)),
+        rule('Grecja - Inne', dest_is(*OTHER_ISLANDS_DESTINATIONS)),
+        rule('Grecja - Inne', hotel_group(OTHER_ISLANDS_HOTELS)),
+        rule('Grecja - Rodos', hotel_has(*RODOS_DEFAULT_HOTELS)),
+        rule('Grecja - Inne'),
+    )),
+    RuleBlock('CountriesStrategy', tuple(row for country in COUNTRY_RULES for row in _country_rules(country))),
+    RuleBlock('ExoticStrategy', (
+        rule('Egzotyka - inne', hotel_is(EXOTIC_VALUE)),
+        rule('Egzotyka - inne', dest_is(EXOTIC_VALUE)),
+        rule('Egzotyka - inne', *(dest_has(keyword) for keyword in RPA_DESTINATION_KEYWORDS), hotel_has(RPA_HOTEL)),
+        rule('Egzotyka - inne', dest_in_group(EXOTIC_DESTINATIONS),
+             unless=(hotel_is(*NOT_EXOTIC_HOTELS), hotel_has(*EXOTIC_TRAINING_KEYWORDS))),
+    )),
+    RuleBlock('Fallback', (
+        rule('Nieprzypisane', hotel_has(*CANCELLATION_KEYWORDS)),
+        rule('Nieprzypisane', dest_has(*CANCELLATION_KEYWORDS)),
+        rule('Narty', hotel_has(*SKI_KEYWORDS)),
+        rule('Narty', dest_is(*SKI_DESTINATIONS)),
+        rule('Voucher', hotel_has(*VOUCHER_KEYWORDS), unless=(hotel_has(*VOUCHER_TRAINING_KEYWORDS),)),
+        rule('Nieprzypisane', hotel_has(*UNASSIGNED_HOTEL_KEYWORDS)),
+        rule('Nieprzypisane', hotel_is(*UNASSIGNED_HOTELS)),
+        rule('Ubezpieczenie', hotel_has(*INSURANCE_KEYWORDS)),
+        rule('Ubezpieczenie', dest_has(*INSURANCE_KEYWORDS)),
+        rule('Nieprzypisane', dest_is(*UNASSIGNED_DESTINATIONS)),
+        # Pozostałe gałęzie _handle_fallback (puste hotele, reszta) też dają Nieprzypisane
+        rule('Nieprzypisane'),
+    )),
+)
+
+class DecisionTable:
+    """Skompilowana tablica decyzyjna - maska cech rekordu -> kategoria
+
+    Cechy podciągów są zbierane jednym automatem dla hotelu i jednym dla kierunku,
+    równości jednym słownikiem na pole. Maska każdego pola jest liczona raz dla danej
+    wartości, a decyzja raz dla danej maski - kolejne reguły prawie nic nie kosztują
+    w czasie działania.
+    """
+
+    def __init__(self, rule_pack: object, normalizer: object,
+                 blocks: Tuple[RuleBlock, ...] = CATEGORY_RULES, memo_size: int = 100000) -> None:
+        self.blocks = blocks
+        self.normalizer = normalizer
+        self.memo_size = memo_size
+
+        # Cechy w kolejności pierwszego użycia (te same cechy dzielą bit)
+        features: Dict[Feature, None] = {}
+        for block in blocks:
+            for row in block.rules:
+                features.update(dict.fromkeys(row.all_of + row.none_of))
+
+        # Bity: najpierw podciągi hotelu, potem podciągi kierunku, potem pozostałe
+        hotel_text = [f for f in features if f.field == HOTEL and f.kind in ('has', 'group')]
+        dest_text = [f for f in features if f.field == DESTINATION and f.kind in ('has', 'group')]
+        others = [f for f in features if f not in hotel_text and f not in dest_text]
+        self.features: List[Feature] = hotel_text + dest_text + others
+        self.bits: Dict[Feature, int] = {feature: 1 << i for i, feature in enumerate(self.features)}
+        self._values: Dict[Feature, List[str]] = {feature: self._keywords(feature, rule_pack)
+                                                  for feature in self.features}
+
+        # Podciągi: jeden automat na pole, bity grup przesunięte na pozycje cech
+        self._matchers: Dict[str, Tuple[GroupMatcher, int]] = {
+            HOTEL: (GroupMatcher({i: self._keywords(f, rule_pack) for i, f in enumerate(hotel_text)}), 0),
+            DESTINATION: (GroupMatcher({i: self._keywords(f, rule_pack) for i, f in enumerate(dest_text)}),
+                          len(hotel_text)),
+        }
+
+        # Równości: wartość pola -> maska wszystkich cech 'is'/'in_group' spełnionych tą wartością
+        self._equal_masks: Dict[str, Dict[str, int]] = {HOTEL: {}, DESTINATION: {}}
+        # Pozostałe cechy (wyrażenia regularne) liczone osobno: pole -> [(test, bit)]
+        self._checks: Dict[str, List[Tuple[Callable[[str], bool], int]]] = {
+            HOTEL: [], DESTINATION: [], RAW_HOTEL: [], RAW_DESTINATION: []
+        }
+        for feature in others:
+            bit = self.bits[feature]
+            if feature.kind in ('is', 'in_group'):
+                values = self._keywords(feature, rule_pack)
+                masks = self._equal_masks[feature.field]
+                for value in values:
+                    masks[value] = masks.get(value, 0) | bit
+            elif feature.kind == 'flight':
+                self._checks[feature.field].append((normalizer.detect_flight_patterns, bit))
+            elif feature.kind == 'city':
+                self._checks[feature.field].append((lambda text: CITY_PATTERNS_RE.search(text) is not None, bit))
+            else:
+                raise ValueError(f"Nieobsługiwana cecha {feature}")
+
+        # Predykaty - wszystkie wiersze tablicy ponumerowane kolejno przez bloki (numery śladu reguł)
+        self.predicates: List[Rule] = [row for block in blocks for row in block.rules]
+        self.predicate_blocks = np.array([b for b, block in enumerate(blocks) for _ in block.rules], dtype=np.int16)
+        numbers = iter(range(len(self.predicates)))
+        
+        # Wiersze skompilowane do masek: (wymagane, zabronione, kategoria, numer predykatu) w blokach
+        self._compiled: List[List[Tuple[int, int, Optional[str], int]]] = [
+            [(self._mask(row.all_of), self._mask(row.none_of), row.category, next(numbers)) for row in block.rules]
+            for block in blocks
+        ]
+        # To samo w postaci numerów kolumn macierzy cech (tryb kolumnowy)
+        index = {feature: i for i, feature in enumerate(self.features)}
+        self._compiled_columns: List[List[Tuple[np.ndarray, np.ndarray, Optional[str], int]]] = [
+            [(np.array([index[f] for f in row.all_of], dtype=np.intp),
+              np.array([index[f] for f in row.none_of], dtype=np.intp), row.category, number)
+             for row, (_, _, _, number) in zip(block.rules, compiled_rows)]
+            for block, compiled_rows in zip(blocks, self._compiled)
+        ]
+        self._decisions: Dict[int, int] = {}
+        # Każda cecha zależy od jednego pola - maski części rekordu liczone raz dla każdej wartości pola
+        self._field_masks: Dict[str, Dict[str, int]] = {field: {} for field in self._checks}
+        self.memo_clears = 0
+
+    @staticmethod
+    def _keywords(feature: Feature, rule_pack: object) -> List[str]:
+        """Teksty cechy - wprost lub z grupy hotel_categories.json"""
+        if feature.kind in ('group', 'in_group'):
+            return list(rule_pack.hotel_category_sets.get(feature.values[0], ()))
+        return list(feature.values)
+
+    def _mask(self, features: Tuple[Feature, ...]) -> int:
+        mask = 0
+        for feature in features:
+            mask |= self.bits[feature]
+        return mask
+
+    def _field_mask(self, field: str, text: str) -> int:
+        """Bity cech jednego pola rekordu (zapamiętywane dla każdej wartości pola)"""
+        masks = self._field_masks[field]
+        mask = masks.get(text)
+        if mask is None:
+            mask = 0
+            if field in self._matchers:
+                matcher, shift = self._matchers[field]
+                mask = matcher.match_mask(text) << shift | self._equal_masks[field].get(text, 0)
+            for check, bit in self._checks[field]:
+                if check(text):
+                    mask |= bit
+            if len(masks) >= self.memo_size:
+                masks.clear()
+                self.memo_clears += 1
+            masks[text] = mask
+        return mask
+
+    def get_memo_stats(self) -> Dict[str, int]:
+        """Pamięć masek pól (tryb rekordowy): zapamiętane wartości pól i liczba opróżnień po przepełnieniu"""
+        return {'values': sum(len(masks) for masks in self._field_masks.values()), 'clears': self.memo_clears}
+
+    def feature_mask(self, record: TravelRecord) -> int:
+        """Ekstrakcja cech rekordu - jedno przejście każdego pola"""
+        return (self._field_mask(HOTEL, record.hotel_normalized or '') |
+                self._field_mask(DESTINATION, record.destination_normalized or '') |
+                self._field_mask(RAW_HOTEL, record.hotel.lower() if record.hotel else '') |
+                self._field_mask(RAW_DESTINATION, record.destination.lower() if record.destination else ''))
+
+    def decide(self, mask: int) -> str:
+        """Kategoria dla maski cech - pierwszy pasujący wiersz w kolejności bloków"""
+        return self.category(self.decide_predicate(mask))
+    
+    def decide_predicate(self, mask: int) -> int:
+        """Numer rozstrzygającego predykatu dla maski cech (zapamiętywany dla każdej maski)"""
+        number = self._decisions.get(mask)
+        if number is None:
+            number = self._decisions[mask] = self.match(mask)
+        return number
+    
+    def category(self, number: int) -> str:
+        """Kategoria predykatu o danym numerze (NO_DECISION - Nieprzypisane)"""
+        return self.predicates[number].category if number != NO_DECISION else 'Nieprzypisane'
+    
+    def match(self, mask: int) -> int:
+        """Numer predykatu (wiersza tablicy), który rozstrzyga maskę, lub NO_DECISION"""
+        for rows in self._compiled:
+            for required, forbidden, category, number in rows:
+                if mask & required == required and not mask & forbidden:
+                    if category is not SKIP:
+                        return number
+                    break
+        return NO_DECISION
+
+    def match_record(self, record: TravelRecord) -> int:
+        """Numer predykatu, który rozstrzyga rekord"""
+        return self.decide_predicate(self.feature_mask(record))
+
+    def categorize(self, record: TravelRecord) -> str:
+        """Kategoria rekordu"""
+        return self.decide(self.feature_mask(record))
+
+    def _column_feature(self, feature: Feature, values: pd.Series) -> np.ndarray:
+        """Wartość cechy dla całej kolumny tekstów (maska str.contains / isin)"""
+        keywords = self._values[feature]
+        if feature.kind in ('has', 'group'):
+            if not keywords:
+                return np.zeros(len(values), dtype=bool)
+            # "dowolne słowo jest podciągiem" = wyszukanie alternatywy słów
+            pattern = re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+            return values.str.contains(pattern).to_numpy(dtype=bool)
+        if feature.kind in ('is', 'in_group'):
+            return values.isin(keywords).to_numpy(dtype=bool)
+        if feature.kind == 'flight':
+            return self.normalizer.detect_flight_patterns_column(values)
+        if feature.kind == 'city':
+            return values.str.contains(CITY_PATTERNS_RE).to_numpy(dtype=bool)
+        raise ValueError(f"Nieobsługiwana cecha {feature}")
+
+    def decide_columns(self, features: 'LazyFeatureMatrix') -> np.ndarray:
+        """Kategorie dla wierszy macierzy cech - wiersze tablicy stosowane maskami w kolejności priorytetów"""
+        return self.match_columns(features)[0]
+    
+    def match_columns(self, features: 'LazyFeatureMatrix',
+                      block_seconds: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Kategorie i numery rozstrzygających predykatów (NO_DECISION gdy brak) dla wierszy macierzy cech
+        
+        block_seconds (profil) - tablica czasów bloków, do której dodawany jest czas każdego bloku
+        razem z wyliczeniem potrzebnych mu cech.
+        """
+        categories = np.full(len(features), 'Nieprzypisane', dtype=object)
+        predicates = np.full(len(features), NO_DECISION, dtype=np.int16)
+        undecided = np.ones(len(features), dtype=bool)
+        for block, rows in enumerate(self._compiled_columns):
+            if not undecided.any():
+                break
+            if block_seconds is not None:
+                start = time.perf_counter()
+            # Rekordy, które ten blok (strategia) jeszcze może obsłużyć
+            open_rows = undecided.copy()
+            for required, forbidden, category, number in rows:
+                hit = open_rows.copy()
+                if required.size:
+                    hit &= features.columns(required, undecided).all(axis=1)
+                if forbidden.size:
+                    hit &= ~features.columns(forbidden, undecided).any(axis=1)
+                open_rows &= ~hit
+                if category is not SKIP:
+                    categories[hit] = category
+                    predicates[hit] = number
+                    undecided &= ~hit
+            if block_seconds is not None:
+                block_seconds[block] += time.perf_counter() - start
+        return categories, predicates
+
+    def categorize_columns(self, hotel: Sequence[str], destination: Sequence[str],
+                           raw_hotel: Sequence[str], raw_destination: Sequence[str]) -> np.ndarray:
+        """Wersja kolumnowa categorize - znormalizowane i surowe (małe litery) teksty, '' dla braków"""
+        return self.categorize_encoded({
+            HOTEL: encode_column(hotel), DESTINATION: encode_column(destination),
+            RAW_HOTEL: encode_column(raw_hotel), RAW_DESTINATION: encode_column(raw_destination)
+        })
+
+    def categorize_encoded(self, fields: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """Wersja dla kolumn kodowanych słownikowo: pole -> (kody wierszy, różne wartości)"""
+        return self.decide_columns(LazyFeatureMatrix(self, fields))
+
+    def match_encoded(self, fields: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                      block_seconds: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """match_columns dla kolumn kodowanych słownikowo: (kategorie, numery predykatów)"""
+        return self.match_columns(LazyFeatureMatrix(self, fields), block_seconds)
+
+    def trace_encoded(self, fields: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Ślad decyzji dla kolumn kodowanych słownikowo: (numery bloków/strategii, numery predykatów)"""
+        _, predicates = self.match_encoded(fields)
+        blocks = np.where(predicates != NO_DECISION, self.predicate_blocks[predicates], NO_DECISION)
+        return blocks.astype(np.int16), predicates
+    
+    def describe_predicate(self, number: int) -> str:
+        """Czytelny opis predykatu: blok, warunki i kategoria"""
+        row = self.predicates[number]
+        conditions = ' i '.join(describe_feature(feature) for feature in row.all_of) or 'zawsze'
+        if row.none_of:
+            conditions += ', chyba że ' + ' lub '.join(describe_feature(feature) for feature in row.none_of)
+        outcome = row.category if row.category is not SKIP else 'pomiń strategię'
+        return f"{self.blocks[self.predicate_blocks[number]].name}: {conditions} → {outcome}"
+    
+    def categorize_many(self, records: Sequence[TravelRecord]) -> np.ndarray:
+        """Kategorie listy rekordów w trybie kolumnowym"""
+        return self.categorize_columns(
+            [record.hotel_normalized or '' for record in records],
+            [record.destination_normalized or '' for record in records],
+            [record.hotel.lower() if record.hotel else '' for record in records],
+            [record.destination.lower() if record.destination else '' for record in records]
+        )
+
+# Nazwy pól w opisach predykatów
+_FIELD_NAMES = {HOTEL: 'hotel', DESTINATION: 'kierunek', RAW_HOTEL: 'hotel (surowy)',
+                RAW_DESTINATION: 'kierunek (surowy)'}
+
+def describe_feature(feature: Feature) -> str:
+    """Opis cechy do legendy śladu reguł"""
+    field = _FIELD_NAMES[feature.field]
+    values = ', '.join(repr(value) for value in feature.values)
+    if feature.kind == 'has':
+        return f"{field} zawiera {values}"
+    if feature.kind == 'is':
+        return f"{field} = {values}"
+    if feature.kind == 'group':
+        return f"{field} zawiera hotel z grupy {feature.values[0]}"
+    if feature.kind == 'in_group':
+        return f"{field} w grupie {feature.values[0]}"
+    if feature.kind == 'flight':
+        return f"{field} pasuje do wzorców przelotów"
+    return f"{field} pasuje do wzorca miasto-miasto"
+
+# Teksty dla cech bez listy słów (wzorce przelotów i miasto-miasto) oraz wartości puste
+_FUZZ_EXTRA = ('', 'N/A', 'nan', 'NONE', 'Brak', 'abc', 'x-y-z', 'katowice-hurghada', 'waw-hrg',
+               'hurghada przelot', 'marsa alam-wro', 'bilet lot', 'lot')
+
+def fuzz_records(table: DecisionTable, count: int, seed: int = 7) -> List[TravelRecord]:
+    """Losowe rekordy złożone ze słów kluczowych tablicy i grup hotel_categories.json
+
+    Hotel to 1-3 słowa, kierunek 1-2 słowa - łączenie słów różnych reguł sprawdza
+    kolejność bloków, wykluczenia i nakładające się podciągi.
+    """
+    words = sorted({word for values in table._values.values() for word in values} | set(_FUZZ_EXTRA))
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        hotel = rng.choice(words) if rng.random() < 0.3 else ' '.join(rng.choices(words, k=rng.choice((1, 1, 2, 3))))
+        destination = (rng.choice(words) if rng.random() < 0.3 else
+                       ' '.join(rng.choices(words, k=rng.choice((1, 1, 1, 2)))))
+        record = TravelRecord(lp=None, nr_rezerwacji='', klient_id='', date_created=date(2024, 1, 1),
+                              destination=destination, hotel=hotel.upper() if rng.random() < 0.2 else hotel)
+        record.hotel_normalized = hotel
+        record.destination_normalized = destination
+        records.append(record)
+    return records
+
+def encode_column(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Kodowanie słownikowe kolumny tekstów: (kody wierszy, różne wartości), brak = ''"""
+    return pd.factorize(pd.Series(values, dtype=object).fillna(''))
+
+class LazyFeatureMatrix:
+    """Macierz cech (wiersze x cechy) dla kolumn pól, liczona na żądanie
+
+    Kolumna cechy powstaje przy pierwszej regule, która jej potrzebuje, i tylko dla
+    wierszy jeszcze bez decyzji - rekordy rozstrzygnięte wcześniej (jak w łańcuchu)
+    nie płacą za późniejsze predykaty. Maski są liczone raz dla każdej różnej wartości pola.
+    """
+
+    def __init__(self, table: DecisionTable, fields: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> None:
+        self.table = table
+        # Pole -> (numer różnej wartości w każdym wierszu, różne wartości)
+        self.fields = fields
+        length = len(next(iter(fields.values()))[0])
+        self.matrix = np.zeros((length, len(table.features)), dtype=bool)
+        self.computed = np.zeros(len(table.features), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def columns(self, indices: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Kolumny cech o podanych numerach - brakujące liczone dla wierszy rows
+
+        Zbiór wierszy bez decyzji tylko maleje, więc kolumna policzona dla niego
+        wystarcza wszystkim późniejszym regułom.
+        """
+        for i in indices[~self.computed[indices]]:
+            feature = self.table.features[i]
+            codes, uniques = self.fields[feature.field]
+            selected = np.flatnonzero(rows)
+            selected_codes = codes[selected]
+            needed = np.zeros(len(uniques), dtype=bool)
+            needed[selected_codes] = True
+            values = np.zeros(len(uniques), dtype=bool)
+            values[needed] = self.table._column_feature(feature, pd.Series(uniques[needed], dtype=object))
+            self.matrix[selected, i] = values[selected_codes]
+            self.computed[i] = True
+        return self.matrix[:, indices]
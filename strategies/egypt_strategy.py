@@ -6,17 +6,33 @@ EGYPT STRATEGY
 Strategia kategoryzacji hoteli egipskich z wykorzystaniem JSON.
 """
 
-import json
-from pathlib import Path
 from typing import Optional
-from strategies.base_strategy import CategoryStrategy
+from strategies.base_strategy import SinglePassStrategy
 from models import TravelRecord
+from rule_context import RuleContext
+from pattern_matcher import GroupMatcher
 
-class EgyptStrategy(CategoryStrategy):
+# Słowa kluczowe strategii - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+# Wszystkie warianty kierunków egipskich
+EGYPT_DESTINATIONS = (
+    'hrg', 'rmf', 'ssh', 'soma bay',  # krótkie kody
+    'egipt, hurghada', 'egipt marsa alam', 'egipt sharm el sheik', 'egipt soma bay',
+    'egipt', 'hurghada', 'marsa alam', 'sharm el sheik'
+)
+# Hotele rozpoznawane niezależnie od kierunku (także przy pustym kierunku)
+EGYPT_OTHER_KEYWORDS = ('soma bay', 'palm royal', 'sentido palm')
+# Grupy hoteli z hotel_categories.json w kolejności sprawdzania -> kategoria
+EGYPT_HOTEL_GROUPS = (
+    ('el_gouna_hotels', 'Egipt - El Gouna'),
+    ('hamata_hotels', 'Egipt - Hamata'),
+    ('egypt_other_hotels', 'Egipt - inne'),
+)
+
+class EgyptStrategy(SinglePassStrategy):
     """Strategia kategoryzacji hoteli egipskich"""
     
-    def __init__(self, normalizer: Optional[object] = None) -> None:
-        super().__init__(normalizer)
+    def __init__(self, normalizer: Optional[object] = None, context: Optional[RuleContext] = None) -> None:
+        super().__init__(normalizer, context)
         self.load_hotel_categories()
     
     @property
@@ -25,71 +41,34 @@ class EgyptStrategy(CategoryStrategy):
     
     def load_hotel_categories(self) -> None:
         """Wczytuje kategorie hoteli z JSON"""
-        config_path = Path(__file__).parent.parent / "config" / "hotel_categories.json"
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                categories = json.load(f)
-                
-            self.el_gouna_hotels = set(categories.get("el_gouna_hotels", []))
-            self.hamata_hotels = set(categories.get("hamata_hotels", []))
-            self.egypt_other_hotels = set(categories.get("egypt_other_hotels", []))
+            # Automat nad wszystkimi grupami (el_gouna_hotels, hamata_hotels, egypt_other_hotels, ...)
+            self.hotel_matcher = self.context.rule_pack.hotel_category_matcher
             
         except Exception as e:
             print(f"Błąd wczytywania hotel_categories.json: {e}")
-            # Fallback - puste zestawy
-            self.el_gouna_hotels = set()
-            self.hamata_hotels = set()
-            self.egypt_other_hotels = set()
+            # Fallback - brak grup hoteli
+            self.hotel_matcher = GroupMatcher({})
     
-    def can_handle(self, record: TravelRecord) -> bool:
-        """Sprawdza czy to hotel egipski"""
-        hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
-        
-        # Wszystkie warianty kierunków egipskich
-        egypt_destinations = [
-            'hrg', 'rmf', 'ssh', 'soma bay',  # krótkie kody
-            'egipt, hurghada', 'egipt marsa alam', 'egipt sharm el sheik', 'egipt soma bay',
-            'egipt', 'hurghada', 'marsa alam', 'sharm el sheik'
-        ]
-        
-        # Sprawdź hotele niezależnie od destination (dla przypadków z pustym destination)
-        if 'soma bay' in hotel or 'palm royal' in hotel or 'sentido palm' in hotel:
-            return True
-        elif any(eg_hotel in hotel for eg_hotel in self.el_gouna_hotels):
-            return True
-        elif any(h_hotel in hotel for h_hotel in self.hamata_hotels):
-            return True
-        elif any(egypt_hotel in hotel for egypt_hotel in self.egypt_other_hotels):
-            return True
-        
-        # Jeśli kierunek to Egipt
-        if destination in egypt_destinations:
-            return True
-        
-        return False
+    def reload_rules(self) -> None:
+        """Pobiera automat grup hoteli z nowej paczki reguł"""
+        self.load_hotel_categories()
     
-    def categorize(self, record: TravelRecord) -> str:
-        """Kategoryzuje hotele egipskie"""
+    def evaluate(self, record: TravelRecord) -> Optional[str]:
+        """Kategoryzuje hotele egipskie (None gdy to nie Egipt)"""
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
         
-        egypt_destinations = [
-            'hrg', 'rmf', 'ssh', 'soma bay',
-            'egipt, hurghada', 'egipt marsa alam', 'egipt sharm el sheik', 'egipt soma bay',
-            'egipt', 'hurghada', 'marsa alam', 'sharm el sheik'
-        ]
-        
-        # Sprawdź hotele niezależnie od destination
-        if 'soma bay' in hotel or 'palm royal' in hotel or 'sentido palm' in hotel:
-            return 'Egipt - inne'
-        elif any(eg_hotel in hotel for eg_hotel in self.el_gouna_hotels):
-            return 'Egipt - El Gouna'
-        elif any(h_hotel in hotel for h_hotel in self.hamata_hotels):
-            return 'Egipt - Hamata'
-        elif any(egypt_hotel in hotel for egypt_hotel in self.egypt_other_hotels):
+        # Sprawdź hotele niezależnie od destination (dla przypadków z pustym destination)
+        if any(keyword in hotel for keyword in EGYPT_OTHER_KEYWORDS):
             return 'Egipt - inne'
         
+        groups = self.hotel_matcher.match_groups(hotel)
+        for group, category in EGYPT_HOTEL_GROUPS:
+            if group in groups:
+                return category
+        
         # Jeśli kierunek to Egipt, ale hotel nie pasuje do żadnej kategorii
-        if destination in egypt_destinations:
+        if destination in EGYPT_DESTINATIONS:
             return 'Nieprzypisane'  # Będzie nieprzypisane!
         
-        return 'Nieprzypisane'
\ No newline at end of file
+        return None
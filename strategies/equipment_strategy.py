@@ -9,6 +9,15 @@ Strategia kategoryzacji sprzętu.
 from strategies.base_strategy import CategoryStrategy
 from models import TravelRecord
 
+# Słowa kluczowe strategii - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+# Wypożyczenie sprzętu premium/standard to szkolenie, nie sprzęt!
+TRAINING_RENTAL_KEYWORDS = ('wypozyczenie sprzetu premium', 'wypoz sprzetu standard', 'wypozyczenie sprzetu standard')
+EQUIPMENT_KEYWORDS = (
+    'sprzęt', 'sprzet', 'wynajem', 'latawce', 
+    'equipment', 'zestaw kite', 'deska', 'trapez',
+    'wypoz latawca', 'wypozczenie latawca'
+)
+
 class EquipmentStrategy(CategoryStrategy):
     """Strategia kategoryzacji sprzętu"""
     
@@ -20,22 +29,11 @@ class EquipmentStrategy(CategoryStrategy):
         """Sprawdza czy to sprzęt"""
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
         
-        # Wypożyczenie sprzetu premium to szkolenie, nie sprzęt!
-        if 'wypozyczenie sprzetu premium' in hotel:
-            return False
-        # Wypożyczenie sprzetu standard to też szkolenie, nie sprzęt!
-        if 'wypoz sprzetu standard' in hotel:
-            return False
-        # Pełna fraza wypożyczenia sprzętu standard to też szkolenie!
-        if 'wypozyczenie sprzetu standard' in hotel:
+        # Wypożyczenie sprzetu premium i standard (także pełna fraza) to szkolenie, nie sprzęt!
+        if any(keyword in hotel for keyword in TRAINING_RENTAL_KEYWORDS):
             return False
             
-        equipment_keywords = [
-            'sprzęt', 'sprzet', 'wynajem', 'latawce', 
-            'equipment', 'zestaw kite', 'deska', 'trapez',
-            'wypoz latawca', 'wypozczenie latawca'
-        ]
-        return any(keyword in hotel for keyword in equipment_keywords)
+        return any(keyword in hotel for keyword in EQUIPMENT_KEYWORDS)
     
     def categorize(self, record: TravelRecord) -> str:
         """Kategoryzuje jako sprzęt"""
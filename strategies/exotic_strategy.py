@@ -6,17 +6,28 @@ EXOTIC STRATEGY
 Strategia kategoryzacji egzotyki.
 """
 
-import json
-from pathlib import Path
 from typing import Optional
 from strategies.base_strategy import CategoryStrategy
 from models import TravelRecord
+from rule_context import RuleContext
+
+# Słowa kluczowe strategii - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+# Hotel lub kierunek znormalizowany do tej wartości to egzotyka
+EXOTIC_VALUE = 'egzotyka'
+# Specjalny przypadek: RPA, Cape Town + Sea View Room = egzotyka
+RPA_DESTINATION_KEYWORDS = ('rpa', 'cape town')
+RPA_HOTEL = 'sea view room'
+# Grupa kierunków egzotycznych w hotel_categories.json
+EXOTIC_DESTINATIONS = 'exotic_destinations'
+# Polisy, przeloty i szkolenia na kierunkach egzotycznych to nie egzotyka
+NOT_EXOTIC_HOTELS = ('polisa', 'przelot')
+TRAINING_KEYWORDS = ('kurs', 'szkolenie', 'lekcj', 'promo', 'ind')
 
 class ExoticStrategy(CategoryStrategy):
     """Strategia kategoryzacji egzotyki"""
     
-    def __init__(self, normalizer: Optional[object] = None) -> None:
-        super().__init__(normalizer)
+    def __init__(self, normalizer: Optional[object] = None, context: Optional[RuleContext] = None) -> None:
+        super().__init__(normalizer, context)
         self.load_exotic_destinations()
     
     @property
@@ -25,34 +36,35 @@ class ExoticStrategy(CategoryStrategy):
     
     def load_exotic_destinations(self) -> None:
         """Wczytuje kierunki egzotyczne z JSON"""
-        config_path = Path(__file__).parent.parent / "config" / "hotel_categories.json"
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                categories = json.load(f)
-                
-            self.exotic_destinations = set(categories.get("exotic_destinations", []))
+            pack = self.context.rule_pack
+            
+            self.exotic_destinations = pack.category_set(EXOTIC_DESTINATIONS)
             
         except Exception as e:
             print(f"Błąd wczytywania hotel_categories.json dla egzotyki: {e}")
             self.exotic_destinations = set()
     
+    def reload_rules(self) -> None:
+        """Wczytuje zbiory hoteli z nowej paczki reguł"""
+        self.load_exotic_destinations()
+    
     def can_handle(self, record: TravelRecord) -> bool:
         """Sprawdza czy to egzotyka"""
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
         
         # Sprawdź czy normalizacja zwraca 'egzotyka'
-        if hotel == 'egzotyka' or destination == 'egzotyka':
+        if hotel == EXOTIC_VALUE or destination == EXOTIC_VALUE:
             return True
         
         # Specjalny przypadek: RPA, Cape Town + Sea View Room = egzotyka
-        if 'rpa' in destination and 'cape town' in destination and 'sea view room' in hotel:
+        if all(keyword in destination for keyword in RPA_DESTINATION_KEYWORDS) and RPA_HOTEL in hotel:
             return True
         
         # Sprawdź kierunki egzotyczne
         if destination in self.exotic_destinations:
-            if hotel not in ['polisa', 'przelot']:
-                training_keywords = ['kurs', 'szkolenie', 'lekcj', 'promo', 'ind']
-                return not any(keyword in hotel for keyword in training_keywords)
+            if hotel not in NOT_EXOTIC_HOTELS:
+                return not any(keyword in hotel for keyword in TRAINING_KEYWORDS)
         
         return False
     
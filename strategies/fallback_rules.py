@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Fallback Rules
+
+Keywords of the special cases checked before the strategy chain and of the
+fallback after it, shared by CategoryManager and the decision table.
+"""
+
+# Hotel nan - przed łańcuchem strategii zawsze Nieprzypisane (także dla kierunku Hurghada),
+# chyba że kierunek to kitesafari lub polisa
+MISSING_HOTELS = ('N/A', 'nan')
+HURGHADA_DESTINATIONS = ('hrg', 'hurghada', 'egipt, hurghada')
+MISSING_HOTEL_KEPT_DESTINATIONS = ('kitesafari', 'polisa')
+
+# Rezygnacje i skrócenia wyjazdu → Nieprzypisane
+CANCELLATION_KEYWORDS = ('rezygnacja', 'skrocenie', 'skrócenie')
+
+# Narty - słowo w hotelu lub kierunek
+SKI_KEYWORDS = ('narty',)
+SKI_DESTINATIONS = ('austria',)
+
+# Vouchery (ale nie szkolenie)
+VOUCHER_KEYWORDS = ('voucher', 'vocher', 'prezentowy', 'bezterminowy')
+VOUCHER_TRAINING_KEYWORDS = ('kurs', 'szkolenie', 'lekcj', 'godzinn', 'ind', 'premium', 'standard')
+
+# Specjalne przypadki nieprzypisanych hoteli
+UNASSIGNED_HOTEL_KEYWORDS = ('apartament',)
+UNASSIGNED_HOTELS = ('test', 'N/A', '')
+
+# Ubezpieczenia (ogólne) w hotelu lub kierunku - wszystkie formy słowa polisa
+INSURANCE_KEYWORDS = (
+    'polisa', 'polisy', 'polisę', 'polisą', 'polisie', 'polis',
+    'ubezp', 'ubezpieczenie', 'ubezpieczenia', 'sporty wyczynowo', 'filipiny',
+    'wietnam', 'tajlandia', '3 polisy', 'ubkr'
+)
+
+# Nieprzypisane kierunki
+UNASSIGNED_DESTINATIONS = ('nieznany', 'voucher', 'kurs', 'wynajem sprzętu')
+
+# Puste wartości (porównywane małymi literami) - pusty hotel z niepustym kierunkiem
+EMPTY_VALUES = ('', 'nan', 'none', 'brak')
@@ -9,6 +9,48 @@ Strategia kategoryzacji przelotów.
 import re
 from strategies.base_strategy import CategoryStrategy
 from models import TravelRecord
+from strategies.kitesafari_strategy import KITESAFARI_KEYWORDS
+
+# Wzorce miasto-miasto (literówki, warianty) - jedno wyrażenie skompilowane raz
+CITY_PATTERNS = [
+    'katowice.*hurgh',  # łapie hurghada, hurghadsa, hurghda
+    'warszawa.*hurgh',
+    'gdansk.*hurgh',
+    'wro.*hurgh',       # wroclaw
+    'krakow.*hurgh',
+    'poznan.*hurgh',
+    'hurgh.*katowice',  # powroty
+    'hurgh.*warszawa',
+    'hurgh.*gdansk',
+    'hurgh.*wro',
+    'hurgh.*krakow',
+    'hurgh.*poznan',
+    'marsa.*alam.*wro', # Marsa Alam-Wrocław
+    'marsa.*alam.*warszawa',
+    'marsa.*alam.*katowice',
+]
+CITY_PATTERNS_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in CITY_PATTERNS))
+
+# Słowa kluczowe strategii - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+# Hotel znormalizowany do tej wartości to zawsze przelot
+FLIGHT_HOTEL = 'przelot'
+# Wykluczenia - NIE są przelotami mimo że mogą zawierać kody lotnisk lub słowo "przelot"
+NOT_FLIGHT_KEYWORDS = (
+    'jacht motorowy', 'valerie', 'jacht',  # kitesafari
+    'noclegi',                             # noclegi, nie przeloty
+    'brazil kite safari',                  # Brazylia
+    'riu creole',                          # Mauritius
+    'bez przelotu',                        # pakiety BEZ przelotu
+    'yalla kite',                          # zawsze szkolenie
+)
+# Kitesafari jest przelotem tylko jako wyraźny bilet lotniczy: "bilet lot" lub "lot" z kodem trasy
+FLIGHT_TICKET = 'bilet lot'
+FLIGHT_WORD = 'lot'
+ROUTE_CODES = ('kat-', 'waw-', '-hrg-')
+# Bilety (także instruktorskie) i "przelot w 1 strone" w hotelu lub kierunku
+FLIGHT_KEYWORDS = ('bilet', 'instruktor', 'przelot')
+# Wzorce typu WAW-HRG, WAW_HRG - oba kody w hotelu
+AIRPORT_PAIRS = (('waw', 'hrg'), ('kat', 'hrg'))
 
 class FlightStrategy(CategoryStrategy):
     """Strategia kategoryzacji przelotów"""
@@ -22,46 +64,22 @@ class FlightStrategy(CategoryStrategy):
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
         
         # Jeśli hotel został znormalizowany do "przelot" - to jest przelot!
-        if hotel == 'przelot':
+        if hotel == FLIGHT_HOTEL:
             return True
             
-        # Wykluczenia - NIE są przelotami mimo że mogą zawierać kody lotnisk lub słowo "przelot"
-        if 'jacht motorowy' in hotel or 'valerie' in hotel:
-            return False  # to są kitesafari
-        if 'noclegi' in hotel:
-            return False  # to są noclegi, nie przeloty
-        if 'jacht' in hotel:
-            return False  # jachty to kitesafari, nie przeloty
-        if 'brazil kite safari' in hotel:
-            return False  # to Brazylia
-        if 'riu creole' in hotel:
-            return False  # to Mauritius
-        if 'bez przelotu' in hotel:
-            return False  # pakiety BEZ przelotu to nie przeloty
-        # YALLA KITE to zawsze szkolenie, nie przelot!
-        if 'yalla kite' in hotel:
+        # Wykluczenia - kitesafari, noclegi, Brazylia, Mauritius, pakiety bez przelotu, szkolenia
+        if any(keyword in hotel for keyword in NOT_FLIGHT_KEYWORDS):
             return False
         
         # Kitesafari przypadki - nie są przelotami (chyba że wyraźnie bilety lotnicze)
-        if ('kitesafari' in hotel or 'kite safari' in hotel):
+        if any(keyword in hotel for keyword in KITESAFARI_KEYWORDS):
             # Tylko przypadki które wyraźnie wskazują na bilety lotnicze to przeloty
-            if not ('bilet lot' in hotel or 
-                    'lot' in hotel and ('kat-' in hotel or 'waw-' in hotel or '-hrg-' in hotel)):
+            if not (FLIGHT_TICKET in hotel or 
+                    FLIGHT_WORD in hotel and any(code in hotel for code in ROUTE_CODES)):
                 return False
         
-        # Bilety (różne warianty)
-        if 'bilet' in hotel or 'bilet' in destination:
-            return True
-        
-        # Bilety instruktorskie
-        if 'instruktor' in hotel or 'instruktor' in destination:
-            return True
-        
-        if 'katowice-hurghada' in hotel and 'instruktor' in hotel:
-            return True
-        
-        # "przelot w 1 strone" itp.
-        if 'przelot' in hotel or 'przelot' in destination:
+        # Bilety (różne warianty, także instruktorskie) i "przelot w 1 strone" itp.
+        if any(keyword in hotel or keyword in destination for keyword in FLIGHT_KEYWORDS):
             return True
             
         # Wzorce przelotów w tekście (sprawdzamy RAW przed normalizacją)
@@ -76,33 +94,12 @@ class FlightStrategy(CategoryStrategy):
             return True
         
         # Wzorce typu WAW-HRG, WAW_HRG
-        if 'waw' in hotel and 'hrg' in hotel:
-            return True
-        if 'kat' in hotel and 'hrg' in hotel:
+        if any(all(code in hotel for code in pair) for pair in AIRPORT_PAIRS):
             return True
         
         # Wzorce miasto-miasto (literówki, warianty)
-        city_patterns = [
-            'katowice.*hurgh',  # łapie hurghada, hurghadsa, hurghda
-            'warszawa.*hurgh',
-            'gdansk.*hurgh',
-            'wro.*hurgh',       # wroclaw
-            'krakow.*hurgh',
-            'poznan.*hurgh',
-            'hurgh.*katowice',  # powroty
-            'hurgh.*warszawa',
-            'hurgh.*gdansk',
-            'hurgh.*wro',
-            'hurgh.*krakow',
-            'hurgh.*poznan',
-            'marsa.*alam.*wro', # Marsa Alam-Wrocław
-            'marsa.*alam.*warszawa',
-            'marsa.*alam.*katowice',
-        ]
-        
-        for pattern in city_patterns:
-            if re.search(pattern, hotel) or re.search(pattern, destination):
-                return True
+        if CITY_PATTERNS_RE.search(hotel) or CITY_PATTERNS_RE.search(destination):
+            return True
         
         return False
     
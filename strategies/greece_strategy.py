@@ -6,17 +6,36 @@ GREECE STRATEGY
 Strategia kategoryzacji hoteli greckich.
 """
 
-import json
-from pathlib import Path
 from typing import Optional
-from strategies.base_strategy import CategoryStrategy
+from strategies.base_strategy import SinglePassStrategy
 from models import TravelRecord
+from rule_context import RuleContext
+from pattern_matcher import GroupMatcher
 
-class GreeceStrategy(CategoryStrategy):
+# Słowa kluczowe strategii - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+# Wszystkie warianty kierunków greckich
+GREECE_DESTINATIONS = (
+    'lxs', 'rho', 'kos', 'zth',  # kody
+    'grecja, limnos', 'grecja, rodos', 'grecja rodos', 'grecja korfu', 'grecja kos', 'grecja zakynthos',
+    'limnos', 'lemnos', 'rodos', 'korfu', 'kos', 'zakynthos', 'grecja'
+)
+GREECE_KEYWORD = 'grecja'
+# Wyspy: kierunki, słowa w kierunku i grupy hoteli z hotel_categories.json
+LIMNOS_DESTINATIONS = ('lxs', 'grecja, limnos', 'limnos', 'lemnos')
+LIMNOS_KEYWORDS = ('limnos', 'lemnos')
+LIMNOS_HOTELS = 'greece_limnos_hotels'
+RODOS_DESTINATIONS = ('rho', 'grecja, rodos', 'grecja rodos', 'rodos')
+RODOS_HOTELS = 'greece_rodos_hotels'
+OTHER_ISLANDS_DESTINATIONS = ('kos', 'zakynthos', 'zth', 'korfu', 'grecja kos', 'grecja zakynthos')
+OTHER_ISLANDS_HOTELS = 'greece_other_hotels'
+# Ocean Palace i inne nieznane hotele greckie - domyślnie Rodos
+RODOS_DEFAULT_HOTELS = ('ocean palace', 'summer breeze')
+
+class GreeceStrategy(SinglePassStrategy):
     """Strategia kategoryzacji hoteli greckich"""
     
-    def __init__(self, normalizer: Optional[object] = None) -> None:
-        super().__init__(normalizer)
+    def __init__(self, normalizer: Optional[object] = None, context: Optional[RuleContext] = None) -> None:
+        super().__init__(normalizer, context)
         self.load_hotel_categories()
     
     @property
@@ -25,60 +44,44 @@ class GreeceStrategy(CategoryStrategy):
     
     def load_hotel_categories(self) -> None:
         """Wczytuje kategorie hoteli greckich z JSON"""
-        config_path = Path(__file__).parent.parent / "config" / "hotel_categories.json"
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                categories = json.load(f)
-                
-            self.greece_limnos_hotels = set(categories.get("greece_limnos_hotels", []))
-            self.greece_rodos_hotels = set(categories.get("greece_rodos_hotels", []))
-            self.greece_other_hotels = set(categories.get("greece_other_hotels", []))
+            self.hotel_matcher = self.context.rule_pack.hotel_category_matcher
             
         except Exception as e:
             print(f"Błąd wczytywania hotel_categories.json dla Grecji: {e}")
-            self.greece_limnos_hotels = set()
-            self.greece_rodos_hotels = set()
-            self.greece_other_hotels = set()
+            self.hotel_matcher = GroupMatcher({})
+    
+    def reload_rules(self) -> None:
+        """Pobiera automat grup hoteli z nowej paczki reguł"""
+        self.load_hotel_categories()
     
-    def can_handle(self, record: TravelRecord) -> bool:
-        """Sprawdza czy to hotel grecki"""
+    def evaluate(self, record: TravelRecord) -> Optional[str]:
+        """Kategoryzuje hotele greckie (None gdy to nie Grecja)"""
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
         
-        # Wszystkie warianty kierunków greckich
-        greece_destinations = [
-            'lxs', 'rho', 'kos', 'zth',  # kody
-            'grecja, limnos', 'grecja, rodos', 'grecja rodos', 'grecja korfu', 'grecja kos', 'grecja zakynthos',
-            'limnos', 'rodos', 'korfu', 'kos', 'zakynthos', 'grecja'
-        ]
-        
-        if destination in greece_destinations or 'grecja' in destination or destination in ['limnos', 'lemnos']:
-            return True
+        # Grupy hoteli greckich występujące w nazwie hotelu
+        groups = self.hotel_matcher.match_groups(hotel)
+        limnos_hotel = LIMNOS_HOTELS in groups
+        rodos_hotel = RODOS_HOTELS in groups
+        other_hotel = OTHER_ISLANDS_HOTELS in groups
         
-        # Sprawdź też hotele greckie niezależnie od kierunku
-        if (any(h in hotel for h in self.greece_limnos_hotels) or
-            any(h in hotel for h in self.greece_rodos_hotels) or
-            any(h in hotel for h in self.greece_other_hotels)):
-            return True
-        
-        return False
-    
-    def categorize(self, record: TravelRecord) -> str:
-        """Kategoryzuje hotele greckie"""
-        hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
+        # Kierunek grecki lub hotel grecki niezależnie od kierunku
+        if not (destination in GREECE_DESTINATIONS or GREECE_KEYWORD in destination or
+                limnos_hotel or rodos_hotel or other_hotel):
+            return None
         
         # Limnos - rozszerzone sprawdzenie
-        if (destination in ['lxs', 'grecja, limnos', 'limnos', 'lemnos'] or 
-            'limnos' in destination or 'lemnos' in destination or
-            any(h in hotel for h in self.greece_limnos_hotels)):
+        if (destination in LIMNOS_DESTINATIONS or 
+            any(keyword in destination for keyword in LIMNOS_KEYWORDS) or limnos_hotel):
             return 'Grecja - Limnos'
         # Rodos
-        elif destination in ['rho', 'grecja, rodos', 'grecja rodos', 'rodos'] or any(h in hotel for h in self.greece_rodos_hotels):
+        elif destination in RODOS_DESTINATIONS or rodos_hotel:
             return 'Grecja - Rodos'
         # Inne wyspy greckie
-        elif destination in ['kos', 'zakynthos', 'zth', 'korfu', 'grecja kos', 'grecja zakynthos'] or any(h in hotel for h in self.greece_other_hotels):
+        elif destination in OTHER_ISLANDS_DESTINATIONS or other_hotel:
             return 'Grecja - Inne'
         # Ocean Palace i inne nieznane hotele greckie
-        elif 'ocean palace' in hotel or 'summer breeze' in hotel:
+        elif any(keyword in hotel for keyword in RODOS_DEFAULT_HOTELS):
             return 'Grecja - Rodos'  # Domyślnie Rodos dla nieznanych hoteli greckich
         else:
             return 'Grecja - Inne'
\ No newline at end of file
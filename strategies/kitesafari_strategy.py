@@ -9,6 +9,14 @@ Strategia kategoryzacji kitesafari.
 from strategies.base_strategy import CategoryStrategy
 from models import TravelRecord
 
+# Słowa kluczowe strategii - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+# Wykluczenia - Brazil Kite Safari to Brazylia, nie kitesafari!
+KITESAFARI_EXCLUDED = 'brazil'
+KITESAFARI_KEYWORDS = ('kite safari', 'kitesafari')
+# AML Hayaty, Valerie (jacht motorowy lub M/Y) i ogólnie jachty to kitesafari
+KITESAFARI_BOATS = ('aml hayaty', 'valerie', 'jacht motorowy', 'jacht')
+KITESAFARI_DESTINATION = 'kitesafari'
+
 class KitesafariStrategy(CategoryStrategy):
     """Strategia kategoryzacji kitesafari"""
     
@@ -21,30 +29,18 @@ class KitesafariStrategy(CategoryStrategy):
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
         
         # Wykluczenia - Brazil Kite Safari to Brazylia, nie kitesafari!
-        if 'brazil' in hotel:
+        if KITESAFARI_EXCLUDED in hotel:
             return False
         
         # Sprawdź czy zawiera słowa kluczowe kitesafari
-        if 'kite safari' in hotel or 'kitesafari' in hotel:
-            return True
-        
-        # AML HAYATY to kitesafari
-        if 'aml hayaty' in hotel:
-            return True
-        
-        # Valerie to kitesafari (jacht motorowy lub M/Y)
-        if 'valerie' in hotel:
-            return True
-        
-        # Jacht motorowy to kitesafari
-        if 'jacht motorowy' in hotel:
+        if any(keyword in hotel for keyword in KITESAFARI_KEYWORDS):
             return True
         
-        # Ogólna reguła: jacht w polu hotel = Kitesafari
-        if 'jacht' in hotel:
+        # Jachty (AML Hayaty, Valerie, jacht motorowy) to kitesafari
+        if any(boat in hotel for boat in KITESAFARI_BOATS):
             return True
         
-        return destination == 'kitesafari'
+        return destination == KITESAFARI_DESTINATION
     
     def categorize(self, record: TravelRecord) -> str:
         """Kategoryzuje jako kitesafari"""
@@ -9,6 +9,28 @@ Strategia kategoryzacji polis ubezpieczeniowych.
 from strategies.base_strategy import CategoryStrategy
 from models import TravelRecord
 
+# Słowa kluczowe strategii - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+# Hotel lub kierunek znormalizowany do tej wartości (np. Ergo + nan) to polisa
+POLICY_VALUE = 'polisa'
+# Specjalny przypadek - Japonia z polisą
+JAPAN_DESTINATION = 'japonia'
+# Słowa w hotelu oznaczające polisę - wszystkie słowa kombinacji muszą wystąpić
+POLICY_COMBINATIONS = (
+    ('ubezpieczenie do wyjazdu',),  # polisa, nie ogólne ubezpieczenie
+    ('polisa', 'do wyjazdu'),
+    ('doplata do kontynuacji leczenia w rp',),  # "dopłata do kontynuacji leczenia w RP" po normalizacji
+    ('ubkr', 'bilet'),  # ubezpieczenia KR do biletów lotniczych
+    ('ubezpieczenie', 'kr', 'bilet'),
+    ('ubezpieczenie kr',),
+)
+# Wzorce polis z obsługą nan - wszystkie formy słowa polisa
+POLICY_PATTERNS = (
+    'polisa', 'polisy', 'polisę', 'polisą', 'polisie', 'polis',
+    'ubezpieczenie', 'ubezpieczenia', 'ubezp', 'insurance', 'kr',
+    'allianz', 'ergo', 'mondial', 'globtroter', 'globtrotter',
+    'wiener', 'compensa'
+)
+
 class PolicyStrategy(CategoryStrategy):
     """Strategia kategoryzacji polis"""
     
@@ -20,52 +42,22 @@ class PolicyStrategy(CategoryStrategy):
         """Sprawdza czy to polisa/ubezpieczenie"""
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
         
-        # Jeśli hotel został znormalizowany do "polisa" - to jest polisa!
-        if hotel == 'polisa':
-            return True
-        
-        # Jeśli kierunek został znormalizowany do "polisa" (np. Ergo + nan) - to jest polisa!
-        if destination == 'polisa':
+        # Jeśli hotel lub kierunek został znormalizowany do "polisa" - to jest polisa!
+        if hotel == POLICY_VALUE or destination == POLICY_VALUE:
             return True
         
         # Specjalny przypadek - Japonia z polisą
-        if (destination and 'japonia' in destination and 
-            hotel and 'polisa' in hotel):
+        if JAPAN_DESTINATION in destination and POLICY_VALUE in hotel:
             return True
             
-        # "Ubezpieczenie do wyjazdu" to polisa, nie ogólne ubezpieczenie
-        if hotel and 'ubezpieczenie do wyjazdu' in hotel:
-            return True
-        if hotel and 'polisa' in hotel and 'do wyjazdu' in hotel:
-            return True
-        # "dopłata do kontynuacji leczenia w RP" to polisa (znormalizowana: "doplata")
-        if 'doplata do kontynuacji leczenia w rp' in hotel:
-            return True
-        # Ubezpieczenia KR do biletów lotniczych to polisy
-        if hotel and 'ubkr' in hotel and 'bilet' in hotel:
-            return True
-        if hotel and 'ubezpieczenie' in hotel and 'kr' in hotel and 'bilet' in hotel:
-            return True
-        if hotel and 'ubezpieczenie kr' in hotel:
-            return True
-        
-        # Wzorce polis z obsługą nan - wszystkie formy słowa polisa
-        policy_patterns = [
-            'polisa', 'polisy', 'polisę', 'polisą', 'polisie', 'polis',
-            'ubezpieczenie', 'ubezpieczenia', 'ubezp', 'insurance', 'kr',
-            'allianz', 'ergo', 'mondial', 'globtroter', 'globtrotter',
-            'wiener', 'compensa'
-        ]
+        # Ubezpieczenia do wyjazdu, dopłaty do leczenia, ubezpieczenia KR do biletów
+        for words in POLICY_COMBINATIONS:
+            if all(word in hotel for word in words):
+                return True
         
         # Sprawdź w hotelu (obsługa nan)
-        if hotel:
-            for pattern in policy_patterns:
-                if pattern in hotel:
-                    return True
-        
         # Brak pola touroperator w nowej strukturze - pomiń sprawdzenie
-        
-        return False
+        return any(pattern in hotel for pattern in POLICY_PATTERNS)
     
     def categorize(self, record: TravelRecord) -> str:
         """Kategoryzuje jako ubezpieczenie"""
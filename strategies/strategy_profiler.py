@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Strategy Profiler
+
+Opt-in counters and timings of the categorization path that actually runs:
+per-block time and per-row hits of the decision table, or calls, hits and
+cumulative time per strategy of the strategy chain with its special-case and
+fallback branches.
+"""
+
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from models import TravelRecord
+from strategies.base_strategy import CategoryStrategy
+from strategies.decision_table import DecisionTable, NO_DECISION
+
+@dataclass
+class PhaseStats:
+    """Liczniki jednej metody strategii (can_handle, categorize lub evaluate)"""
+    calls: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'calls': self.calls, 'hits': self.hits, 'seconds': round(self.seconds, 6),
+                'hit_rate': self.hits / self.calls if self.calls else 0.0}
+
+    def merge(self, other: 'PhaseStats') -> None:
+        self.calls += other.calls
+        self.hits += other.hits
+        self.seconds += other.seconds
+
+class StrategyProfiler:
+    """Profil kategoryzacji - włączany w Config.CATEGORY_PROFILING
+
+    Tablica decyzyjna (silnik 'table'): trafienia bloków i wierszy tablicy. W trybie
+    kolumnowym liczone w rekordach i kombinacjach hotel/kierunek, z czasem każdego bloku
+    (łącznie z wyliczeniem jego cech). W trybie rekordowym tylko decyzje, czyli kombinacje
+    spoza pamięci decyzji.
+
+    Łańcuch strategii (silnik 'chain'): każda decyzja łańcucha to jedna kombinacja spoza
+    pamięci decyzji. Strategie z parą can_handle/categorize są mierzone osobno dla obu
+    metod (trafienie can_handle = True), jednoprzebiegowe - metodą evaluate
+    (trafienie = zwrócona kategoria).
+
+    Liczniki z procesów puli są dołączane przez merge.
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Zeruje liczniki (np. na początku analizy)"""
+        # Łańcuch strategii
+        self.phases: Dict[str, Dict[str, PhaseStats]] = {}
+        self.priorities: Dict[str, int] = {}
+        self.special_cases: Counter = Counter()
+        self.fallback_branches: Counter = Counter()
+        self.decisions = 0
+        self.seconds = 0.0
+        # Tablica decyzyjna: numer wiersza -> kombinacje / rekordy, numer bloku -> czas
+        self.row_combinations: Counter = Counter()
+        self.row_records: Counter = Counter()
+        self.block_seconds: Counter = Counter()
+        self.table_seconds = 0.0
+        # Rekordy znane tylko w trybie kolumnowym
+        self.records_counted = True
+
+    def run(self, strategies: List[CategoryStrategy], record: TravelRecord) -> Optional[str]:
+        """Przebieg łańcucha z pomiarem - ta sama semantyka co pętla po strategy.evaluate"""
+        perf = time.perf_counter
+        for strategy in strategies:
+            name = type(strategy).__name__
+            phases = self.phases.get(name)
+            if phases is None:
+                phases = self.phases[name] = {}
+                self.priorities[name] = strategy.priority
+
+            if type(strategy).evaluate is CategoryStrategy.evaluate:
+                start = perf()
+                handled = strategy.can_handle(record)
+                end = perf()
+                self._add(phases, 'can_handle', end - start, handled)
+                if not handled:
+                    continue
+                category = strategy.categorize(record)
+                self._add(phases, 'categorize', perf() - end, True)
+                return category
+
+            start = perf()
+            category = strategy.evaluate(record)
+            self._add(phases, 'evaluate', perf() - start, category is not None)
+            if category is not None:
+                return category
+        return None
+
+    @staticmethod
+    def _add(phases: Dict[str, PhaseStats], phase: str, seconds: float, hit: bool) -> None:
+        stats = phases.get(phase)
+        if stats is None:
+            stats = phases[phase] = PhaseStats()
+        stats.calls += 1
+        stats.hits += hit
+        stats.seconds += seconds
+
+    def count_decision(self, seconds: float) -> None:
+        """Jedna decyzja łańcucha strategii (czas całej decyzji)"""
+        self.decisions += 1
+        self.seconds += seconds
+
+    def count_special_case(self, name: str) -> None:
+        self.special_cases[name] += 1
+
+    def count_fallback(self, branch: str) -> None:
+        self.fallback_branches[branch] += 1
+
+    def profile_table(self, table: DecisionTable, fields: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                      records: Optional[np.ndarray] = None) -> np.ndarray:
+        """Kategorie kombinacji z tablicy decyzyjnej (tryb kolumnowy) z pomiarem bloków
+
+        records - liczba rekordów każdej kombinacji (wagi trafień); None = po jednym.
+        """
+        block_seconds = np.zeros(len(table.blocks))
+        start = time.perf_counter()
+        categories, predicates = table.match_encoded(fields, block_seconds)
+        self.table_seconds += time.perf_counter() - start
+        for block, seconds in enumerate(block_seconds):
+            self.block_seconds[block] += float(seconds)
+
+        numbers, combinations = np.unique(predicates, return_counts=True)
+        self.row_combinations.update(dict(zip(numbers.tolist(), combinations.tolist())))
+        if records is None:
+            records = np.ones(len(predicates), dtype=np.int64)
+        weights = np.bincount(predicates - NO_DECISION, weights=records)
+        self.row_records.update({int(number): int(weights[number - NO_DECISION]) for number in numbers})
+        return categories
+
+    def count_table_decision(self, number: int, seconds: float) -> None:
+        """Jedna decyzja tablicy w trybie rekordowym (kombinacja spoza pamięci decyzji)"""
+        self.row_combinations[number] += 1
+        self.table_seconds += seconds
+        self.records_counted = False
+
+    def merge(self, other: 'StrategyProfiler') -> None:
+        """Dołącza liczniki innego profilu (np. z procesu puli)"""
+        for name, phases in other.phases.items():
+            own = self.phases.setdefault(name, {})
+            self.priorities[name] = other.priorities[name]
+            for phase, stats in phases.items():
+                own.setdefault(phase, PhaseStats()).merge(stats)
+        self.special_cases.update(other.special_cases)
+        self.fallback_branches.update(other.fallback_branches)
+        self.decisions += other.decisions
+        self.seconds += other.seconds
+        self.row_combinations.update(other.row_combinations)
+        self.row_records.update(other.row_records)
+        self.block_seconds.update(other.block_seconds)
+        self.table_seconds += other.table_seconds
+        self.records_counted = self.records_counted and other.records_counted
+
+    def report(self, table: Optional[DecisionTable] = None) -> Dict[str, Any]:
+        """Raport strukturalny: tablica decyzyjna (bloki i wiersze) i łańcuch strategii - sekcje, które działały"""
+        report: Dict[str, Any] = {}
+        if self.row_combinations and table is not None:
+            report['table'] = self._table_report(table)
+        if self.decisions:
+            strategies = []
+            for name in sorted(self.phases, key=self.priorities.get):
+                phases = self.phases[name]
+                strategies.append({
+                    'strategy': name,
+                    'priority': self.priorities[name],
+                    'seconds': round(sum(stats.seconds for stats in phases.values()), 6),
+                    'phases': {phase: stats.to_dict() for phase, stats in phases.items()}
+                })
+            report['chain'] = {
+                'combinations': self.decisions,
+                'seconds': round(self.seconds, 6),
+                'strategies': strategies,
+                'special_cases': dict(self.special_cases),
+                'fallback_total': sum(self.fallback_branches.values()),
+                'fallback_branches': dict(self.fallback_branches.most_common())
+            }
+        return report
+
+    def _table_report(self, table: DecisionTable) -> Dict[str, Any]:
+        records = self.records_counted
+        blocks = []
+        for b, block in enumerate(table.blocks):
+            rows = [{'predicate': int(number), 'description': table.describe_predicate(number),
+                     'combinations': self.row_combinations[number],
+                     **({'records': self.row_records[number]} if records else {})}
+                    for number in np.flatnonzero(table.predicate_blocks == b)
+                    if self.row_combinations[number]]
+            blocks.append({
+                'block': block.name,
+                'seconds': round(self.block_seconds[b], 6) if records else None,
+                'combinations': sum(row['combinations'] for row in rows),
+                **({'records': sum(row['records'] for row in rows)} if records else {}),
+                'rows': rows
+            })
+        return {
+            'combinations': sum(self.row_combinations.values()),
+            **({'records': sum(self.row_records.values())} if records else {}),
+            'seconds': round(self.table_seconds, 6),
+            'undecided': self.row_combinations[NO_DECISION],
+            'blocks': blocks
+        }
+
+    def print_report(self, table: Optional[DecisionTable] = None) -> None:
+        """Wypisuje raport - bloki tablicy w kolejności priorytetu, strategie od zajmujących najwięcej czasu"""
+        report = self.report(table)
+        if 'table' in report:
+            section = report['table']
+            counted = (f"{section['records']} rekordów, {section['combinations']} kombinacji" if 'records' in section
+                       else f"{section['combinations']} decyzji - kombinacji spoza pamięci decyzji")
+            print(f"\n⏱️  PROFIL TABLICY DECYZYJNEJ ({counted}, {section['seconds'] * 1000:.1f} ms)")
+            for block in section['blocks']:
+                hits = (f"{block['records']} rek. / {block['combinations']} komb." if 'records' in block
+                        else f"{block['combinations']} komb.")
+                seconds = f", {block['seconds'] * 1000:.1f} ms" if block['seconds'] is not None else ""
+                print(f"  {block['block']:<20}: {hits}{seconds}")
+                if block['block'] == 'Fallback':
+                    for row in block['rows']:
+                        hits = row.get('records', row['combinations'])
+                        print(f"    {hits:>6} ← {row['description']}")
+        if 'chain' in report:
+            section = report['chain']
+            print(f"\n⏱️  PROFIL STRATEGII ({section['combinations']} decyzji łańcucha - kombinacji spoza pamięci "
+                  f"decyzji, {section['seconds'] * 1000:.1f} ms)")
+            for entry in sorted(section['strategies'], key=lambda e: e['seconds'], reverse=True):
+                phases = ', '.join(f"{phase} {stats['calls']}× / {stats['hits']} traf. / {stats['seconds'] * 1000:.1f} ms"
+                                   for phase, stats in entry['phases'].items())
+                print(f"  {entry['strategy']:<20} (priorytet {entry['priority']:2d}): {phases}")
+            for name, count in section['special_cases'].items():
+                print(f"  Przypadek specjalny {name}: {count} kombinacji")
+            print(f"  Fallback: {section['fallback_total']} kombinacji")
+            for branch, count in section['fallback_branches'].items():
+                print(f"    {branch:<24}: {count}")
+
+    def write(self, file_path: Path, table: Optional[DecisionTable] = None) -> None:
+        """Zapisuje raport do pliku JSON"""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(table), f, ensure_ascii=False, indent=2)
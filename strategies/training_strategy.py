@@ -11,6 +11,27 @@ from models import TravelRecord
 import json
 from pathlib import Path
 
+# Słowa kluczowe strategii - wspólne z tablicą decyzyjną (strategies/decision_table.py)
+# Hotel znormalizowany do tej wartości to zawsze szkolenie
+TRAINING_HOTEL = 'szkolenie'
+# Egzotyka - nie szkolenie
+EXOTIC_HOTELS = ('kitesurfing lanka', 'surfing lanka', 'sunsol punta blanca', 'sea view room')
+# Brazil Kite Safari to Brazylia, nie szkolenie
+BRAZIL_KITE_SAFARI = 'brazil kite safari'
+# Fallback dla przypadków które nie zostały znormalizowane
+TRAINING_KEYWORDS = (
+    'szkolenie', 'szkolenia', 'progress camp', 'pro camp', 'lekcje', 'instruktor', 
+    'pakiet', 'duży pakiet', 'rescue pack', 'resuce pack',
+    'kurs', 'indywidualne', 'indyw', 'ind.', 'ind ', 'ind x',
+    'refresher', 'refr.', 'grupowo', 'promo', 'refresh',
+    'yalla kite', 'godzinn', ' h ind', ' h kitesurfing',
+    'windsurfing', 'opcja standard', 'euro os',
+    'wypozyczenie sprzetu na kitesafari', 'wypozyczenie latawca',
+    'wypsprz', 'wyp sprz', 'refresh wyp', 'refresh+wyp',
+    'procamp', 'wypozyczenie sprzetu premium',
+    'wypoz sprzetu standard', 'wypozyczenie sprzetu standard'
+)
+
 class TrainingStrategy(CategoryStrategy):
     """Strategia kategoryzacji szkoleń"""
     
@@ -23,32 +44,19 @@ class TrainingStrategy(CategoryStrategy):
         hotel, destination, raw_hotel, raw_destination = self.get_normalized_values(record)
         
         # Jeśli hotel został znormalizowany do "szkolenie" - to jest szkolenie!
-        if hotel == 'szkolenie':
+        if hotel == TRAINING_HOTEL:
             return True
             
         # Nie kategoryzuj egzotyki jako szkolenia
-        exotic_hotels = ['kitesurfing lanka', 'surfing lanka', 'sunsol punta blanca', 'sea view room']
-        if any(eh in hotel for eh in exotic_hotels):
+        if any(eh in hotel for eh in EXOTIC_HOTELS):
             return False
         
         # Wykluczenia - Brazil Kite Safari to Brazylia, nie szkolenie!
-        if 'brazil kite safari' in hotel:
+        if BRAZIL_KITE_SAFARI in hotel:
             return False
         
         # Fallback dla przypadków które nie zostały znormalizowane
-        training_keywords = [
-            'szkolenie', 'szkolenia', 'progress camp', 'pro camp', 'lekcje', 'instruktor', 
-            'pakiet', 'duży pakiet', 'rescue pack', 'resuce pack',
-            'kurs', 'indywidualne', 'indyw', 'ind.', 'ind ', 'ind x',
-            'refresher', 'refr.', 'grupowo', 'promo', 'refresh',
-            'yalla kite', 'godzinn', ' h ind', ' h kitesurfing',
-            'windsurfing', 'opcja standard', 'euro os',
-            'wypozyczenie sprzetu na kitesafari', 'wypozyczenie latawca',
-            'wypsprz', 'wyp sprz', 'refresh wyp', 'refresh+wyp',
-            'procamp', 'wypozyczenie sprzetu premium',
-            'wypoz sprzetu standard', 'wypozyczenie sprzetu standard'
-        ]
-        return any(keyword in hotel for keyword in training_keywords)
+        return any(keyword in hotel for keyword in TRAINING_KEYWORDS)
     
     def categorize(self, record: TravelRecord) -> str:
         """Kategoryzuje jako szkolenie"""
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Parsed Table Cache
+
+Persistent on-disk cache of the extracted six-column year tables.
+"""
+
+import hashlib
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+def file_fingerprint(file_path: Path) -> Dict[str, Any]:
+    """Odcisk pliku: rozmiar, mtime i hash zawartości"""
+    stat = file_path.stat()
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': digest.hexdigest()
+    }
+
+def write_npz_atomic(path: Path, arrays: Dict[str, np.ndarray]) -> None:
+    """Zapisuje tablice do .npz przez plik tymczasowy - czytelnik nigdy nie widzi połowy pliku"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_bytes(buffer.getvalue())
+    os.replace(tmp_path, path)
+
+class TableCache:
+    """Dyskowy cache wyciągniętych tabel rocznych w kolumnowym formacie binarnym (.npz)"""
+
+    # Zmiana formatu zapisu = nowa wersja (stare wpisy są ignorowane)
+    CACHE_VERSION = 2
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+
+    def fingerprint(self, file_path: Path) -> Dict[str, Any]:
+        """Odcisk pliku źródłowego: rozmiar, mtime i hash zawartości"""
+        return file_fingerprint(file_path)
+
+    def get_cache_path(self, year: int) -> Path:
+        """Zwraca ścieżkę wpisu cache dla roku"""
+        return self.cache_dir / f"rok_{year}.npz"
+
+    def load(self, year: int, fingerprint: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """Zwraca tabelę z cache jeśli odcisk się zgadza, w przeciwnym razie None"""
+        cache_path = self.get_cache_path(year)
+        if not cache_path.exists():
+            return None
+
+        try:
+            with np.load(cache_path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if meta.get('version') != self.CACHE_VERSION or meta.get('fingerprint') != fingerprint:
+                    return None
+
+                columns = {}
+                for i, name in enumerate(meta['columns']):
+                    values = data[f'col_{i}']
+                    if meta['kinds'][i] == 'text':
+                        # Przywróć brakujące wartości jako NaN (jak po read_html)
+                        values = values.astype(object)
+                        values[data[f'null_{i}']] = np.nan
+                    columns[name] = values
+
+                return pd.DataFrame(columns, columns=meta['columns'])
+        except Exception as e:
+            print(f"    Nieczytelny wpis cache dla roku {year}: {e}")
+            return None
+
+    def store(self, year: int, fingerprint: Dict[str, Any], df: pd.DataFrame) -> None:
+        """Zapisuje tabelę do cache (zapis atomowy przez plik tymczasowy)"""
+        arrays: Dict[str, np.ndarray] = {}
+        kinds = []
+
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+                kinds.append('numeric')
+                arrays[f'col_{i}'] = series.to_numpy(dtype=float if series.hasnans else None)
+            elif pd.api.types.is_datetime64_any_dtype(series):
+                kinds.append('datetime')
+                arrays[f'col_{i}'] = series.to_numpy(dtype='datetime64[ns]')
+            else:
+                kinds.append('text')
+                nulls = series.isna().to_numpy()
+                arrays[f'col_{i}'] = np.array(['' if null else str(value)
+                                               for value, null in zip(series, nulls)], dtype=str)
+                arrays[f'null_{i}'] = nulls
+
+        meta = {
+            'version': self.CACHE_VERSION,
+            'fingerprint': fingerprint,
+            'columns': [str(name) for name in df.columns],
+            'kinds': kinds
+        }
+        arrays['meta'] = np.array(json.dumps(meta))
+
+        try:
+            write_npz_atomic(self.get_cache_path(year), arrays)
+        except OSError as e:
+            print(f"    Nie udało się zapisać cache dla roku {year}: {e}")
+
+    def clear(self) -> None:
+        """Usuwa wszystkie wpisy cache"""
+        if self.cache_dir.exists():
+            for cache_file in self.cache_dir.glob("rok_*.npz"):
+                cache_file.unlink()